@@ -0,0 +1,312 @@
+import os
+import time
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from scripts.article_index import SORT_KEYS, encode_cursor, decode_cursor
+from scripts.neighbor_store import article_ids, format_article_id
+from nlp.scoring import static_scores, current_scores
+
+ARTICLE_COLUMNS = ["title", "url", "source", "cluster", "final_score", "scraping_date"]
+# Read as well when /articles/top ranks by query-time recency
+SCORE_COLUMNS = ["static_score", "recency_score"]
+# Date sort key of rows without scraping_date: after every dated row
+UNDATED_KEY = np.iinfo(np.int64).max
+
+
+class ArticleSnapshot:
+    """
+    Immutable column arrays of the article store plus the indexes used to
+    answer API queries without scans or sorts:
+
+    - score_order: rows by (final_score desc, url)
+    - cluster_rows / source_rows: row ids per cluster / source (ascending)
+    - cluster_score_order: rows of each cluster by (final_score desc, url)
+    - date_order + sorted_dates: rows by scraping_date, for searchsorted
+    - sort_orders / sort_ranks: keyset orders (key desc, url) for cursor pages
+    - id_order + sorted_ids: rows by article id (hash of normalized url)
+
+    With `w_recency` set, top() ranks by the current score: the stored
+    static_score plus recency decay at query time, over the rows scraped in
+    the last `window_days` (date_order, no scan of older rows).
+    """
+
+    def __init__(self, df, version, w_recency=None, decay_days=30, window_days=None):
+        self.version = version
+        self.n_rows = len(df)
+        self.w_recency = w_recency
+        self.decay_days = decay_days
+        self.window_days = window_days
+
+        self.title = df["title"].to_numpy(dtype=object)
+        self.url = df["url"].to_numpy(dtype=object)
+        self.source = df["source"].fillna("").to_numpy(dtype=object)
+        self.cluster = df["cluster"].fillna(-1).to_numpy(dtype=np.int64)
+        self.final_score = df["final_score"].to_numpy(dtype=np.float64)
+        self.static_score = static_scores(df, w_recency) if w_recency is not None else None
+        self.scraping_date = pd.to_datetime(df["scraping_date"]).to_numpy(dtype="datetime64[ns]")
+        undated = np.isnat(self.scraping_date)
+
+        self.score_order = np.lexsort((self.url, -self.final_score))
+        self.sorted_neg_scores = -self.final_score[self.score_order]
+
+        self.cluster_rows = self._group_rows(self.cluster)
+        self.source_rows = self._group_rows(self.source)
+        self.cluster_score_order = {
+            c: rows[np.lexsort((self.url[rows], -self.final_score[rows]))]
+            for c, rows in self.cluster_rows.items()
+        }
+
+        # NaT sorts last: undated rows are outside every date range
+        self.date_order = np.argsort(self.scraping_date, kind="stable")
+        self.sorted_dates = self.scraping_date[self.date_order]
+        self.n_dated = int(self.n_rows - undated.sum())
+
+        # Keyset orders use second resolution dates, as served in records /
+        # cursors; undated rows come last (as NULLs in the SQLite engine)
+        neg_seconds = np.where(
+            undated, UNDATED_KEY, -self.scraping_date.astype("datetime64[s]").astype(np.int64)
+        )
+        self.sort_keys = {"score": -self.final_score, "date": neg_seconds}
+        self.sort_orders = {
+            "score": self.score_order,
+            "date": np.lexsort((self.url, neg_seconds)),
+        }
+        self.sort_ranks = {}
+        for sort, order in self.sort_orders.items():
+            ranks = np.empty(self.n_rows, dtype=np.int64)
+            ranks[order] = np.arange(self.n_rows)
+            self.sort_ranks[sort] = ranks
+
+        self.article_id = article_ids(self.url)
+        self.id_order = np.argsort(self.article_id, kind="stable")
+        self.sorted_ids = self.article_id[self.id_order]
+
+    @staticmethod
+    def _group_rows(values):
+        order = np.argsort(values, kind="stable")
+        keys, starts = np.unique(values[order], return_index=True)
+        return dict(zip(keys.tolist(), np.split(order, starts[1:])))
+
+    def records(self, rows, current=None):
+        records = [
+            {
+                "id": format_article_id(self.article_id[i]),
+                "title": self.title[i],
+                "url": self.url[i],
+                "source": self.source[i],
+                "cluster": int(self.cluster[i]),
+                "final_score": float(self.final_score[i]),
+                "scraping_date": (
+                    None if np.isnat(self.scraping_date[i])
+                    else pd.Timestamp(self.scraping_date[i]).strftime("%Y-%m-%dT%H:%M:%S")
+                ),
+            }
+            for i in rows
+        ]
+        if current is not None:
+            for record, score in zip(records, current):
+                record["current_score"] = float(score)
+        return records
+
+    def rows_for_ids(self, ids):
+        """Row ids of the given article ids, in the same order (unknown ids skipped)"""
+        ids = np.asarray(ids, dtype=np.uint64)
+        positions = np.minimum(np.searchsorted(self.sorted_ids, ids), max(self.n_rows - 1, 0))
+        found = (self.sorted_ids[positions] == ids) if self.n_rows else np.zeros(len(ids), dtype=bool)
+        return self.id_order[positions[found]]
+
+    def by_ids(self, ids):
+        return self.records(self.rows_for_ids(ids))
+
+    def date_range_rows(self, start_date=None, end_date=None):
+        lo = 0 if not start_date else np.searchsorted(self.sorted_dates, np.datetime64(pd.Timestamp(start_date)), "left")
+        hi = self.n_dated if not end_date else np.searchsorted(self.sorted_dates, np.datetime64(pd.Timestamp(end_date)), "right")
+        return np.sort(self.date_order[lo:hi])
+
+    def filter_rows(self, source=None, start_date=None, end_date=None, cluster=None):
+        """Sorted row ids matching all filters (None = no filter, all rows)"""
+        selections = []
+        if source:
+            matches = [s for s in self.source_rows if s and source.lower() in str(s).lower()]
+            selections.append(
+                np.sort(np.concatenate([self.source_rows[s] for s in matches])) if matches
+                else np.empty(0, dtype=np.int64)
+            )
+        if start_date or end_date:
+            selections.append(self.date_range_rows(start_date, end_date))
+        if cluster is not None:
+            selections.append(self.cluster_rows.get(cluster, np.empty(0, dtype=np.int64)))
+
+        if not selections:
+            return None
+        rows = selections[0]
+        for other in selections[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def query(self, skip=0, limit=10, **filters):
+        rows = self.filter_rows(**filters)
+        if rows is None:
+            return self.n_rows, self.records(range(skip, min(skip + limit, self.n_rows)))
+        return len(rows), self.records(rows[skip:skip + limit])
+
+    def _cursor_position(self, sort, cursor):
+        """First position in sort_orders[sort] strictly after the cursor key"""
+        value, url = decode_cursor(cursor, sort)
+        if sort == "date":
+            key = UNDATED_KEY if value is None else -np.datetime64(pd.Timestamp(value), "s").astype(np.int64)
+        else:
+            key = -float(value)
+        order = self.sort_orders[sort]
+        sorted_keys = self.sort_keys[sort][order]
+        lo = int(np.searchsorted(sorted_keys, key, "left"))
+        hi = int(np.searchsorted(sorted_keys, key, "right"))
+        return lo + int(np.searchsorted(self.url[order[lo:hi]], url, "right"))
+
+    def page(self, limit=10, sort="date", cursor=None, **filters):
+        """Keyset page ordered by (sort key desc, url): (total, rows, next cursor)"""
+        order = self.sort_orders[sort]
+        start = self._cursor_position(sort, cursor) if cursor else 0
+        rows = self.filter_rows(**filters)
+
+        if rows is None:
+            total = self.n_rows
+            page_rows = order[start:start + limit + 1]
+        else:
+            total = len(rows)
+            ranks = self.sort_ranks[sort][rows]
+            ranks = ranks[ranks >= start]
+            if len(ranks) > limit + 1:
+                ranks = np.partition(ranks, limit)[:limit + 1]
+            page_rows = order[np.sort(ranks)]
+
+        records = self.records(page_rows[:limit])
+        next_cursor = None
+        if len(page_rows) > limit:
+            last = records[-1]
+            next_cursor = encode_cursor(sort, last[SORT_KEYS[sort]], last["url"])
+        return total, records, next_cursor
+
+    def top(self, limit=10, cluster=None, min_score=0.0, now=None):
+        if self.w_recency is not None:
+            return self._top_current(limit, cluster, min_score, now)
+        if cluster is None:
+            order = self.score_order
+            neg_scores = self.sorted_neg_scores
+        else:
+            order = self.cluster_score_order.get(cluster, np.empty(0, dtype=np.int64))
+            neg_scores = -self.final_score[order]
+        total = int(np.searchsorted(neg_scores, -min_score, "right"))
+        return total, self.records(order[:min(limit, total)])
+
+    def _top_current(self, limit, cluster, min_score, now):
+        """Top by current score (desc, url) among the rows of the window; only the top `limit` are sorted"""
+        now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+        start_date = now - pd.Timedelta(days=self.window_days) if self.window_days else None
+        rows = self.filter_rows(start_date=start_date, cluster=cluster)
+        if rows is None:
+            rows = np.arange(self.n_rows)
+
+        scores = current_scores(
+            self.static_score[rows], self.scraping_date[rows], self.w_recency, self.decay_days, now=now
+        )
+        keep = scores >= min_score
+        rows, scores = rows[keep], scores[keep]
+        total = len(rows)
+        if total > limit:
+            # Everything tied with the limit-th score stays, so the url tie-break is exact
+            kth = np.partition(scores, total - limit)[total - limit]
+            keep = scores >= kth
+            rows, scores = rows[keep], scores[keep]
+        order = np.lexsort((self.url[rows], -scores))[:limit]
+        return total, self.records(rows[order], current=scores[order])
+
+
+class ArticleCache:
+    """
+    Process-level cache of the article store. The snapshot is rebuilt only
+    when the store manifest changes (mtime / size), so requests are served
+    from memory. Hit/miss counters and reload times are kept in `stats`.
+    With `w_recency`, top() uses query-time recency (see ArticleSnapshot).
+    """
+
+    def __init__(self, store, columns=ARTICLE_COLUMNS, w_recency=None, decay_days=30, window_days=None):
+        self.store = store
+        self.columns = columns + SCORE_COLUMNS if w_recency is not None else columns
+        self.w_recency = w_recency
+        self.decay_days = decay_days
+        self.window_days = window_days
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._key = None
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "reloads": 0,
+            "rows": 0,
+            "version": None,
+            "last_reload_seconds": None,
+            "total_reload_seconds": 0.0,
+            "last_reload_at": None,
+        }
+
+    def _manifest_key(self):
+        try:
+            st = os.stat(self.store.manifest_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _build(self, df, version):
+        return ArticleSnapshot(
+            df, version, w_recency=self.w_recency, decay_days=self.decay_days, window_days=self.window_days
+        )
+
+    def get(self):
+        key = self._manifest_key()
+        snapshot = self._snapshot
+        if snapshot is not None and key == self._key:
+            self.stats["hits"] += 1
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and key == self._key:
+                self.stats["hits"] += 1
+                return self._snapshot
+
+            self.stats["misses"] += 1
+            start = time.perf_counter()
+            manifest = self.store.read_manifest()
+            df = self.store.read(columns=self.columns)
+            self._snapshot = self._build(df, manifest["version"])
+            self._key = key
+            elapsed = time.perf_counter() - start
+
+            self.stats.update({
+                "reloads": self.stats["reloads"] + 1,
+                "rows": self._snapshot.n_rows,
+                "version": manifest["version"],
+                "last_reload_seconds": elapsed,
+                "total_reload_seconds": self.stats["total_reload_seconds"] + elapsed,
+                "last_reload_at": datetime.now(timezone.utc).isoformat(),
+            })
+            return self._snapshot
+
+    def query(self, skip=0, limit=10, **filters):
+        return self.get().query(skip=skip, limit=limit, **filters)
+
+    def page(self, limit=10, sort="date", cursor=None, **filters):
+        return self.get().page(limit=limit, sort=sort, cursor=cursor, **filters)
+
+    def by_ids(self, ids):
+        return self.get().by_ids(ids)
+
+    def data_version(self):
+        return self.get().version
+
+    def top(self, limit=10, cluster=None, min_score=0.0, now=None):
+        return self.get().top(limit=limit, cluster=cluster, min_score=min_score, now=now)
@@ -0,0 +1,78 @@
+import pyarrow as pa
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Default export columns, those present in the store (the embedding vectors must be requested explicitly)
+DEFAULT_EXPORT_COLUMNS = [
+    "title", "url", "source", "language", "cluster", "cluster_name",
+    "final_score", "scraping_date"
+]
+
+ARROW_EOS = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+
+
+def matching_sources(store, source):
+    """Store sources matching the case-insensitive substring filter used by /articles"""
+    return [s for s in store.sources() if s and source.lower() in str(s).lower()]
+
+
+def export_frames(store, columns, source=None, start_date=None, end_date=None, cluster=None, batch_size=10000):
+    """
+    DataFrames of the selected articles, in store order. The source filter is
+    resolved to partitions, so unrelated part files are never opened.
+    """
+    sources = matching_sources(store, source) if source else None
+    if sources == []:
+        return
+
+    read_columns = list(columns) + (["cluster"] if cluster is not None and "cluster" not in columns else [])
+    for df in store.iter_frames(read_columns, start_date, end_date, sources, batch_size):
+        if cluster is not None:
+            df = df[df["cluster"] == cluster]
+        if len(df):
+            yield df[columns]
+
+
+def ndjson_stream(frames):
+    for df in frames:
+        text = df.to_json(orient="records", lines=True, date_format="iso", force_ascii=False)
+        yield text if text.endswith("\n") else text + "\n"
+
+
+def _arrow_column(series, type):
+    try:
+        array = pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if type != pa.string():
+            raise
+        # Mixed Python objects (parts whose types could not be unified) are exported as text
+        array = pa.array(series.astype(object).where(series.notna(), None).map(str, na_action="ignore"))
+    # pandas string columns may convert to chunked arrays
+    chunks = array.chunks if isinstance(array, pa.ChunkedArray) else [array]
+    return pa.concat_arrays([chunk.cast(type) for chunk in chunks]) if chunks else pa.nulls(0, type)
+
+
+def record_batch(df, schema):
+    """Record batch of `df` in `schema`: columns cast, missing ones filled with nulls"""
+    arrays = [
+        _arrow_column(df[field.name], field.type) if field.name in df.columns else pa.nulls(len(df), field.type)
+        for field in schema
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def arrow_stream(frames, schema):
+    """
+    Arrow IPC stream format: schema message, one record batch message per
+    frame, end-of-stream marker. The schema is fixed before the first byte
+    is sent (ArticleStore.schema(): union of the part schemas) and every
+    frame is cast to it, so parts written with different columns or dtypes
+    cannot break the stream halfway.
+    """
+    yield schema.serialize().to_pybytes()
+    for df in frames:
+        yield record_batch(df, schema).serialize().to_pybytes()
+    yield ARROW_EOS
@@ -0,0 +1,113 @@
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+
+from scripts.neighbor_store import article_ids
+
+logger = logging.getLogger("feedback")
+
+
+class FeedbackBuffer:
+    """
+    In-memory buffer in front of a FeedbackStore. add() only appends to a
+    list; the background thread writes events in batches every
+    `flush_interval` seconds, or as soon as `max_events` accumulate, and
+    close() flushes what is left.
+
+    `resolve_clusters(ids)` (optional) maps article ids (article_ids of the
+    event urls, so any form of a stored url matches) to cluster ids at flush
+    time, for the per-cluster counters. If it fails, the events are logged
+    without cluster. Only a batch that did not reach the log is kept for
+    the next flush, and at most `max_pending` events are held (the oldest
+    are dropped).
+    """
+
+    def __init__(self, store, max_events=1000, flush_interval=2.0, resolve_clusters=None, max_pending=100000):
+        self.store = store
+        self.max_events = max_events
+        self.flush_interval = flush_interval
+        self.resolve_clusters = resolve_clusters
+        self.max_pending = max_pending
+        self._events = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self.stats = {"received": 0, "flushed": 0, "flushes": 0, "errors": 0, "dropped": 0, "last_flush_seconds": None}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="feedback-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def add(self, url, rating):
+        event = {"url": url, "rating": rating, "timestamp": datetime.now(timezone.utc).isoformat()}
+        with self._lock:
+            self._events.append(event)
+            self.stats["received"] += 1
+            full = len(self._events) >= self.max_events
+        if full:
+            if self._thread is not None:
+                self._wake.set()
+            else:
+                self.flush()
+
+    def pending(self):
+        return len(self._events)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+            if not events:
+                return 0
+
+            start = time.perf_counter()
+            self._set_clusters(events)
+            try:
+                self.store.append(events)
+            except Exception:
+                # The batch did not reach the log (store.append recovers from
+                # counter failures itself): keep it for the next flush
+                logger.exception("Feedback flush failed (%d events)", len(events))
+                with self._lock:
+                    self._events = events + self._events
+                    overflow = len(self._events) - self.max_pending
+                    if overflow > 0:
+                        del self._events[:overflow]
+                        self.stats["dropped"] += overflow
+                        logger.error("Feedback buffer full; dropped the %d oldest events", overflow)
+                self.stats["errors"] += 1
+                return 0
+
+            self.stats["flushed"] += len(events)
+            self.stats["flushes"] += 1
+            self.stats["last_flush_seconds"] = time.perf_counter() - start
+            return len(events)
+
+    def _set_clusters(self, events):
+        ids = [int(i) for i in article_ids([e["url"] for e in events])]
+        clusters = {}
+        if self.resolve_clusters is not None:
+            try:
+                clusters = self.resolve_clusters(ids)
+            except Exception:
+                logger.exception("Could not resolve feedback clusters; logging %d events without cluster", len(events))
+        for e, article_id in zip(events, ids):
+            e["cluster"] = clusters.get(article_id)
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
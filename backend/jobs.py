@@ -0,0 +1,244 @@
+import os
+import sys
+import json
+import time
+import uuid
+import fcntl
+import logging
+import subprocess
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger("jobs")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ACTIVE_STATUSES = ("queued", "running")
+QUEUE_LOCK = ".queue.lock"
+WRITER_LOCK = "pipeline_writer.lock"
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobManager:
+    """
+    File-backed queue for pipeline runs: one JSON file per job in `jobs_dir`.
+
+    submit() returns immediately and starts a worker process
+    (`python -m backend.jobs run <job_id>`). Workers take an exclusive
+    writer lock before running, so at most one pipeline writes the store at
+    a time; an identical request made while a job is queued or running
+    returns that job instead of creating a new one.
+
+    Each worker holds `<job_id>.lock` for its whole life (the kernel
+    releases it when the process dies, zombie or not): an active job whose
+    lock is free has lost its worker and is marked failed. A job whose
+    worker never started within `start_timeout` seconds fails too.
+
+    Finished jobs are pruned on submit: only the newest `keep_finished`
+    are kept, none older than `max_age_days`.
+    """
+
+    def __init__(self, jobs_dir, start_timeout=60, keep_finished=100, max_age_days=30):
+        self.jobs_dir = os.path.abspath(jobs_dir)
+        self.start_timeout = start_timeout
+        self.keep_finished = keep_finished
+        self.max_age_days = max_age_days
+        self._workers = {}
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    @contextmanager
+    def _lock(self, name):
+        with open(os.path.join(self.jobs_dir, name), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _job_lock_path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.lock")
+
+    def _reap_workers(self):
+        """Collect exit statuses of the workers started by this process (no zombies)"""
+        for job_id, proc in list(self._workers.items()):
+            if proc.poll() is not None:
+                del self._workers[job_id]
+
+    def _read(self, job_id):
+        with open(self._path(job_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _check_worker(self, job):
+        """Mark an active job failed if its worker is gone (or never started)"""
+        if job.get("pid") is None:
+            created = datetime.fromisoformat(job["created_at"]).timestamp()
+            if time.time() - created <= self.start_timeout:
+                return job
+            error = f"worker did not start within {self.start_timeout}s"
+        else:
+            error = "worker process exited unexpectedly"
+
+        with open(self._job_lock_path(job["id"]), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # A worker holds it: alive (possibly still starting up)
+                return job
+            try:
+                # Re-read under the lock: the worker may have finished in between
+                job = self._read(job["id"])
+                if job["status"] in ACTIVE_STATUSES:
+                    job.update(status="failed", error=error, finished_at=_now())
+                    self._write(job)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return job
+
+    def _write(self, job):
+        tmp_path = f"{self._path(job['id'])}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, indent=2)
+        os.replace(tmp_path, self._path(job["id"]))
+
+    def get(self, job_id):
+        if not os.path.exists(self._path(job_id)):
+            return None
+        self._reap_workers()
+        job = self._read(job_id)
+
+        # Worker died without reporting (killed, OOM...) or never started
+        if job["status"] in ACTIVE_STATUSES:
+            job = self._check_worker(job)
+        return job
+
+    def list(self):
+        job_ids = sorted(
+            (name[:-len(".json")] for name in os.listdir(self.jobs_dir) if name.endswith(".json")),
+            reverse=True
+        )
+        return [job for job in (self.get(job_id) for job_id in job_ids) if job]
+
+    def prune(self):
+        """Delete finished jobs beyond `keep_finished` (newest first) or older than `max_age_days`"""
+        cutoff = time.time() - self.max_age_days * 86400
+        finished = [job for job in self.list() if job["status"] not in ACTIVE_STATUSES]
+        removed = 0
+        for i, job in enumerate(finished):
+            finished_at = datetime.fromisoformat(job["finished_at"] or job["created_at"]).timestamp()
+            if i < self.keep_finished and finished_at >= cutoff:
+                continue
+            for path in (self._path(job["id"]), self._job_lock_path(job["id"])):
+                if os.path.exists(path):
+                    os.remove(path)
+            removed += 1
+        if removed:
+            logger.info("Pruned %d finished jobs", removed)
+        return removed
+
+    def submit(self, kind, params):
+        """Queue a job, or return the active job with the same kind and params"""
+        with self._lock(QUEUE_LOCK):
+            self.prune()
+            for job in self.list():
+                if job["status"] in ACTIVE_STATUSES and job["kind"] == kind and job["params"] == params:
+                    return job, True
+
+            job_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}-{uuid.uuid4().hex[:6]}"
+            job = {
+                "id": job_id,
+                "kind": kind,
+                "params": params,
+                "status": "queued",
+                "stage": None,
+                "stages": [],
+                "created_at": _now(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+                "pid": None,
+            }
+            self._write(job)
+
+            self._workers[job_id] = self._start_worker(job_id)
+            return job, False
+
+    def _start_worker(self, job_id):
+        # The worker takes its job lock and records its own pid once started
+        return subprocess.Popen(
+            [sys.executable, "-m", "backend.jobs", "run", job_id, "--jobs-dir", self.jobs_dir],
+            cwd=PROJECT_ROOT,
+            start_new_session=True
+        )
+
+    def _progress_callback(self, job):
+        def progress(stage):
+            now = _now()
+            if job["stages"] and job["stages"][-1]["finished_at"] is None:
+                job["stages"][-1]["finished_at"] = now
+            job["stages"].append({"name": stage, "started_at": now, "finished_at": None})
+            job["stage"] = stage
+            self._write(job)
+        return progress
+
+    def run(self, job_id):
+        """Worker entry point: hold the job lock, wait for the writer lock, then run the job"""
+        with self._lock(f"{job_id}.lock"):
+            job = self._read(job_id)
+            if job["status"] not in ACTIVE_STATUSES:
+                # Given up on before this worker started
+                return
+            job["pid"] = os.getpid()
+            self._write(job)
+            self._run_locked(job)
+
+    def _run_locked(self, job):
+        job_id = job["id"]
+        with self._lock(WRITER_LOCK):
+            job.update(status="running", started_at=_now())
+            self._write(job)
+            try:
+                result = JOB_KINDS[job["kind"]](progress=self._progress_callback(job), **job["params"])
+                job.update(status="completed", result=result if isinstance(result, (str, int, float, type(None))) else str(result))
+            except Exception as e:
+                logger.exception("Job %s failed", job_id)
+                job.update(status="failed", error=f"{e}\n{traceback.format_exc()}")
+            finally:
+                if job["stages"] and job["stages"][-1]["finished_at"] is None:
+                    job["stages"][-1]["finished_at"] = _now()
+                job["finished_at"] = _now()
+                self._write(job)
+
+
+def _run_weekly_pipeline(progress=None, generate_only=False):
+    from scripts.run_weekly_pipeline import main as run_weekly_pipeline
+
+    return run_weekly_pipeline(generate_only=generate_only, progress=progress)
+
+
+JOB_KINDS = {
+    "weekly_pipeline": _run_weekly_pipeline,
+}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    if PROJECT_ROOT not in sys.path:
+        sys.path.append(PROJECT_ROOT)
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Pipeline job worker")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument("job_id")
+    parser.add_argument("--jobs-dir", default=os.path.join(PROJECT_ROOT, "data", "jobs"))
+    args = parser.parse_args()
+
+    JobManager(args.jobs_dir).run(args.job_id)
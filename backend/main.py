@@ -1,10 +1,13 @@
-from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Query, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
-import pandas as pd
+from typing import Optional, List, Literal
 import os
 import sys
+import time
+import json
+import hashlib
+import logging
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -14,9 +17,21 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from config.load_config import load_config
-from app.pipeline import run_weekly_pipeline
+from scripts.article_store import open_article_store
+from scripts.article_index import open_article_index, recency_options
+from backend.article_cache import ArticleCache
+from backend.jobs import JobManager
+from backend.newsletter import PreviewCache, etag_matches
+from backend.search import SearchIndex, embed_query, warm_embedder, embedder_stats
+from backend.metrics import REGISTRY, CONTENT_TYPE, Counter, Histogram, CallbackGauge
+from backend.related import RelatedIndex
+from backend.feedback import FeedbackBuffer
+from scripts.feedback_store import open_feedback_store
+from scripts.neighbor_store import open_neighbor_store, parse_article_id
+from backend.export import EXPORT_FORMATS, DEFAULT_EXPORT_COLUMNS, export_frames, ndjson_stream, arrow_stream
 
 cfg = load_config(os.path.join(PROJECT_ROOT, "config", "config.yaml"))
+logger = logging.getLogger("api")
 
 app = FastAPI(
     title="AI Newsletter Service",
@@ -24,6 +39,13 @@ app = FastAPI(
     version="1.0.0"
 )
 
+job_manager = JobManager(
+    cfg.get("api", {}).get("jobs_dir", "data/jobs"),
+    start_timeout=cfg.get("api", {}).get("jobs_start_timeout_seconds", 60),
+    keep_finished=cfg.get("api", {}).get("jobs_keep_finished", 100),
+    max_age_days=cfg.get("api", {}).get("jobs_max_age_days", 30)
+)
+
 # Models
 class Article(BaseModel):
     title: str
@@ -38,23 +60,209 @@ class Feedback(BaseModel):
     rating: str  # thumb_up, thumb_down, etc.
 
 # Helper functions
-def get_processed_articles_df() -> pd.DataFrame:
-    """Load processed articles from parquet"""
-    processed_path = cfg["data"]["processed_path"]
-    if not os.path.exists(processed_path):
-        return pd.DataFrame()
-    return pd.read_parquet(processed_path)
+_article_store = None
 
-def validate_storage() -> dict:
-    """Check storage connectivity"""
+def get_article_store():
+    global _article_store
+    if _article_store is None:
+        _article_store = open_article_store(cfg)
+    return _article_store
+
+_article_engine = None
+
+def get_article_engine():
+    """
+    Query engine over the article store, created once per process:
+    in-memory cache with prebuilt indexes ("memory") or SQLite index ("sqlite")
+    """
+    global _article_engine
+    if _article_engine is None:
+        store = get_article_store()
+        if cfg.get("api", {}).get("query_engine", "memory") == "sqlite":
+            _article_engine = open_article_index(cfg, store)
+        else:
+            _article_engine = ArticleCache(store, **recency_options(cfg))
+    return _article_engine
+
+_search_index = None
+
+def get_search_index():
+    global _search_index
+    if _search_index is None:
+        search_cfg = cfg.get("api", {}).get("search", {})
+        _search_index = SearchIndex(
+            get_article_store(),
+            cfg["paths"]["models_dir"],
+            exact_max_rows=search_cfg.get("exact_max_rows", 50000),
+            n_probe=search_cfg.get("n_probe", 3)
+        )
+    return _search_index
+
+@app.on_event("startup")
+def preload_embedder():
+    """Load the query embedder at startup so the first /search does not pay for it"""
+    if not cfg.get("api", {}).get("search", {}).get("preload_embedder", False):
+        return
     try:
-        processed_path = cfg["data"]["processed_path"]
-        newsletters_dir = cfg["data"]["newsletters_dir"]
-        os.makedirs(os.path.dirname(processed_path), exist_ok=True)
-        os.makedirs(newsletters_dir, exist_ok=True)
-        return {"status": "healthy", "storage": "accessible"}
+        warm_embedder(cfg["embeddings"]["active_model"])
     except Exception as e:
-        return {"status": "unhealthy", "storage": f"error: {str(e)}"}
+        logger.warning("Could not preload embedder: %s", e)
+
+_related_index = None
+
+def get_related_index():
+    global _related_index
+    if _related_index is None:
+        _related_index = RelatedIndex(open_neighbor_store(cfg))
+    return _related_index
+
+def resolve_clusters(ids):
+    """article id -> cluster of the stored articles (for per-cluster feedback counters)"""
+    records = get_article_engine().by_ids(list(dict.fromkeys(ids)))
+    return {
+        parse_article_id(r["id"]): r["cluster"]
+        for r in records if r["cluster"] is not None and r["cluster"] >= 0
+    }
+
+feedback_cfg = cfg.get("feedback", {})
+feedback_buffer = FeedbackBuffer(
+    open_feedback_store(cfg),
+    max_events=feedback_cfg.get("flush_max_events", 1000),
+    flush_interval=feedback_cfg.get("flush_interval_seconds", 2.0),
+    max_pending=feedback_cfg.get("max_pending_events", 100000),
+    resolve_clusters=resolve_clusters
+)
+
+@app.on_event("startup")
+def start_feedback_buffer():
+    feedback_buffer.start()
+
+@app.on_event("shutdown")
+def flush_feedback_buffer():
+    feedback_buffer.close()
+
+_preview_cache = None
+
+def get_preview_cache():
+    """Rendered preview cache, keyed by store version, template mtime and config"""
+    global _preview_cache
+    if _preview_cache is None:
+        _preview_cache = PreviewCache(get_article_store(), cfg)
+    return _preview_cache
+
+def query_etag(request: Request, version) -> str:
+    """Strong ETag for a query (path + sorted params) over a given data version"""
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    key = f"{request.url.path}?{params}|{version}"
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest() + '"'
+
+def conditional_json(request: Request, etag: str, compute):
+    """304 when If-None-Match matches, otherwise the JSON body from compute() with its ETag"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(compute(), headers=headers)
+
+def validate_storage() -> dict:
+    """Check storage access (read-only: nothing is created)"""
+    problems = []
+    for key in ("store_dir", "newsletters_dir"):
+        path = cfg["data"].get(key)
+        if path and not os.path.isdir(path):
+            problems.append(f"{key} missing: {path}")
+        elif path and not os.access(path, os.R_OK | os.W_OK):
+            problems.append(f"{key} not writable: {path}")
+    if problems:
+        return {"status": "unhealthy", "storage": "; ".join(problems)}
+    return {"status": "healthy", "storage": "accessible"}
+
+# Metrics (Prometheus text format at /metrics)
+HTTP_REQUESTS = Counter(
+    "http_requests", "HTTP requests by route and status", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route"]
+)
+
+def _engine_stat(engine_getter, stat):
+    def collect():
+        engine = engine_getter()
+        stats = getattr(engine, "stats", None)
+        return None if stats is None else stats.get(stat)
+    return collect
+
+def _last_successful_run_age():
+    """Seconds since the newest completed weekly run report (None if there is none)"""
+    newsletters_dir = cfg["data"]["newsletters_dir"]
+    if not os.path.isdir(newsletters_dir):
+        return None
+    reports = sorted((n for n in os.listdir(newsletters_dir) if n.endswith(".report.json")), reverse=True)
+    for name in reports:
+        path = os.path.join(newsletters_dir, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if json.load(f).get("status") == "completed":
+                    return time.time() - os.path.getmtime(path)
+        except (OSError, ValueError):
+            continue
+    return None
+
+def _job_samples(value):
+    """Per (kind, status): job count or duration of the most recent finished job"""
+    latest, counts = {}, {}
+    for job in job_manager.list():
+        key = (job["kind"], job["status"])
+        counts[key] = counts.get(key, 0) + 1
+        if job.get("started_at") and job.get("finished_at"):
+            if key not in latest or job["finished_at"] > latest[key][0]:
+                duration = datetime.fromisoformat(job["finished_at"]) - datetime.fromisoformat(job["started_at"])
+                latest[key] = (job["finished_at"], duration.total_seconds())
+    if value == "count":
+        return [({"kind": kind, "status": status}, n) for (kind, status), n in counts.items()]
+    return [({"kind": kind, "status": status}, d) for (kind, status), (_, d) in latest.items()]
+
+CallbackGauge("article_store_rows", "Articles in the store", lambda: get_article_store().count())
+CallbackGauge(
+    "article_store_parts", "Parquet parts in the store", lambda: len(get_article_store().read_manifest()["parts"])
+)
+CallbackGauge("article_store_version", "Article store manifest version", lambda: get_article_store().version)
+CallbackGauge("article_cache_hits", "Article engine cache hits", _engine_stat(get_article_engine, "hits"))
+CallbackGauge("article_cache_reloads", "Article engine snapshot reloads", _engine_stat(get_article_engine, "reloads"))
+CallbackGauge(
+    "article_cache_last_reload_seconds", "Time to load the last article snapshot (parquet read + indexes)",
+    _engine_stat(get_article_engine, "last_reload_seconds")
+)
+CallbackGauge(
+    "search_index_last_reload_seconds", "Time to load the last search index (parquet read + vectors)",
+    _engine_stat(lambda: _search_index, "last_reload_seconds")
+)
+CallbackGauge(
+    "preview_last_render_seconds", "Time to render the last cached preview",
+    _engine_stat(lambda: _preview_cache, "last_render_seconds")
+)
+CallbackGauge("embedder_load_seconds", "Query embedder load time", lambda: embedder_stats["load_seconds"])
+CallbackGauge("pipeline_jobs", "Pipeline jobs by kind and status", lambda: _job_samples("count"))
+CallbackGauge(
+    "pipeline_job_last_duration_seconds", "Duration of the most recent finished job by kind and status",
+    lambda: _job_samples("duration")
+)
+CallbackGauge("pipeline_last_success_age_seconds", "Seconds since the last completed weekly run", _last_successful_run_age)
+CallbackGauge("feedback_pending_events", "Feedback events buffered in memory", lambda: feedback_buffer.pending())
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Route template (e.g. /articles/{article_id}/related) keeps label cardinality bounded
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method, route=route_path)
+        HTTP_REQUESTS.inc(method=request.method, route=route_path, status=status)
 
 @app.get("/health")
 def health():
@@ -66,10 +274,28 @@ def health():
         **storage_status
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Estadísticas de la caché de artículos (aciertos, fallos, tiempos de recarga)"""
+    engine = get_article_engine()
+    return {
+        "engine": type(engine).__name__,
+        "stats": getattr(engine, "stats", None),
+        "preview": get_preview_cache().stats
+    }
+
 @app.get("/articles", response_model=dict)
 def get_articles(
+    request: Request,
     skip: int = Query(0, ge=0, description="Número de artículos a saltar"),
     limit: int = Query(10, ge=1, le=100, description="Número de artículos a devolver"),
+    sort: Optional[Literal["score", "date"]] = Query(None, description="Orden estable para paginación por cursor"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
     source: Optional[str] = Query(None, description="Filtrar por fuente"),
     start_date: Optional[str] = Query(None, description="Filtrar desde fecha (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="Filtrar hasta fecha (YYYY-MM-DD)"),
@@ -79,52 +305,55 @@ def get_articles(
     Devuelve lista de artículos procesados con soporte para paginación y filtrado.
     
     Parámetros:
-    - skip: número de artículos a saltar (default 0)
+    - skip: número de artículos a saltar (default 0, solo sin `sort`)
     - limit: número de artículos a devolver (default 10, máx 100)
+    - sort: "score" (final_score, url) o "date" (scraping_date, url), descendente;
+      activa la paginación por cursor
+    - cursor: valor de next_cursor de la página anterior
     - source: filtrar por nombre de fuente (ej: "TechCrunch")
     - start_date: filtrar desde esta fecha (formato YYYY-MM-DD)
     - end_date: filtrar hasta esta fecha (formato YYYY-MM-DD)
     - cluster: filtrar por ID de cluster
+    
+    Las respuestas llevan un ETag por (consulta, versión de datos); con
+    If-None-Match se devuelve 304 sin recalcular la página.
     """
+    if cursor and not sort:
+        raise HTTPException(status_code=400, detail="cursor requires sort")
+    filters = {"source": source, "start_date": start_date, "end_date": end_date, "cluster": cluster}
+    
     try:
-        df = get_processed_articles_df()
-        if df.empty:
-            return {"total": 0, "skip": skip, "limit": limit, "articles": []}
-        
-        # Apply filters
-        if source:
-            df = df[df["source"].str.contains(source, case=False, na=False)]
-        
-        if start_date:
-            df = df[df["scraping_date"] >= start_date]
-        
-        if end_date:
-            df = df[df["scraping_date"] <= end_date]
+        engine = get_article_engine()
         
-        if cluster is not None:
-            df = df[df["cluster"] == cluster]
+        def compute():
+            if sort:
+                total, articles, next_cursor = engine.page(limit=limit, sort=sort, cursor=cursor, **filters)
+                return {
+                    "total": total,
+                    "limit": limit,
+                    "sort": sort,
+                    "returned": len(articles),
+                    "next_cursor": next_cursor,
+                    "articles": articles
+                }
+            total, articles = engine.query(skip=skip, limit=limit, **filters)
+            return {
+                "total": total,
+                "skip": skip,
+                "limit": limit,
+                "returned": len(articles),
+                "articles": articles
+            }
         
-        total = len(df)
-        
-        # Pagination
-        df_paginated = df.iloc[skip:skip+limit]
-        
-        articles = df_paginated[[
-            "title", "url", "source", "cluster", "final_score", "scraping_date"
-        ]].to_dict(orient="records")
-        
-        return {
-            "total": total,
-            "skip": skip,
-            "limit": limit,
-            "returned": len(articles),
-            "articles": articles
-        }
+        return conditional_json(request, query_etag(request, engine.data_version()), compute)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching articles: {str(e)}")
 
 @app.get("/articles/top", response_model=dict)
 def get_top_articles(
+    request: Request,
     limit: int = Query(10, ge=1, le=50, description="Número de artículos a devolver"),
     cluster: Optional[int] = Query(None, ge=0, description="Filtrar por cluster"),
     min_score: float = Query(0.0, ge=0.0, le=1.0, description="Puntuación mínima")
@@ -133,73 +362,203 @@ def get_top_articles(
     Devuelve los artículos más relevantes ordenados por final_score en orden descendente.
     Útil para dashboards y secciones destacadas.
     
+    Con `scoring.query_time_recency` el orden (y min_score) usa el score actual:
+    parte estática guardada + recencia calculada ahora (a la hora en punto, que
+    forma parte del ETag), sobre los artículos de los últimos `api.top_window_days`;
+    cada artículo lleva además `current_score`.
+    
     Parámetros:
     - limit: número de artículos a devolver (default 10, máx 50)
     - cluster: filtrar por ID de cluster (opcional)
     - min_score: puntuación mínima del artículo (0.0 a 1.0)
     """
     try:
-        df = get_processed_articles_df()
-        if df.empty:
-            return {"total": 0, "articles": []}
+        engine = get_article_engine()
+        now = datetime.now().replace(minute=0, second=0, microsecond=0)
+        version = engine.data_version()
+        if cfg["scoring"].get("query_time_recency", False):
+            version = f"{version}@{now.isoformat()}"
         
-        # Filter by score
-        df = df[df["final_score"] >= min_score]
+        def compute():
+            total, articles = engine.top(limit=limit, cluster=cluster, min_score=min_score, now=now)
+            return {
+                "total": total,
+                "returned": len(articles),
+                "articles": articles
+            }
         
-        # Filter by cluster if specified
-        if cluster is not None:
-            df = df[df["cluster"] == cluster]
-        
-        # Sort by score and get top
-        df_top = df.nlargest(limit, "final_score")
+        return conditional_json(request, query_etag(request, version), compute)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching top articles: {str(e)}")
+
+@app.get("/articles/{article_id}/related", response_model=dict)
+def get_related_articles(
+    article_id: str,
+    limit: int = Query(5, ge=1, le=50, description="Número de artículos relacionados")
+):
+    """
+    Artículos relacionados ("more like this") con listas de vecinos precalculadas.
+    
+    - article_id: campo `id` de los artículos (hash de la URL normalizada)
+    """
+    try:
+        article = parse_article_id(article_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    neighbors = get_related_index().related(article, limit=limit)
+    if neighbors is None:
+        raise HTTPException(status_code=404, detail=f"No related articles for {article_id}")
+    
+    try:
+        similarity = dict(neighbors)
+        articles = get_article_engine().by_ids([n for n, _ in neighbors])
+        for record in articles:
+            record["similarity"] = float(similarity[parse_article_id(record["id"])])
         
-        articles = df_top[[
-            "title", "url", "source", "cluster", "final_score", "scraping_date"
-        ]].to_dict(orient="records")
+        return {
+            "id": article_id,
+            "returned": len(articles),
+            "articles": articles
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching related articles: {str(e)}")
+
+@app.get("/search", response_model=dict)
+def search_articles(
+    q: str = Query(..., min_length=2, description="Texto a buscar"),
+    limit: int = Query(10, ge=1, le=50, description="Número de artículos a devolver"),
+    source: Optional[str] = Query(None, description="Filtrar por fuente"),
+    start_date: Optional[str] = Query(None, description="Filtrar desde fecha (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Filtrar hasta fecha (YYYY-MM-DD)"),
+    cluster: Optional[int] = Query(None, ge=0, description="Filtrar por cluster")
+):
+    """
+    Búsqueda semántica: embebe la consulta con el modelo activo y devuelve los
+    artículos más similares (coseno), combinable con los filtros de /articles.
+    """
+    try:
+        start = time.perf_counter()
+        query_vector = embed_query(cfg["embeddings"]["active_model"], q)
+        index = get_search_index()
+        searched, articles = index.search(
+            query_vector,
+            limit=limit,
+            source=source,
+            start_date=start_date,
+            end_date=end_date,
+            cluster=cluster
+        )
         
         return {
-            "total": len(df),
+            "query": q,
+            "searched": searched,
             "returned": len(articles),
+            "mode": index.get().index.mode,
+            "took_ms": round((time.perf_counter() - start) * 1000, 2),
             "articles": articles
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching top articles: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching articles: {str(e)}")
+
+@app.get("/export")
+def export_articles(
+    format: Literal["ndjson", "arrow"] = Query("ndjson", description="Formato: ndjson o arrow (Arrow IPC stream)"),
+    columns: Optional[str] = Query(None, description="Columnas separadas por comas"),
+    source: Optional[str] = Query(None, description="Filtrar por fuente"),
+    start_date: Optional[str] = Query(None, description="Filtrar desde fecha (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Filtrar hasta fecha (YYYY-MM-DD)"),
+    cluster: Optional[int] = Query(None, ge=0, description="Filtrar por cluster"),
+    batch_size: int = Query(10000, ge=100, le=100000, description="Filas por bloque")
+):
+    """
+    Exporta artículos del almacén en streaming (transferencia por bloques).
+    
+    Mismos filtros que /articles más selección de columnas. Se lee el almacén
+    secuencialmente, un bloque de `batch_size` filas cada vez, por lo que la
+    memoria del servidor no depende del tamaño del archivo exportado.
+    """
+    store = get_article_store()
+    available = store.columns()
+    if columns:
+        selected = [c.strip() for c in columns.split(",") if c.strip()]
+        unknown = sorted(set(selected) - set(available))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+    else:
+        selected = [c for c in DEFAULT_EXPORT_COLUMNS if c in available]
+    
+    frames = export_frames(
+        store,
+        selected,
+        source=source,
+        start_date=start_date,
+        end_date=end_date,
+        cluster=cluster,
+        batch_size=batch_size
+    )
+    body = ndjson_stream(frames) if format == "ndjson" else arrow_stream(frames, store.schema(selected))
+    extension = "ndjson" if format == "ndjson" else "arrows"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f"attachment; filename=articles_v{store.version}.{extension}",
+            "X-Store-Version": str(store.version)
+        }
+    )
 
 @app.post("/run-pipeline")
 def run_pipeline(
     generate_only: bool = Query(False, description="Solo generar preview sin guardar")
 ):
     """
-    Lanza el pipeline semanal bajo demanda.
+    Lanza el pipeline semanal bajo demanda en segundo plano.
     
     Parámetros:
     - generate_only: si es True, solo genera preview sin guardar resultados
     
-    Devuelve un identificador de seguimiento para monitorizar el progreso.
+    Devuelve inmediatamente un identificador de tarea; el progreso se consulta
+    en GET /jobs/{task_id}. Si ya hay una ejecución idéntica en cola o en curso
+    se devuelve esa misma tarea.
     """
     try:
-        # Generate timestamp for tracking
-        task_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-        
-        result = run_weekly_pipeline(generate_only=generate_only)
+        job, deduplicated = job_manager.submit("weekly_pipeline", {"generate_only": generate_only})
         
         return {
-            "task_id": task_id,
-            "status": "completed",
-            "message": result,
+            "task_id": job["id"],
+            "status": job["status"],
+            "deduplicated": deduplicated,
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Pipeline error: {str(e)}")
 
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Estado de una ejecución del pipeline: estado global, etapa actual y tiempos por etapa"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
 @app.get("/preview", response_class=HTMLResponse)
-def preview():
-    """Genera un preview HTML del newsletter sin guardar"""
+def preview(request: Request):
+    """
+    Preview HTML del newsletter con los artículos ya almacenados (sin scraping).
+    
+    El HTML se renderiza una vez por versión de datos / plantilla / configuración;
+    admite revalidación con If-None-Match (304 Not Modified).
+    """
     try:
-        html = run_weekly_pipeline(generate_only=True)
-        return html
+        html, etag = get_preview_cache().get()
     except Exception as e:
-        return f"<h1>Error generating preview</h1><p>{str(e)}</p>"
+        return HTMLResponse(f"<h1>Error generating preview</h1><p>{str(e)}</p>", status_code=500)
+    
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(html, headers=headers)
 
 @app.post("/feedback")
 def submit_feedback(feedback: Feedback):
@@ -209,31 +568,26 @@ def submit_feedback(feedback: Feedback):
     Parámetros:
     - url: URL del artículo
     - rating: valoración (thumb_up, thumb_down, etc.)
+    
+    El evento se guarda en memoria y se escribe por lotes en el log de
+    feedback (data/feedback), que mantiene contadores por artículo y cluster.
     """
-    try:
-        feedback_dir = cfg["data"].get("feedback_dir", "data/feedback")
-        os.makedirs(feedback_dir, exist_ok=True)
-        
-        feedback_path = os.path.join(feedback_dir, "feedback.csv")
-        
-        row = {
-            "url": feedback.url,
-            "rating": feedback.rating,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
-        df = pd.DataFrame([row])
-        
-        if os.path.exists(feedback_path):
-            df.to_csv(feedback_path, mode="a", header=False, index=False)
-        else:
-            df.to_csv(feedback_path, index=False)
-        
-        return {
-            "message": "Feedback recorded successfully",
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error saving feedback: {str(e)}")
+    feedback_buffer.add(feedback.url, feedback.rating)
+    return {
+        "message": "Feedback recorded successfully",
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+@app.get("/feedback/stats")
+def feedback_stats():
+    """Estado del buffer de feedback y totales de los contadores agregados"""
+    counters = feedback_buffer.store.load_counters()
+    return {
+        "buffer": {**feedback_buffer.stats, "pending": feedback_buffer.pending()},
+        "articles": int(len(counters["url_ids"])),
+        "clusters": int(len(counters["cluster_ids"])),
+        "events": int(counters["url_counts"][:, 2].sum())
+    }
 
 @app.get("/docs", include_in_schema=False)
 def custom_docs():
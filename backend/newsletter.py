@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from jinja2 import Environment, FileSystemLoader
+
+from nlp import selection
+from nlp.scoring import static_scores, current_scores
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+NEWSLETTER_TEMPLATE = "newsletter.html"
+
+# Columns needed to select and render the newsletter
+NEWSLETTER_COLUMNS = [
+    "title", "url", "source", "language", "cluster", "cluster_name",
+    "final_score", "scraping_date"
+]
+
+_environment = None
+
+
+def get_environment():
+    """Jinja2 environment created once per process (compiled templates are cached)"""
+    global _environment
+    if _environment is None:
+        _environment = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+    return _environment
+
+
+def _mmr_config(selection_cfg):
+    mmr_cfg = (selection_cfg or {}).get("mmr", {})
+    return mmr_cfg if mmr_cfg.get("enabled", False) else None
+
+
+def newsletter_candidates(store, cfg, now=None):
+    """
+    Articles the newsletter picks from: those scraped in the last
+    `newsletter.selection.window_days` (whole archive if unset). The store
+    only reads the scrape-week partitions of the window; the embeddings are
+    read too when MMR is enabled. With `scoring.query_time_recency`,
+    final_score is the current score (stored static part + recency at `now`).
+    """
+    selection_cfg = cfg["newsletter"].get("selection", {})
+    scoring_cfg = cfg.get("scoring", {})
+    query_time = scoring_cfg.get("query_time_recency", False)
+    score_columns = ["static_score", "recency_score"] if query_time else []
+    columns = NEWSLETTER_COLUMNS + score_columns + (["embedding"] if _mmr_config(selection_cfg) else [])
+
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+    window_days = selection_cfg.get("window_days")
+    start_date = now - pd.Timedelta(days=window_days) if window_days else None
+    df = store.read(columns=columns, start_date=start_date)
+    if query_time and len(df):
+        w_recency = scoring_cfg.get("w_recency", 0.0)
+        df["final_score"] = current_scores(
+            static_scores(df, w_recency),
+            pd.to_datetime(df["scraping_date"]).to_numpy(dtype="datetime64[ns]"),
+            w_recency,
+            decay_days=scoring_cfg.get("recency_decay_days", 30),
+            now=now
+        )
+    return df.drop(columns=score_columns)
+
+
+def select_newsletter_articles(df, top_n_per_cluster, selection_cfg=None):
+    """
+    Top N articles per cluster by final_score, best first (argpartition per
+    cluster). If `selection.mmr` is enabled and `df` has embeddings, the
+    picks of each cluster are diversified with MMR.
+    """
+    mmr_cfg = _mmr_config(selection_cfg)
+    embeddings = None
+    if mmr_cfg and "embedding" in df.columns and len(df):
+        embeddings = np.vstack(df["embedding"].values)
+    positions = selection.top_n_per_cluster(
+        df["final_score"].to_numpy(),
+        df["cluster"].to_numpy(),
+        top_n_per_cluster,
+        embeddings=embeddings,
+        diversity=mmr_cfg.get("diversity", 0.3) if mmr_cfg else None,
+        pool_size=mmr_cfg.get("pool_size") if mmr_cfg else None
+    )
+    return df.iloc[positions].drop(columns=["embedding"], errors="ignore")
+
+
+def render_newsletter(articles, title, generated_at=None):
+    generated_at = generated_at or datetime.now(timezone.utc)
+    template = get_environment().get_template(NEWSLETTER_TEMPLATE)
+    return template.render(
+        generated_at=generated_at.strftime("%Y%m%dT%H%MZ"),
+        date=generated_at.strftime("%Y-%m-%d"),
+        articles=articles.to_dict(orient="records"),
+        title=title
+    )
+
+
+def config_fingerprint(cfg):
+    return hashlib.sha1(json.dumps(cfg, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class PreviewCache:
+    """
+    Rendered newsletter preview built from the stored articles, cached under
+    (article-store version, template mtime, config hash). The ETag is derived
+    from the same key, so clients can revalidate with If-None-Match.
+    """
+
+    def __init__(self, store, cfg):
+        self.store = store
+        self.cfg = cfg
+        self.config_hash = config_fingerprint(cfg)
+        self._lock = threading.Lock()
+        self._key = None
+        self._html = None
+        self._etag = None
+        self.stats = {"hits": 0, "misses": 0, "last_render_seconds": None}
+
+    def key(self):
+        template_mtime = os.stat(os.path.join(TEMPLATES_DIR, NEWSLETTER_TEMPLATE)).st_mtime_ns
+        # The candidate window moves with the date
+        return (self.store.version, template_mtime, self.config_hash, datetime.now().date())
+
+    def get(self):
+        """Returns (html, etag)"""
+        key = self.key()
+        if key == self._key:
+            self.stats["hits"] += 1
+            return self._html, self._etag
+
+        with self._lock:
+            if key == self._key:
+                self.stats["hits"] += 1
+                return self._html, self._etag
+
+            start = time.perf_counter()
+            newsletter_cfg = self.cfg["newsletter"]
+            df = newsletter_candidates(self.store, self.cfg)
+            top_articles = select_newsletter_articles(
+                df, newsletter_cfg["top_n_per_cluster"], newsletter_cfg.get("selection")
+            )
+            html = render_newsletter(top_articles, self.cfg["newsletter"]["title"])
+
+            self._html = html
+            self._etag = '"' + hashlib.sha1(repr(key).encode("utf-8")).hexdigest() + '"'
+            self._key = key
+            self.stats["misses"] += 1
+            self.stats["last_render_seconds"] = time.perf_counter() - start
+            return self._html, self._etag
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -26,7 +26,8 @@ from nlp.scoring import (
     compute_final_score
 )
 
-from scripts.utils_storage import load_processed_urls, append_processed_urls
+from scripts.article_store import open_article_store
+from scripts.utils_storage import load_processed_urls
 
 
 def run_pipeline():
@@ -157,24 +158,14 @@ def run_pipeline():
     # PERSISTENCE
     # ==========================================================
 
-    processed_parquet = cfg["data"]["processed_parquet"]
+    store = open_article_store(cfg)
+    store.append(df_new)
 
-    if os.path.exists(processed_parquet):
-        existing = pd.read_parquet(processed_parquet)
-        combined = pd.concat(
-            [existing, df_new],
-            ignore_index=True
-        )
-    else:
-        combined = df_new
-
-    combined.to_parquet(
-        processed_parquet,
-        index=False
+    combined = store.read(
+        columns=["title", "url", "source", "language", "cluster", "final_score", "scraping_date"]
     )
 
-    append_processed_urls(
-        cfg["data"]["processed_urls"],
+    processed_urls.add_many(
         df_new["url"].tolist()
     )
 
@@ -0,0 +1,47 @@
+import os
+import threading
+
+import numpy as np
+
+from scripts.neighbor_store import NO_NEIGHBOR
+
+
+class RelatedIndex:
+    """
+    Neighbour lists of a NeighborStore held in memory (sorted by article id),
+    reloaded only when the neighbour manifest changes. A lookup is a binary
+    search plus a k-sized slice.
+    """
+
+    def __init__(self, neighbor_store):
+        self.neighbor_store = neighbor_store
+        self._lock = threading.Lock()
+        self._key = None
+        self._lookup = None
+
+    def _manifest_key(self):
+        try:
+            st = os.stat(self.neighbor_store.manifest_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def get(self):
+        key = self._manifest_key()
+        if self._lookup is not None and key == self._key:
+            return self._lookup
+        with self._lock:
+            if self._lookup is None or key != self._key:
+                self._lookup = self.neighbor_store.load_lookup()
+                self._key = key
+            return self._lookup
+
+    def related(self, article_id, limit=10):
+        """[(neighbour id, similarity)] best first, or None if the article has no list"""
+        ids, neighbors, similarities = self.get()
+        article_id = np.uint64(article_id)
+        pos = int(np.searchsorted(ids, article_id))
+        if pos == len(ids) or ids[pos] != article_id:
+            return None
+        valid = neighbors[pos] != NO_NEIGHBOR
+        return list(zip(neighbors[pos][valid][:limit].tolist(), similarities[pos][valid][:limit].tolist()))
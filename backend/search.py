@@ -0,0 +1,91 @@
+import os
+import time
+import logging
+from functools import lru_cache
+
+import joblib
+import numpy as np
+
+from backend.article_cache import ARTICLE_COLUMNS, ArticleCache, ArticleSnapshot
+from nlp.vector_index import VectorIndex
+
+logger = logging.getLogger("search")
+
+
+class SearchSnapshot(ArticleSnapshot):
+    """ArticleSnapshot (for filters / records) plus a vector index over its embeddings"""
+
+    def __init__(self, df, version, centroids=None, exact_max_rows=50000, n_probe=3):
+        df = df[df["embedding"].notna()].reset_index(drop=True)
+        embeddings = np.vstack(df.pop("embedding").to_numpy()) if len(df) else np.empty((0, 1), dtype=np.float32)
+        super().__init__(df, version)
+        self.index = VectorIndex(embeddings, centroids=centroids, exact_max_rows=exact_max_rows, n_probe=n_probe)
+
+    def search(self, query_vector, limit=10, **filters):
+        """Returns (rows searched, records with their cosine similarity)"""
+        rows = self.filter_rows(**filters)
+        n_searched = self.n_rows if rows is None else len(rows)
+        if n_searched == 0:
+            return 0, []
+
+        ids, similarities = self.index.search(query_vector, k=limit, rows=rows)
+        records = self.records(ids)
+        for record, similarity in zip(records, similarities):
+            record["similarity"] = float(similarity)
+        return n_searched, records
+
+
+class SearchIndex(ArticleCache):
+    """
+    Vector search over the stored article embeddings, rebuilt (like
+    ArticleCache) only when the store manifest changes. The IVF mode uses
+    the centroids of the current KMeans model.
+    """
+
+    def __init__(self, store, models_dir, exact_max_rows=50000, n_probe=3):
+        super().__init__(store, columns=ARTICLE_COLUMNS + ["embedding"])
+        self.models_dir = models_dir
+        self.exact_max_rows = exact_max_rows
+        self.n_probe = n_probe
+
+    def _load_centroids(self):
+        path = os.path.join(self.models_dir, "kmeans.joblib")
+        if not os.path.exists(path):
+            return None
+        return joblib.load(path).cluster_centers_
+
+    def _build(self, df, version):
+        snapshot = SearchSnapshot(
+            df,
+            version,
+            centroids=self._load_centroids(),
+            exact_max_rows=self.exact_max_rows,
+            n_probe=self.n_probe
+        )
+        logger.info("Search index v%s built: %d vectors (%s)", version, snapshot.n_rows, snapshot.index.mode)
+        return snapshot
+
+    def search(self, query_vector, limit=10, **filters):
+        return self.get().search(query_vector, limit=limit, **filters)
+
+
+# Load time of the query embedder in this process (exported by /metrics)
+embedder_stats = {"model": None, "load_seconds": None}
+
+
+def warm_embedder(model_name):
+    """Process-cached embedder; the first call loads the model and records its load time"""
+    from nlp.embeddings import get_embedder
+
+    loaded = get_embedder.cache_info().currsize > 0
+    start = time.perf_counter()
+    embedder = get_embedder(model_name)
+    if not loaded:
+        embedder_stats.update(model=model_name, load_seconds=time.perf_counter() - start)
+    return embedder
+
+
+@lru_cache(maxsize=1024)
+def embed_query(model_name, text):
+    """Query embedding with the warm (process-cached) embedder; repeated queries skip the model"""
+    return warm_embedder(model_name).encode([text], show_progress_bar=False)[0]
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_sites import SITES, DEFAULT_SOURCES
+
+# Topic vocabularies (ES / EN): articles of a topic share them, so the
+# embeddings have cluster structure
+TOPICS = {
+    "llm": (
+        "modelo lenguaje generativa chatbot entrenamiento parámetros tokens razonamiento asistente "
+        "conversación inferencia ajuste datos respuesta texto",
+        "model language generative chatbot training parameters tokens reasoning assistant "
+        "conversation inference finetuning data answer text",
+    ),
+    "robotics": (
+        "robot robótica brazo sensores fábrica automatización humanoide movimiento motores "
+        "manipulación almacén industrial cámara navegación piezas",
+        "robot robotics arm sensors factory automation humanoid motion motors "
+        "manipulation warehouse industrial camera navigation parts",
+    ),
+    "chips": (
+        "chip procesador semiconductores nanómetros fabricación gpu memoria silicio rendimiento "
+        "consumo transistores centro datos acelerador oblea",
+        "chip processor semiconductors nanometers manufacturing gpu memory silicon performance "
+        "power transistors datacenter accelerator wafer",
+    ),
+    "regulation": (
+        "ley regulación gobierno europea derechos privacidad multa normativa comisión tribunal "
+        "transparencia riesgo cumplimiento autoridad sanción",
+        "law regulation government european rights privacy fine rules commission court "
+        "transparency risk compliance authority sanction",
+    ),
+    "health": (
+        "salud médicos hospital diagnóstico pacientes imagen enfermedad tratamiento clínico "
+        "fármacos ensayo radiología detección cáncer genética",
+        "health doctors hospital diagnosis patients imaging disease treatment clinical "
+        "drugs trial radiology detection cancer genetics",
+    ),
+    "cloud": (
+        "nube servidores plataforma servicio infraestructura despliegue contenedores almacenamiento "
+        "clientes región escalado costes migración empresa seguridad",
+        "cloud servers platform service infrastructure deployment containers storage "
+        "customers region scaling costs migration enterprise security",
+    ),
+    "mobility": (
+        "coche autónomo conducción vehículo eléctrico tráfico carretera batería flota sensores "
+        "ciudad transporte lidar seguridad pruebas",
+        "car autonomous driving vehicle electric traffic road battery fleet sensors "
+        "city transport lidar safety testing",
+    ),
+    "security": (
+        "ciberseguridad ataque vulnerabilidad contraseñas malware datos filtración red hackers "
+        "cifrado detección amenaza parche usuarios phishing",
+        "cybersecurity attack vulnerability passwords malware data breach network hackers "
+        "encryption detection threat patch users phishing",
+    ),
+}
+
+# Function words: what makes langdetect recognise the language
+FILLER = {
+    "es": (
+        "el la de que y en los se del las por un para con una su al lo como más pero sus le ya "
+        "o este porque esta entre cuando muy sin sobre también hasta hay donde desde todo nos "
+        "durante todos uno les ni contra otros ese eso ante ellos esto antes algunos unos otro "
+        "otras otra tanto esa estos mucho nada muchos cual poco ella estar estas algunas algo "
+        "nosotros ser puede tiene según año nuevo nueva empresas sistema"
+    ),
+    "en": (
+        "the of and to in a is that for it as was with be by on not he this are or his from at "
+        "which but have an they you were her she there been one all would their has will more "
+        "when if no out so said what up its about into than them can only other new some could "
+        "time these two may then do first any my now such like our over company system year"
+    ),
+}
+
+TOPIC_WORD_SHARE = 0.35
+WORDS_PER_PARAGRAPH = 45
+
+
+def _vocabulary(language, topic):
+    topic_words = TOPICS[topic][0 if language == "es" else 1].split()
+    filler_words = FILLER[language].split()
+    words = np.array(topic_words + filler_words, dtype=object)
+    p = np.concatenate([
+        np.full(len(topic_words), TOPIC_WORD_SHARE / len(topic_words)),
+        np.full(len(filler_words), (1 - TOPIC_WORD_SHARE) / len(filler_words)),
+    ])
+    return words, topic_words, p
+
+
+def _paragraphs(words):
+    chunks = [" ".join(words[i:i + WORDS_PER_PARAGRAPH]) for i in range(0, len(words), WORDS_PER_PARAGRAPH)]
+    return "\n".join(c[0].upper() + c[1:] + "." for c in chunks)
+
+
+def generate_articles(n, seed=0, sources=None, words=180, days=60, now=None, start_index=0):
+    """
+    n synthetic articles (DataFrame: source, url, title, content, scraping_date,
+    language, topic). Each source writes in its site's language; content
+    paragraphs are separated by newlines (rendered as <p> by FakeSites).
+    """
+    rng = np.random.default_rng(seed)
+    sources = sources or DEFAULT_SOURCES
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now().floor("s")
+    topic_names = list(TOPICS)
+
+    article_sources = np.array(sources, dtype=object)[rng.integers(len(sources), size=n)]
+    languages = np.array([SITES[s].language for s in article_sources], dtype=object)
+    topics = np.array(topic_names, dtype=object)[rng.integers(len(topic_names), size=n)]
+    ages = pd.to_timedelta(rng.uniform(0, days * 86400, size=n).astype(np.int64), unit="s")
+
+    titles = np.empty(n, dtype=object)
+    contents = np.empty(n, dtype=object)
+    for language in ("es", "en"):
+        for topic in topic_names:
+            rows = np.flatnonzero((languages == language) & (topics == topic))
+            if not len(rows):
+                continue
+            vocabulary, topic_words, p = _vocabulary(language, topic)
+            body = vocabulary[rng.choice(len(vocabulary), size=(len(rows), words), p=p)]
+            heads = np.array(topic_words, dtype=object)[rng.integers(len(topic_words), size=(len(rows), 6))]
+            for row, body_words, head_words in zip(rows, body, heads):
+                contents[row] = _paragraphs(body_words)
+                titles[row] = " ".join(head_words).capitalize()
+
+    indices = np.arange(start_index, start_index + n)
+    urls = [
+        SITES[source].article_url(f"{topic}-{index:07d}")
+        for source, topic, index in zip(article_sources, topics, indices)
+    ]
+    return pd.DataFrame({
+        "source": article_sources,
+        "url": urls,
+        "title": titles,
+        "content": contents,
+        "scraping_date": now - ages,
+        "language": languages,
+        "topic": topics,
+    })
+
+
+def iter_corpus(n, batch_size=10000, seed=0, batch_days=7, now=None, **kwargs):
+    """
+    The corpus as weekly batches of `batch_size` articles, oldest first:
+    batch i covers `batch_days` days, like the articles of one weekly run
+    """
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now().floor("s")
+    starts = range(0, n, batch_size)
+    for batch, start in enumerate(starts):
+        yield generate_articles(
+            min(batch_size, n - start),
+            seed=seed + batch,
+            days=batch_days,
+            now=now - pd.Timedelta(days=batch_days * (len(starts) - 1 - batch)),
+            start_index=start,
+            **kwargs
+        )
@@ -0,0 +1,20 @@
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+
+class HashingEmbedder:
+    """
+    Stand-in for SentenceTransformerEmbedder in benchmarks: hashed word
+    counts in `dim` dimensions. Deterministic, no model download, same
+    encode() interface and L2-normalised float32 output.
+    """
+
+    def __init__(self, dim=384):
+        self.model_id = f"hashing-{dim}"
+        self.vectorizer = HashingVectorizer(n_features=dim, alternate_sign=False, norm=None)
+
+    def encode(self, texts, show_progress_bar=False):
+        X = self.vectorizer.transform(texts)
+        X.data = np.log1p(X.data)
+        return normalize(X).toarray().astype(np.float32)
@@ -0,0 +1,272 @@
+import html
+import socket
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from scraping.sources.scraper_xataka import XatakaScraper
+from scraping.sources.scraper_techcrunch import TechCrunchScraper
+from scraping.sources.scraper_aws import AWSScraper
+from scraping.sources.scraper_huggingface import HuggingFaceScraper
+from scraping.sources.scraper_wired import WiredScraper
+from scraping.sources.scraper_microsoft import MicrosoftNewsScraper
+from scraping.sources.scraper_aibusiness import AIBusinessScraper
+from scraping.sources.scraper_openai import OpenAIScraper
+
+logger = logging.getLogger("fake_sites")
+
+
+class Site:
+    """
+    Listing / article page layout of one source, with the markup its
+    scraper selects (listing links and article paragraphs)
+    """
+
+    def __init__(self, source, host, language, listing_url, article_url, link_html, body_class,
+                 make_scraper, paginated=True):
+        self.source = source
+        self.host = host
+        self.language = language
+        self.listing_url = listing_url      # page number (1-based) -> absolute url
+        self.article_url = article_url      # slug -> absolute url
+        self.link_html = link_html          # format string with {url}, {path}, {title}
+        self.body_class = body_class
+        self.make_scraper = make_scraper    # (n_pages, page_size) -> scraper that crawls exactly those pages
+        self.paginated = paginated
+
+    def render_listing(self, articles):
+        links = "\n".join(
+            self.link_html.format(url=a["url"], path=urlsplit(a["url"]).path, title=html.escape(a["title"]))
+            for a in articles
+        )
+        return f"<html><body><main>\n{links}\n</main><footer><a href=\"/about\">About</a></footer></body></html>"
+
+    def render_article(self, article):
+        paragraphs = "\n".join(f"<p>{html.escape(p)}</p>" for p in article["content"].split("\n"))
+        return (
+            f"<html><head><title>{html.escape(article['title'])}</title></head><body>"
+            f"<h1>{html.escape(article['title'])}</h1>"
+            f"<div class=\"{self.body_class}\">\n{paragraphs}\n</div></body></html>"
+        )
+
+
+def _xataka_listing(page, page_size=20):
+    base = "https://www.xataka.com/categoria/robotica-e-ia"
+    return base if page == 1 else f"{base}/record/{(page - 1) * page_size}"
+
+
+SITES = {
+    site.source: site for site in [
+        Site(
+            "Xataka", "www.xataka.com", "es",
+            listing_url=_xataka_listing,
+            article_url=lambda slug: f"https://www.xataka.com/robotica-e-ia/{slug}",
+            link_html="<article><a href=\"{url}\">{title}</a></article>",
+            body_class="article-content",
+            make_scraper=lambda n_pages, page_size: XatakaScraper(
+                sections=[("categoria", "robotica-e-ia")],
+                max_records=n_pages * page_size, step=page_size, sleep_time=0
+            )
+        ),
+        Site(
+            "Wired ES", "es.wired.com", "es",
+            listing_url=lambda page, page_size=20: f"https://es.wired.com/tag/inteligencia-artificial?page={page}",
+            article_url=lambda slug: f"https://es.wired.com/articulos/{slug}",
+            link_html="<div class=\"summary-item\"><a href=\"{path}\">{title}</a></div>",
+            body_class="body__inner-container",
+            make_scraper=lambda n_pages, page_size: WiredScraper(max_pages=n_pages + 1)
+        ),
+        Site(
+            "AWS Blog", "aws.amazon.com", "es",
+            listing_url=lambda page, page_size=20: (
+                "https://aws.amazon.com/es/blogs/machine-learning/" if page == 1
+                else f"https://aws.amazon.com/es/blogs/machine-learning/page/{page}/"
+            ),
+            article_url=lambda slug: f"https://aws.amazon.com/es/blogs/machine-learning/{slug}/",
+            link_html="<h2 class=\"blog-post-title\"><a href=\"{url}\">{title}</a></h2>",
+            body_class="blog-post-content",
+            make_scraper=lambda n_pages, page_size: AWSScraper(
+                blogs=["machine-learning"], lang="es", max_pages=n_pages + 1, sleep_time=0
+            )
+        ),
+        Site(
+            "OpenAI Blog", "openai.com", "es",
+            listing_url=lambda page, page_size=20: "https://openai.com/es-ES/news/",
+            article_url=lambda slug: f"https://openai.com/es-ES/news/{slug}/",
+            link_html="<a href=\"{path}\">{title}</a>",
+            body_class="article-body",
+            make_scraper=lambda n_pages, page_size: OpenAIScraper(),
+            paginated=False
+        ),
+        Site(
+            "TechCrunch", "techcrunch.com", "en",
+            listing_url=lambda page, page_size=20: (
+                "https://techcrunch.com/tag/artificial-intelligence/" if page == 1
+                else f"https://techcrunch.com/tag/artificial-intelligence/page/{page}/"
+            ),
+            article_url=lambda slug: f"https://techcrunch.com/2025/01/15/{slug}/",
+            link_html="<a class=\"loop-card__title-link\" href=\"{url}\">{title}</a>",
+            body_class="entry-content",
+            make_scraper=lambda n_pages, page_size: TechCrunchScraper(
+                tags=["artificial-intelligence"], max_pages=n_pages + 1
+            )
+        ),
+        Site(
+            "Microsoft News (AI)", "news.microsoft.com", "en",
+            listing_url=lambda page, page_size=20: (
+                "https://news.microsoft.com/feed/?categories=ai" if page == 1
+                else f"https://news.microsoft.com/feed/?categories=ai&_paged={page}"
+            ),
+            article_url=lambda slug: f"https://news.microsoft.com/source/features/ai/{slug}/",
+            link_html="<div class=\"listingResult\"><a href=\"{url}\">{title}</a></div>",
+            body_class="entry-content",
+            make_scraper=lambda n_pages, page_size: MicrosoftNewsScraper(max_pages=n_pages + 1, sleep_time=0)
+        ),
+        Site(
+            "AI Business", "aibusiness.com", "en",
+            listing_url=lambda page, page_size=20: (
+                "https://aibusiness.com" if page == 1 else f"https://aibusiness.com/page/{page}/"
+            ),
+            article_url=lambda slug: f"https://aibusiness.com/ml/{slug}",
+            link_html="<h3 class=\"listing-title\"><a href=\"{path}\">{title}</a></h3>",
+            body_class="article-content",
+            make_scraper=lambda n_pages, page_size: AIBusinessScraper(max_pages=n_pages + 1, sleep_time=0)
+        ),
+        # Its scraper always sleeps 0-3 s between pages: not in the default benchmark sources
+        Site(
+            "Hugging Face Blog", "huggingface.co", "en",
+            listing_url=lambda page, page_size=20: (
+                "https://huggingface.co/blog" if page == 1 else f"https://huggingface.co/blog?p={page}"
+            ),
+            article_url=lambda slug: f"https://huggingface.co/blog/{slug}",
+            link_html="<article><a href=\"{path}\">{title}</a></article>",
+            body_class="prose",
+            make_scraper=lambda n_pages, page_size: HuggingFaceScraper(max_pages=n_pages + 1, sleep_time=0)
+        ),
+    ]
+}
+
+DEFAULT_SOURCES = [source for source in SITES if source != "Hugging Face Blog"]
+
+
+class _LocalSitesAdapter(HTTPAdapter):
+    """Sends https://<host>/<path> requests to http://<local server>/<host>/<path>"""
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        query = f"?{parts.query}" if parts.query else ""
+        request.url = f"{self.base_url}/{parts.netloc}{parts.path or '/'}{query}"
+        return super().send(request, **kwargs)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes: without this, Nagle + delayed ACK add ~40 ms per request
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        # /<host>/<path>?<query> -> the https url the scraper asked for
+        body = self.server.pages.get("https:/" + self.path)
+        if body is None and self.path.endswith("/"):
+            body = self.server.pages.get("https:/" + self.path.rstrip("/"))
+        status = 200 if body is not None else 404
+        body = body if body is not None else b"<html><body><h1>Not found</h1></body></html>"
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeSites:
+    """
+    Local HTTP stand-in for the scraped sites. Each article of `articles`
+    (records with source, url, title and content; paragraphs separated by
+    newlines) is listed on its source's listing pages, `page_size` per page,
+    followed by one empty page, and served as an article page.
+
+        with FakeSites(articles) as sites:
+            for scraper in sites.scrapers():
+                links = scraper.get_article_links()
+
+    The scrapers returned by scrapers() are the project's own, configured to
+    crawl exactly these pages, with their session routed to the local server.
+    """
+
+    def __init__(self, articles, page_size=20, host="127.0.0.1", port=0):
+        self.page_size = page_size
+        self.by_source = {}
+        for article in articles:
+            if article["source"] not in SITES:
+                raise ValueError(f"No fake site for source: {article['source']}")
+            self.by_source.setdefault(article["source"], []).append(article)
+
+        self.pages = {}
+        for source, source_articles in self.by_source.items():
+            site = SITES[source]
+            per_page = page_size if site.paginated else len(source_articles)
+            # Paginated listings end with one empty page (the scrapers stop there)
+            last_page = self.n_pages(source) + 1 if site.paginated else 1
+            for page in range(1, last_page + 1):
+                listed = source_articles[(page - 1) * per_page:page * per_page]
+                self.pages[site.listing_url(page, page_size)] = site.render_listing(listed).encode("utf-8")
+            for article in source_articles:
+                self.pages[article["url"]] = site.render_article(article).encode("utf-8")
+
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.pages = self.pages
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def n_pages(self, source):
+        if not SITES[source].paginated:
+            return 1
+        return -(-len(self.by_source[source]) // self.page_size)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-sites", daemon=True)
+        self._thread.start()
+        logger.info("Serving %d fake pages at %s", len(self.pages), self.base_url)
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def scrapers(self):
+        """{source: scraper} for every source with articles"""
+        adapter = _LocalSitesAdapter(self.base_url)
+        scrapers = {}
+        for source in self.by_source:
+            site = SITES[source]
+            scraper = site.make_scraper(self.n_pages(source), self.page_size)
+            scraper.session.mount(f"https://{site.host}", adapter)
+            scrapers[source] = scraper
+        return scrapers
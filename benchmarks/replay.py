@@ -0,0 +1,317 @@
+"""
+Replay of the weekly pipeline on a frozen snapshot, for A/B comparisons of
+code changes on identical input.
+
+    python -m benchmarks.replay capture data/snapshots/2025-W02            # live sites
+    python -m benchmarks.replay capture /tmp/snap --fake 500               # local fake sites
+    python -m benchmarks.replay run data/snapshots/2025-W02 --output a.json
+    python -m benchmarks.replay run data/snapshots/2025-W02 --baseline a.json
+
+A snapshot holds the scraped articles of one run, the models they are
+clustered with and the pinned "now" of the run:
+
+    <snapshot>/snapshot.json      now, article count, snapshot id
+    <snapshot>/articles.parquet   scraped articles (before normalization)
+    <snapshot>/models/            kmeans / TF-IDF models at capture time
+
+A replay runs every stage after scraping (normalize, embed, cluster, score,
+select, render) offline: recency is computed against the pinned now, the
+models are never updated, language detection is seeded and nothing is
+written to the article store. The report holds the stage timings and a
+digest of the results, so two replays of a snapshot can be compared for
+both speed and output.
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from config.load_config import load_config
+from benchmarks.corpus import generate_articles
+from benchmarks.embedder import HashingEmbedder
+from benchmarks.fake_sites import FakeSites
+from benchmarks.run_benchmarks import RESULTS_DIR, compare_reports
+from scraping.scraper_base import BaseScraper
+from nlp.clustering import fit_kmeans
+from backend.newsletter import select_newsletter_articles, render_newsletter
+from scripts.instrumentation import RunReport
+from scripts.utils_storage import load_processed_urls
+from scripts.weekly_tasks import OFFLINE_SITES
+from scripts.run_weekly_pipeline import (
+    enabled_sources,
+    build_scrapers,
+    collect_new_links,
+    scrape_links,
+    normalize_articles,
+    embed_articles,
+    cluster_articles,
+    score_articles,
+)
+
+logger = logging.getLogger("replay")
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_MODELS = ["kmeans.joblib", "tfidf_vectorizer.joblib", "cluster_tfidf_state.joblib"]
+RESULT_COLUMNS = [
+    "url", "cluster", "similarity_to_centroid", "novelty_score", "recency_score", "source_score", "final_score"
+]
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def results_digest(df):
+    """Digest of the scored articles (url, cluster and scores rounded to 1e-9)"""
+    results = df[RESULT_COLUMNS].sort_values("url").reset_index(drop=True)
+    scores = results.drop(columns=["url", "cluster"]).to_numpy(dtype=np.float64).round(9)
+    digest = hashlib.sha256()
+    digest.update("\n".join(results["url"]).encode("utf-8"))
+    digest.update(results["cluster"].to_numpy(dtype=np.int64).tobytes())
+    digest.update(scores.tobytes())
+    return digest.hexdigest()
+
+
+# ----------------------------------------------------------------------
+# Capture
+# ----------------------------------------------------------------------
+
+def save_snapshot(path, articles, now, models_dir=None, **meta):
+    """Write a snapshot of scraped `articles` (list of dicts) pinned at `now`"""
+    os.makedirs(path, exist_ok=True)
+    df = pd.DataFrame(articles).sort_values("url").reset_index(drop=True)
+    articles_path = os.path.join(path, "articles.parquet")
+    df.to_parquet(articles_path, index=False)
+
+    snapshot_models = os.path.join(path, "models")
+    os.makedirs(snapshot_models, exist_ok=True)
+    copied = []
+    for name in SNAPSHOT_MODELS:
+        if models_dir and os.path.exists(os.path.join(models_dir, name)):
+            shutil.copy2(os.path.join(models_dir, name), os.path.join(snapshot_models, name))
+            copied.append(name)
+
+    now = pd.Timestamp(now)
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "now": now.isoformat(),
+        "articles": int(len(df)),
+        "sources": {k: int(v) for k, v in df["source"].value_counts().items()} if len(df) else {},
+        "models": copied,
+        "snapshot_id": hashlib.sha256(
+            (_file_digest(articles_path) + now.isoformat()).encode("utf-8")
+        ).hexdigest()[:16],
+        **meta,
+    }
+    with open(os.path.join(path, "snapshot.json"), "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+    logger.info("Snapshot %s: %d articles at %s", snapshot["snapshot_id"], len(df), path)
+    return snapshot
+
+
+def capture(path, cfg, fake_articles=None, seed=0):
+    """
+    Scrape the new articles of a weekly run into a snapshot: from the
+    configured live sites, or with `fake_articles` from local fake sites
+    (of the same sources) serving that many synthetic articles
+    """
+    now = pd.Timestamp.now().floor("s")
+    if fake_articles:
+        sources = [OFFLINE_SITES[source] for source in enabled_sources(cfg["scraping"])]
+        corpus = generate_articles(fake_articles, seed=seed, sources=sources, days=7, now=now)
+        with FakeSites(corpus.to_dict("records")) as sites:
+            scrapers = list(sites.scrapers().values())
+            articles = scrape_links(scrapers, collect_new_links(scrapers, set()))
+    else:
+        scrapers = build_scrapers(cfg["scraping"])
+        processed_urls = load_processed_urls(cfg["data"]["processed_urls_path"])
+        articles = scrape_links(scrapers, collect_new_links(scrapers, processed_urls))
+    return save_snapshot(
+        path, articles, now,
+        models_dir=cfg["paths"]["models_dir"],
+        mode="fake" if fake_articles else "live",
+        fetch=BaseScraper.fetch_stats_snapshot()
+    )
+
+
+# ----------------------------------------------------------------------
+# Replay
+# ----------------------------------------------------------------------
+
+def load_snapshot(path):
+    """(snapshot metadata, scraped articles as a list of dicts)"""
+    with open(os.path.join(path, "snapshot.json"), "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    if snapshot.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {snapshot.get('format')}")
+    df = pd.read_parquet(os.path.join(path, "articles.parquet"))
+    return snapshot, df.to_dict("records")
+
+
+def replay(path, cfg, report, workdir, model=None, out_dir=None):
+    """
+    Run the stages after scraping on the snapshot at `path`; returns the
+    scored articles. The snapshot models are copied to `workdir` (a KMeans
+    model is fitted there if the snapshot has none). With `out_dir` the
+    scored articles and the newsletter HTML are saved there.
+    """
+    from langdetect import DetectorFactory
+
+    # langdetect is randomised unless seeded
+    DetectorFactory.seed = 0
+
+    span = report.stage("load_snapshot")
+    snapshot, articles = load_snapshot(path)
+    now = pd.Timestamp(snapshot["now"])
+    span.items = len(articles)
+    report.add_section("snapshot", {"path": path, **{k: v for k, v in snapshot.items() if k != "fetch"}})
+
+    models_dir = os.path.join(workdir, "models")
+    shutil.copytree(os.path.join(path, "models"), models_dir, dirs_exist_ok=True)
+    cfg = {**cfg, "paths": {**cfg["paths"], "models_dir": models_dir}}
+    # Live feedback is not part of the snapshot
+    cfg["scoring"] = {**cfg["scoring"], "w_engagement": 0.0}
+
+    report.stage("normalize", items=len(articles))
+    df = normalize_articles(articles)
+
+    span = report.stage("embed", items=len(df))
+    embedder = None if model else HashingEmbedder()
+    df, embeddings = embed_articles(df, model, report, embedder=embedder)
+    span.info["model"] = model or embedder.model_id
+
+    span = report.stage("cluster", items=len(df))
+    kmeans_path = os.path.join(models_dir, "kmeans.joblib")
+    if not os.path.exists(kmeans_path):
+        k = min(cfg["clustering"].get("n_clusters", 6), len(df))
+        kmeans, _, _ = fit_kmeans(embeddings, k)
+        joblib.dump(kmeans, kmeans_path)
+        span.info["bootstrapped_k"] = k
+    df, centroids, _ = cluster_articles(cfg, df, embeddings, update_model=False)
+
+    report.stage("score", items=len(df))
+    df = score_articles(cfg, df, embeddings, centroids, now=now)
+
+    report.stage("select", items=len(df))
+    selected = select_newsletter_articles(
+        df, cfg["newsletter"]["top_n_per_cluster"], cfg["newsletter"].get("selection")
+    )
+
+    report.stage("render", items=len(selected))
+    html = render_newsletter(selected, cfg["newsletter"]["title"], generated_at=now.to_pydatetime())
+
+    report.stage("results")
+    report.add_section("results", {
+        "articles": int(len(df)),
+        "digest": results_digest(df),
+        "embeddings_digest": hashlib.sha256(np.ascontiguousarray(embeddings, dtype=np.float32).tobytes()).hexdigest(),
+        "selected": selected["url"].tolist(),
+        "html_digest": hashlib.sha256(html.encode("utf-8")).hexdigest(),
+    })
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+        df.drop(columns=["embedding", "text_for_embedding"]).to_parquet(
+            os.path.join(out_dir, "scored.parquet"), index=False
+        )
+        with open(os.path.join(out_dir, "newsletter.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+    return df
+
+
+def main(snapshot, output=None, out_dir=None, model=None, baseline=None, max_slowdown=1.5):
+    """Replay `snapshot`, save the JSON report and return it (with the baseline comparison if given)"""
+    cfg = load_config(os.path.join(PROJECT_ROOT, "config", "config.yaml"))
+    report = RunReport("replay")
+    report.add_section("params", {"model": model})
+
+    workdir = tempfile.mkdtemp(prefix="newsletter-replay-")
+    error = None
+    try:
+        replay(snapshot, cfg, report, workdir, model=model, out_dir=out_dir)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        report.finish("failed" if error is not None else "completed", error=error)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+        result = report.to_dict()
+        if baseline:
+            with open(baseline, "r", encoding="utf-8") as f:
+                baseline_result = json.load(f)
+            report.add_section("comparison", {
+                "baseline": baseline,
+                "max_slowdown": max_slowdown,
+                "same_snapshot": (
+                    baseline_result.get("snapshot", {}).get("snapshot_id")
+                    == result.get("snapshot", {}).get("snapshot_id")
+                ),
+                "same_params": baseline_result.get("params") == result["params"],
+                "same_results": (
+                    baseline_result.get("results", {}).get("digest")
+                    == result.get("results", {}).get("digest")
+                ),
+                "stages": compare_reports(result, baseline_result, max_slowdown=max_slowdown),
+            })
+        report.save(output or os.path.join(RESULTS_DIR, f"replay_{report.run_id}.json"))
+
+    return report.to_dict()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Snapshot capture and deterministic replay of the weekly pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    capture_parser = commands.add_parser("capture", help="Scrape a weekly run into a snapshot")
+    capture_parser.add_argument("snapshot", help="Snapshot directory")
+    capture_parser.add_argument("--fake", type=int, default=None,
+                                help="Scrape this many synthetic articles from local fake sites instead")
+    capture_parser.add_argument("--seed", type=int, default=0)
+
+    run_parser = commands.add_parser("run", help="Replay the stages after scraping on a snapshot")
+    run_parser.add_argument("snapshot", help="Snapshot directory")
+    run_parser.add_argument("--model", default=None,
+                            help="Embedding model key (nlp.embeddings.EMBEDDING_MODELS); default: hashing stub")
+    run_parser.add_argument("--output", default=None, help="Report JSON (default: benchmarks/results/)")
+    run_parser.add_argument("--out-dir", default=None, help="Save the scored articles and newsletter HTML here")
+    run_parser.add_argument("--baseline", default=None, help="Previous replay report to compare against")
+    run_parser.add_argument("--max-slowdown", type=float, default=1.5,
+                            help="Per-item slowdown vs the baseline flagged as a regression")
+    args = parser.parse_args()
+
+    if args.command == "capture":
+        capture(args.snapshot, load_config(os.path.join(PROJECT_ROOT, "config", "config.yaml")),
+                fake_articles=args.fake, seed=args.seed)
+        sys.exit(0)
+
+    result = main(
+        args.snapshot,
+        output=args.output,
+        out_dir=args.out_dir,
+        model=args.model,
+        baseline=args.baseline,
+        max_slowdown=args.max_slowdown
+    )
+    comparison = result.get("comparison", {})
+    if comparison and not comparison["same_results"]:
+        logger.warning("Results differ from the baseline")
+    regressions = [row["stage"] for row in comparison.get("stages", []) if row["regression"]]
+    if regressions:
+        logger.error("Regressions vs baseline: %s", ", ".join(regressions))
+        sys.exit(1)
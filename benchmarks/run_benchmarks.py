@@ -0,0 +1,384 @@
+"""
+End-to-end benchmark of the pipeline stages on a synthetic ES/EN corpus.
+
+    python -m benchmarks.run_benchmarks --articles 10000
+    python -m benchmarks.run_benchmarks --articles 100000 --baseline benchmarks/results/<previous>.json
+
+Stages: corpus generation, link collection and scraping against local fake
+sites (the project's scrapers and get_soup over HTTP), normalize_article,
+embedding, find_optimal_k, clustering, compute_novelty_scores, scoring,
+persistence (article store and neighbour lists), API queries and vector
+search. Results are a RunReport JSON (wall / CPU time, RSS, items/s per
+stage) plus per-source fetch statistics and per-route API latencies.
+
+Stages whose cost is per article in Python or quadratic run on a capped
+number of rows (--scrape-articles, --normalize-rows, --k-rows,
+--neighbor-rows); the items of each stage record how many rows it saw.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from config.load_config import load_config
+from benchmarks.corpus import iter_corpus
+from benchmarks.embedder import HashingEmbedder
+from benchmarks.fake_sites import FakeSites, DEFAULT_SOURCES
+from scraping.scraper_base import BaseScraper
+from scraping.normalization import normalize_article
+from nlp.preprocessing import basic_preprocess
+from nlp.clustering import find_optimal_k, fit_kmeans
+from nlp.scoring import compute_novelty_scores, compute_recency_score, compute_source_score, compute_final_score
+from scripts.instrumentation import RunReport
+from scripts.article_store import ArticleStore
+from scripts.neighbor_store import NeighborStore, article_ids, format_article_id
+
+logger = logging.getLogger("benchmarks")
+
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+
+# Stages faster than this are not compared against the baseline (timer noise)
+MIN_COMPARE_SECONDS = 0.05
+
+
+def _latency_summary(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {
+        "count": int(len(ms)),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def bench_fetch(report, articles, page_size):
+    """Link collection and article scraping with the real scrapers against FakeSites"""
+    BaseScraper.reset_fetch_stats()
+    with FakeSites(articles, page_size=page_size) as sites:
+        scrapers = sites.scrapers()
+
+        span = report.stage("collect_links")
+        links = {source: scraper.get_article_links() for source, scraper in scrapers.items()}
+        span.items = sum(len(v) for v in links.values())
+
+        span = report.stage("scrape", items=span.items)
+        scraped = [
+            article
+            for source, source_links in links.items()
+            for article in map(scrapers[source].scrape_article, source_links)
+            if article is not None
+        ]
+        span.info["scraped"] = len(scraped)
+        span.info["expected"] = len(articles)
+
+    report.add_section("fetch", BaseScraper.fetch_stats_snapshot())
+    return scraped
+
+
+def bench_api(report, workdir, cfg, articles, n_queries, seed, related_rows):
+    """Query latencies of the FastAPI app over the benchmark store (in-process TestClient)"""
+    from fastapi.testclient import TestClient
+    import backend.main as api
+
+    api.cfg["data"].update(
+        store_dir=os.path.join(workdir, "store"),
+        neighbors_dir=os.path.join(workdir, "neighbors"),
+        newsletters_dir=os.path.join(workdir, "newsletters"),
+    )
+    api.cfg["paths"]["models_dir"] = os.path.join(workdir, "models")
+    api.cfg.setdefault("api", {}).setdefault("search", {})["preload_embedder"] = False
+    api.cfg["api"]["query_engine"] = cfg.get("api", {}).get("query_engine", "memory")
+
+    rng = np.random.default_rng(seed)
+    sources = sorted(articles["source"].unique())
+    clusters = sorted(articles["cluster"].unique())
+    # Only the first related_rows articles have neighbour lists
+    related_urls = articles["url"].head(related_rows).sample(n_queries, replace=True, random_state=seed)
+    ids = [format_article_id(i) for i in article_ids(related_urls)]
+
+    def queries():
+        for i in range(n_queries):
+            kind = i % 5
+            if kind == 0:
+                yield "/articles", {"limit": 20, "sort": "score"}
+            elif kind == 1:
+                yield "/articles", {"limit": 20, "sort": "date", "source": sources[rng.integers(len(sources))]}
+            elif kind == 2:
+                yield "/articles", {"limit": 20, "cluster": int(clusters[rng.integers(len(clusters))])}
+            elif kind == 3:
+                yield "/articles/top", {"limit": 10, "cluster": int(clusters[rng.integers(len(clusters))])}
+            else:
+                yield "/articles/{article_id}/related", {"article_id": ids[i]}
+
+    latencies = {}
+    with TestClient(api.app) as client:
+        report.stage("api_cache_load")
+        client.get("/articles", params={"limit": 1}).raise_for_status()
+
+        span = report.stage("api_queries", items=n_queries)
+        for route, params in queries():
+            url = route.format(**params) if "{" in route else route
+            start = time.perf_counter()
+            response = client.get(url, params={k: v for k, v in params.items() if k != "article_id"})
+            latencies.setdefault(route, []).append(time.perf_counter() - start)
+            response.raise_for_status()
+
+            # Keyset pagination: follow the cursor of sorted pages once
+            if route == "/articles" and "sort" in params and response.json().get("next_cursor"):
+                start = time.perf_counter()
+                client.get(url, params={**params, "cursor": response.json()["next_cursor"]}).raise_for_status()
+                latencies.setdefault("/articles?cursor", []).append(time.perf_counter() - start)
+
+    span.info["routes"] = {route: _latency_summary(seconds) for route, seconds in latencies.items()}
+
+
+def bench_search(report, store, models_dir, embedder, articles, n_queries, seed):
+    from backend.search import SearchIndex
+
+    index = SearchIndex(store, models_dir)
+    span = report.stage("search_index_load")
+    snapshot = index.get()
+    span.items = snapshot.n_rows
+    span.info["mode"] = snapshot.index.mode
+
+    queries = articles["title"].sample(n_queries, replace=True, random_state=seed).tolist()
+    span = report.stage("search", items=n_queries)
+    latencies = []
+    for vector in embedder.encode(queries):
+        start = time.perf_counter()
+        index.search(vector, limit=10)
+        latencies.append(time.perf_counter() - start)
+    span.info["latency"] = _latency_summary(latencies)
+
+
+def run_benchmark(report, workdir, cfg, n_articles=10000, batch_size=10000, seed=0, sources=None, words=180,
+                  scrape_articles=200, page_size=20, normalize_rows=2000, k_rows=5000, k_min=3, k_max=10,
+                  neighbor_rows=20000, api_queries=200, search_queries=200, model=None):
+    scoring_cfg = cfg["scoring"]
+    models_dir = os.path.join(workdir, "models")
+    os.makedirs(models_dir, exist_ok=True)
+
+    span = report.stage("generate", items=n_articles)
+    batches = list(iter_corpus(n_articles, batch_size=batch_size, seed=seed, sources=sources, words=words))
+    span.info["batches"] = len(batches)
+
+    # Fetch: listing pages + article pages of the first articles
+    sample = batches[0].head(scrape_articles)
+    bench_fetch(report, sample.to_dict("records"), page_size)
+
+    span = report.stage("normalize", items=min(normalize_rows, n_articles))
+    records = pd.concat(batches[:-(-normalize_rows // batch_size)], ignore_index=True).head(normalize_rows).to_dict("records")
+    normalized = [normalize_article(dict(r)) for r in records]
+    span.info["valid"] = sum(a["is_valid"] for a in normalized)
+    span.info["language_accuracy"] = float(np.mean([a["language"] == r["language"] for a, r in zip(normalized, records)]))
+
+    span = report.stage("embed", items=n_articles)
+    with report.span("embed_model_load"):
+        if model:
+            from nlp.embeddings import SentenceTransformerEmbedder
+            embedder = SentenceTransformerEmbedder(model)
+        else:
+            embedder = HashingEmbedder()
+    span.info["model"] = embedder.model_id
+    with report.span("embed_encode", items=n_articles):
+        embeddings = [
+            np.asarray(embedder.encode((b["title"] + ". " + b["content"]).apply(basic_preprocess).tolist(),
+                                       show_progress_bar=False), dtype=np.float32)
+            for b in batches
+        ]
+
+    k_sample = np.vstack(embeddings[:-(-k_rows // batch_size)])[:k_rows]
+    span = report.stage("find_optimal_k", items=len(k_sample))
+    best_k, scores = find_optimal_k(k_sample, k_min=k_min, k_max=k_max)
+    span.info.update(best_k=int(best_k), silhouette={int(k): float(v) for k, v in scores.items()})
+
+    span = report.stage("cluster", items=n_articles)
+    kmeans, _, centroids = fit_kmeans(k_sample, best_k)
+    joblib.dump(kmeans, os.path.join(models_dir, "kmeans.joblib"))
+    labels = [kmeans.predict(e) for e in embeddings]
+
+    # Like the weekly run, novelty is computed within each new batch
+    span = report.stage("novelty", items=n_articles)
+    novelty = [compute_novelty_scores(e, l) for e, l in zip(embeddings, labels)]
+
+    span = report.stage("score", items=n_articles)
+    for batch, e, l, nov in zip(batches, embeddings, labels, novelty):
+        normed = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+        batch["cluster"] = l
+        batch["similarity_to_centroid"] = np.einsum("ij,ij->i", e, normed[l])
+        batch["novelty_score"] = nov
+        batch["recency_score"] = compute_recency_score(batch)
+        batch["source_score"] = compute_source_score(batch)
+        compute_final_score(
+            batch,
+            w_similarity=scoring_cfg["w_similarity"],
+            w_novelty=scoring_cfg["w_novelty"],
+            w_recency=scoring_cfg["w_recency"],
+            w_source=scoring_cfg["w_source"]
+        )
+
+    span = report.stage("persist", items=n_articles)
+    store = ArticleStore(os.path.join(workdir, "store"))
+    for batch, e in zip(batches, embeddings):
+        store.append(batch.drop(columns=["topic"]).assign(embedding=list(e)))
+    span.info["parts"] = len(store.read_manifest()["parts"])
+
+    related_cfg = cfg.get("related", {})
+    neighbors = NeighborStore(
+        os.path.join(workdir, "neighbors"), k=related_cfg.get("k", 10), block_size=related_cfg.get("block_size", 256)
+    )
+    span = report.stage("neighbors", items=0)
+    for batch, e, l in zip(batches, embeddings, labels):
+        if span.items >= neighbor_rows:
+            break
+        rows = min(len(batch), neighbor_rows - span.items)
+        neighbors.add(article_ids(batch["url"].iloc[:rows]), e[:rows], l[:rows])
+        span.items += rows
+
+    scored = pd.concat([b[["source", "url", "title", "cluster"]] for b in batches], ignore_index=True)
+    bench_api(report, workdir, cfg, scored, api_queries, seed, related_rows=span.items)
+    bench_search(report, store, models_dir, embedder, scored, search_queries, seed)
+
+
+def compare_reports(current, baseline, max_slowdown=1.5):
+    """
+    Per stage: seconds per item (or wall seconds) against the baseline.
+    Returns the comparison rows; `regression` marks stages slower than
+    max_slowdown x the baseline.
+    """
+    def unit_cost(stage):
+        if not stage.get("wall_seconds"):
+            return None
+        return stage["wall_seconds"] / stage["items"] if stage.get("items") else stage["wall_seconds"]
+
+    previous = {s["name"]: s for s in baseline.get("stages", [])}
+    rows = []
+    for stage in current.get("stages", []):
+        old = previous.get(stage["name"])
+        if old is None or unit_cost(old) is None or unit_cost(stage) is None:
+            continue
+        ratio = unit_cost(stage) / unit_cost(old)
+        rows.append({
+            "stage": stage["name"],
+            "baseline_wall_seconds": old["wall_seconds"],
+            "wall_seconds": stage["wall_seconds"],
+            "ratio": ratio,
+            "regression": ratio > max_slowdown and stage["wall_seconds"] >= MIN_COMPARE_SECONDS,
+        })
+    return rows
+
+
+def main(output=None, workdir=None, keep=False, baseline=None, max_slowdown=1.5, **params):
+    """Run the benchmark, save the JSON report and return it (with the baseline comparison if given)"""
+    cfg = load_config(os.path.join(PROJECT_ROOT, "config", "config.yaml"))
+    report = RunReport("benchmark")
+    report.add_section("params", {k: v for k, v in params.items()})
+    report.add_section("environment", {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    })
+
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="newsletter-bench-")
+    error = None
+    try:
+        run_benchmark(report, workdir, cfg, **params)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        report.finish("failed" if error is not None else "completed", error=error)
+        if own_workdir and not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        result = report.to_dict()
+        if baseline:
+            with open(baseline, "r", encoding="utf-8") as f:
+                baseline_result = json.load(f)
+            comparison = compare_reports(result, baseline_result, max_slowdown=max_slowdown)
+            baseline_params = baseline_result.get("params")
+            report.add_section("comparison", {
+                "baseline": baseline,
+                "max_slowdown": max_slowdown,
+                # Per-item costs are only comparable between runs with the same parameters
+                "same_params": baseline_params == result["params"],
+                "stages": comparison,
+            })
+        report.save(output or os.path.join(RESULTS_DIR, f"benchmark_{report.run_id}.json"))
+
+    return report.to_dict()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark on a synthetic corpus")
+    parser.add_argument("--articles", type=int, default=10000, help="Corpus size (1k to 1M)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Articles per weekly batch")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sources", nargs="+", default=DEFAULT_SOURCES)
+    parser.add_argument("--words", type=int, default=180, help="Words per article")
+    parser.add_argument("--scrape-articles", type=int, default=200, help="Articles served and scraped over HTTP")
+    parser.add_argument("--page-size", type=int, default=20, help="Links per listing page")
+    parser.add_argument("--normalize-rows", type=int, default=2000)
+    parser.add_argument("--k-rows", type=int, default=5000, help="Sample for find_optimal_k and the KMeans fit")
+    parser.add_argument("--k-min", type=int, default=3)
+    parser.add_argument("--k-max", type=int, default=10)
+    parser.add_argument("--neighbor-rows", type=int, default=20000)
+    parser.add_argument("--api-queries", type=int, default=200)
+    parser.add_argument("--search-queries", type=int, default=200)
+    parser.add_argument("--model", default=None,
+                        help="Embedding model key (nlp.embeddings.EMBEDDING_MODELS); default: hashing stub")
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmarks/results/)")
+    parser.add_argument("--workdir", default=None, help="Keep the benchmark store here (default: temp dir)")
+    parser.add_argument("--keep", action="store_true", help="Do not delete the temp workdir")
+    parser.add_argument("--baseline", default=None, help="Previous results JSON to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=1.5,
+                        help="Per-item slowdown vs the baseline flagged as a regression")
+    args = parser.parse_args()
+
+    result = main(
+        output=args.output,
+        workdir=args.workdir,
+        keep=args.keep,
+        baseline=args.baseline,
+        max_slowdown=args.max_slowdown,
+        n_articles=args.articles,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        sources=args.sources,
+        words=args.words,
+        scrape_articles=args.scrape_articles,
+        page_size=args.page_size,
+        normalize_rows=args.normalize_rows,
+        k_rows=args.k_rows,
+        k_min=args.k_min,
+        k_max=args.k_max,
+        neighbor_rows=args.neighbor_rows,
+        api_queries=args.api_queries,
+        search_queries=args.search_queries,
+        model=args.model
+    )
+
+    regressions = [row["stage"] for row in result.get("comparison", {}).get("stages", []) if row["regression"]]
+    if regressions:
+        logger.error("Regressions vs baseline: %s", ", ".join(regressions))
+        sys.exit(1)
@@ -1,18 +1,20 @@
-from airflow import DAG
-from airflow.operators.python import PythonOperator
+from airflow.decorators import dag, task
+from airflow.exceptions import AirflowSkipException
+from airflow.models.param import Param
 from datetime import datetime, timedelta
-from pathlib import Path
-import subprocess
 import sys
 import os
 import yaml
 
-# Load config
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Load config (the project is mounted at NEWSLETTER_PROJECT_ROOT in the Airflow containers)
+PROJECT_ROOT = os.environ.get(
+    "NEWSLETTER_PROJECT_ROOT",
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
 if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
-config_path = os.path.join(PROJECT_ROOT, "config", "config.yaml")
+config_path = os.environ.get("NEWSLETTER_CONFIG", os.path.join(PROJECT_ROOT, "config", "config.yaml"))
 with open(config_path, "r", encoding="utf-8") as f:
     config = yaml.safe_load(f)
 
@@ -32,16 +34,78 @@ DEFAULT_ARGS = {
     "retry_delay": timedelta(minutes=airflow_config.get("retry_delay_minutes", 10)),
 }
 
-with DAG(
+
+@dag(
     dag_id="weekly_newsletter",
     default_args=DEFAULT_ARGS,
-    schedule_interval=airflow_config.get("schedule_interval", "0 6 * * MON"),
+    schedule=airflow_config.get("schedule_interval", "0 6 * * MON"),
     start_date=start_date,
     catchup=airflow_config.get("catchup", False),
-) as dag:
+    params={
+        # Fake sites and hashing embeddings instead of the network and the sentence-transformers model
+        "offline": Param(False, type="boolean"),
+        # Subset of the `scraping` config sections; null = every enabled one
+        "sources": Param(None, type=["null", "array"]),
+    },
+)
+def weekly_newsletter():
+    """
+    Weekly run as one mapped scrape task per enabled source (run in parallel,
+    retried independently) followed by the fan-in stages. Tasks exchange
+    articles through per-run staging article stores (scripts.weekly_tasks);
+    XCom only carries counts. Every task is keyed by the DAG run id, so a
+    retry reuses what already completed and never persists or sends twice.
+    """
+
+    @task
+    def enabled_sources(params=None):
+        from scripts.run_weekly_pipeline import enabled_sources as configured_sources
+        from scripts.weekly_tasks import load_task_config
+
+        sources = params.get("sources") or configured_sources(load_task_config()["scraping"])
+        if not sources:
+            raise AirflowSkipException("No scraping source enabled")
+        return sources
+
+    @task(max_active_tis_per_dagrun=airflow_config.get("max_parallel_sources", 4))
+    def scrape(source, run_id=None, params=None):
+        from scripts.weekly_tasks import scrape_source
+        return scrape_source(source, run_id, offline=params["offline"])
+
+    # Sources that failed after their retries are left out of this week's newsletter
+    @task(trigger_rule="all_done")
+    def embed(scraped, run_id=None, params=None):
+        from scripts.weekly_tasks import embed_staged
+        if not embed_staged(run_id, offline=params["offline"]):
+            raise AirflowSkipException("No new articles")
+
+    @task
+    def score(run_id=None, params=None):
+        from scripts.weekly_tasks import score_staged
+        return score_staged(run_id, offline=params["offline"])
+
+    @task
+    def persist(run_id=None):
+        from scripts.weekly_tasks import persist_staged
+        return persist_staged(run_id)
+
+    @task
+    def render(scored, run_id=None):
+        from scripts.weekly_tasks import render_run
+        return render_run(run_id, retrain_required=scored["retrain_required"])
+
+    @task(trigger_rule="none_failed")
+    def cleanup(run_id=None):
+        from scripts.weekly_tasks import cleanup_run
+        cleanup_run(run_id)
+
+    scraped = scrape.expand(source=enabled_sources())
+    scored = score()
+    embed(scraped) >> scored >> persist() >> render(scored) >> cleanup()
+
 
-    def run_weekly():
-        subprocess.run(["python", "/opt/project/scripts/run_weekly_pipeline.py"], check=True)
+dag = weekly_newsletter()
 
-    t1 = PythonOperator(task_id="run_weekly_script", python_callable=run_weekly)
-    t1
+if __name__ == "__main__":
+    # Offline end-to-end run without a scheduler: python dags/weekly_newsletter_dag.py
+    dag.test(run_conf={"offline": True})
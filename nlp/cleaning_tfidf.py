@@ -1,25 +1,66 @@
-import spacy
+from functools import lru_cache
 from sklearn.feature_extraction.text import TfidfVectorizer
 
-nlp_es = spacy.load("es_core_news_sm")
-nlp_en = spacy.load("en_core_web_sm")
+SPACY_MODELS = {
+    "es": "es_core_news_sm",
+    "en": "en_core_web_sm",
+}
 
-def clean_for_tfidf(text, lang):
+# Solo hacen falta lemas y stopwords: el parser y el NER no se usan
+DISABLED_COMPONENTS = ["parser", "ner"]
+
+
+@lru_cache(maxsize=None)
+def get_spacy_model(lang):
+    """
+    Carga (una sola vez) el modelo spaCy del idioma, sin parser ni NER
+    """
+    import spacy
+
+    return spacy.load(SPACY_MODELS[lang], disable=DISABLED_COMPONENTS)
 
-    if lang == "es":
-        doc = nlp_es(text)
-    elif lang == "en":
-        doc = nlp_en(text)
-    else:
-        return ""
 
-    tokens = [
+def _lemmas_from_doc(doc):
+    return " ".join(
         token.lemma_.lower()
         for token in doc
         if token.is_alpha and not token.is_stop
-    ]
+    )
+
+
+def clean_for_tfidf(text, lang):
+
+    if lang not in SPACY_MODELS:
+        return ""
+
+    return _lemmas_from_doc(get_spacy_model(lang)(text))
+
+
+def clean_texts_for_tfidf(texts, langs, batch_size=256, n_process=1):
+    """
+    Versión por lotes de `clean_for_tfidf`: agrupa los textos por idioma
+    (columna `language` de normalize_article) y los procesa con `nlp.pipe`.
+    Devuelve los textos limpios en el mismo orden de entrada.
+    """
+    texts = list(texts)
+    langs = list(langs)
+    cleaned = [""] * len(texts)
+
+    for lang in SPACY_MODELS:
+        idx = [i for i, l in enumerate(langs) if l == lang]
+        if not idx:
+            continue
+
+        docs = get_spacy_model(lang).pipe(
+            (texts[i] for i in idx),
+            batch_size=batch_size,
+            n_process=n_process
+        )
+        for i, doc in zip(idx, docs):
+            cleaned[i] = _lemmas_from_doc(doc)
+
+    return cleaned
 
-    return " ".join(tokens)
 
 def compute_tfidf(texts):
     vectorizer = TfidfVectorizer(
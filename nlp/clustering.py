@@ -1,24 +1,88 @@
 import numpy as np
+from scipy.optimize import linear_sum_assignment
 from sklearn.cluster import KMeans
 from sklearn.metrics import silhouette_score
 from sklearn.metrics.pairwise import cosine_similarity
 
 
-def fit_kmeans(embeddings, k, random_state=42):
+def fit_kmeans(embeddings, k, random_state=42, init_centroids=None):
     """
-    Entrena KMeans y devuelve labels y centroides
+    Entrena KMeans y devuelve labels y centroides.
+    Si se pasan `init_centroids` (k x dim) se parte de ellos (warm start)
+    con una única inicialización en lugar de k-means++.
     """
-    kmeans = KMeans(
-        n_clusters=k,
-        random_state=random_state,
-        n_init="auto"
-    )
+    if init_centroids is not None:
+        kmeans = KMeans(
+            n_clusters=k,
+            init=np.asarray(init_centroids, dtype=np.asarray(embeddings).dtype),
+            random_state=random_state,
+            n_init=1
+        )
+    else:
+        kmeans = KMeans(
+            n_clusters=k,
+            random_state=random_state,
+            n_init="auto"
+        )
     labels = kmeans.fit_predict(embeddings)
     centroids = kmeans.cluster_centers_
 
     return kmeans, labels, centroids
 
 
+def match_clusters(old_centroids, new_centroids):
+    """
+    Empareja los clusters nuevos con los anteriores maximizando la similitud
+    coseno entre centroides (algoritmo húngaro).
+
+    Devuelve `order` (order[id_estable] = id del nuevo ajuste) y `mapping`
+    {id_estable: {"fit_id", "previous_id", "similarity"}}, con previous_id
+    None si el cluster es nuevo. Si cambia k, los ids anteriores que no
+    caben en range(k) se reasignan.
+    """
+    k_new = len(new_centroids)
+    sims = cosine_similarity(new_centroids, old_centroids)
+    rows, cols = linear_sum_assignment(-sims)
+
+    order = np.full(k_new, -1)
+    mapping = {}
+    for new_id, old_id in zip(rows, cols):
+        if old_id < k_new:
+            order[old_id] = new_id
+            mapping[int(old_id)] = {
+                "fit_id": int(new_id),
+                "previous_id": int(old_id),
+                "similarity": float(sims[new_id, old_id]),
+            }
+
+    free_ids = iter(np.where(order == -1)[0])
+    for new_id in range(k_new):
+        if new_id not in order:
+            stable_id = next(free_ids)
+            order[stable_id] = new_id
+            mapping[int(stable_id)] = {
+                "fit_id": int(new_id),
+                "previous_id": None,
+                "similarity": None,
+            }
+
+    return order, dict(sorted(mapping.items()))
+
+
+def relabel_kmeans(kmeans, order):
+    """
+    Reordena los centroides de un KMeans entrenado según `order`
+    (ver `match_clusters`) y devuelve las etiquetas renumeradas
+    """
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+
+    kmeans.cluster_centers_ = kmeans.cluster_centers_[order]
+    kmeans.labels_ = inverse[kmeans.labels_]
+
+    return kmeans.labels_, kmeans.cluster_centers_
+
+
 def compute_similarity_to_centroid(embeddings, labels, centroids):
     """
     Calcula la similitud coseno de cada punto a su centroide
@@ -49,3 +113,81 @@ def find_optimal_k(embeddings, k_min=3, k_max=10):
 
     best_k = max(scores, key=scores.get)
     return best_k, scores
+
+
+def init_cluster_state(kmeans, version=None):
+    """
+    Estado para la actualización incremental de un KMeans ya entrenado:
+    tamaño de cada cluster, inercia media de referencia y centroides
+    del último reentrenamiento completo (para medir la deriva acumulada)
+    """
+    n_clusters = kmeans.cluster_centers_.shape[0]
+    counts = np.bincount(kmeans.labels_, minlength=n_clusters).astype(float)
+    n_samples = max(float(counts.sum()), 1.0)
+
+    return {
+        "version": version,
+        "counts": counts,
+        "n_seen": int(counts.sum()),
+        "baseline_inertia": float(kmeans.inertia_) / n_samples,
+        "reference_centroids": kmeans.cluster_centers_.copy(),
+        "retrain_required": False,
+        "drift_history": [],
+    }
+
+
+def partial_fit_kmeans(kmeans, state, embeddings):
+    """
+    Actualiza los centroides con un nuevo lote de embeddings
+    (mini-batch k-means: cada centroide se mueve hacia la media del
+    lote con tasa 1 / nº de artículos vistos en el cluster).
+
+    Modifica `kmeans` y `state` in situ y devuelve las etiquetas del lote
+    con los centroides actualizados y las métricas de deriva.
+    """
+    embeddings = np.asarray(embeddings, dtype=kmeans.cluster_centers_.dtype)
+    old_centroids = kmeans.cluster_centers_.copy()
+    centroids = old_centroids.copy()
+    counts = state["counts"]
+
+    labels_before = kmeans.predict(embeddings)
+    residuals = embeddings - old_centroids[labels_before]
+    batch_inertia = float((residuals ** 2).sum(axis=1).mean())
+
+    for cluster_id in np.unique(labels_before):
+        members = embeddings[labels_before == cluster_id]
+        counts[cluster_id] += len(members)
+        centroids[cluster_id] += (
+            members.sum(axis=0) - len(members) * centroids[cluster_id]
+        ) / counts[cluster_id]
+
+    kmeans.cluster_centers_ = centroids
+    labels_after = kmeans.predict(embeddings)
+
+    reference = state["reference_centroids"]
+    drift = {
+        "n_batch": int(len(embeddings)),
+        "batch_inertia": batch_inertia,
+        "inertia_ratio": batch_inertia / max(state["baseline_inertia"], 1e-12),
+        "reassignment_rate": float((labels_before != labels_after).mean()),
+        "max_centroid_shift": float(
+            np.linalg.norm(centroids - reference, axis=1).max()
+        ),
+    }
+
+    state["n_seen"] += int(len(embeddings))
+    state["drift_history"].append(drift)
+
+    return labels_after, drift
+
+
+def drift_exceeded(drift, max_inertia_ratio=1.5, max_reassignment_rate=0.2,
+                   max_centroid_shift=0.25):
+    """
+    Indica si la deriva del modelo justifica un reentrenamiento completo
+    """
+    return (
+        drift["inertia_ratio"] > max_inertia_ratio
+        or drift["reassignment_rate"] > max_reassignment_rate
+        or drift["max_centroid_shift"] > max_centroid_shift
+    )
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from sentence_transformers import SentenceTransformer
 
 EMBEDDING_MODELS = {
@@ -14,9 +16,15 @@ class SentenceTransformerEmbedder:
         self.model_id = model_name
         self.model = SentenceTransformer(EMBEDDING_MODELS[model_name])
 
-    def encode(self, texts):
+    def encode(self, texts, show_progress_bar=True):
         return self.model.encode(
             texts,
-            show_progress_bar=True,
+            show_progress_bar=show_progress_bar,
             normalize_embeddings=True
         )
+
+
+@lru_cache(maxsize=None)
+def get_embedder(model_name: str):
+    """Embedder loaded once per process and model (keeps the model warm for queries)"""
+    return SentenceTransformerEmbedder(model_name)
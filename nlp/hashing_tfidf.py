@@ -0,0 +1,147 @@
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+
+from nlp.interpretation import update_cluster_tfidf_sums
+
+
+def iter_chunks(texts, chunk_size=5000):
+    """
+    Divide un iterable de textos en listas de tamaño `chunk_size`
+    """
+    chunk = []
+    for text in texts:
+        chunk.append(text)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_parquet_texts(path, column, chunk_size=5000):
+    """
+    Lee una columna de texto de un parquet por lotes, sin cargar el fichero entero
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=[column]):
+        yield [text or "" for text in batch.column(0).to_pylist()]
+
+
+class StreamingHashingTfidf:
+    """
+    TF-IDF sin vocabulario: los términos se proyectan con HashingVectorizer
+    a `n_features` columnas fijas y las frecuencias documentales se acumulan
+    por lotes (`partial_fit`). La memoria no crece con el corpus.
+
+    Para interpretar los clusters se mantiene un sketch de búsqueda inversa
+    (columna -> término más frecuente, Misra-Gries con un hueco por columna),
+    de modo que `get_feature_names_out` funciona con `top_terms_per_cluster`.
+    """
+
+    def __init__(self, n_features=2 ** 18, ngram_range=(1, 2), min_df=5, max_df=0.9):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.min_df = min_df
+        self.max_df = max_df
+
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=ngram_range,
+            alternate_sign=False,
+            norm=None
+        )
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self.term_sketch = {}
+
+    def _bucket(self, term):
+        return abs(murmurhash3_32(term, seed=0)) % self.n_features
+
+    def _update_sketch(self, texts):
+        analyzer = self.hasher.build_analyzer()
+        term_counts = Counter()
+        for text in texts:
+            term_counts.update(set(analyzer(text)))
+
+        for term, count in term_counts.items():
+            bucket = self._bucket(term)
+            entry = self.term_sketch.get(bucket)
+            if entry is None or entry[0] == term:
+                self.term_sketch[bucket] = (term, count + (entry[1] if entry else 0))
+            elif count > entry[1]:
+                self.term_sketch[bucket] = (term, count - entry[1])
+            else:
+                self.term_sketch[bucket] = (entry[0], entry[1] - count)
+
+    def partial_fit(self, texts):
+        """
+        Acumula frecuencias documentales de un lote de textos
+        """
+        texts = list(texts)
+        X = self.hasher.transform(texts)
+        self.doc_freq += np.bincount(X.indices, minlength=self.n_features)
+        self.n_docs += X.shape[0]
+        self._update_sketch(texts)
+        return self
+
+    def fit(self, texts, chunk_size=5000):
+        for chunk in iter_chunks(texts, chunk_size):
+            self.partial_fit(chunk)
+        return self
+
+    def fit_from_parquet(self, path, column, chunk_size=5000):
+        for chunk in iter_parquet_texts(path, column, chunk_size):
+            self.partial_fit(chunk)
+        return self
+
+    @property
+    def idf_(self):
+        idf = np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1
+        too_rare = self.doc_freq < self.min_df
+        too_common = self.doc_freq > self.max_df * self.n_docs
+        idf[too_rare | too_common] = 0.0
+        return idf
+
+    def transform(self, texts):
+        X = self.hasher.transform(list(texts))
+        X = X.multiply(self.idf_).tocsr()
+        X.eliminate_zeros()
+        return normalize(X)
+
+    def fit_transform(self, texts, chunk_size=5000):
+        texts = list(texts)
+        self.fit(texts, chunk_size)
+        return self.transform(texts)
+
+    def get_feature_names_out(self):
+        names = np.array([f"hash_{i}" for i in range(self.n_features)], dtype=object)
+        for bucket, (term, _) in self.term_sketch.items():
+            names[bucket] = term
+        return names
+
+
+def streaming_cluster_tfidf_sums(vectorizer, texts, clusters, n_clusters, chunk_size=5000):
+    """
+    Sumas TF-IDF por cluster (ver `cluster_tfidf_sums`) calculadas lote a
+    lote, sin materializar la matriz TF-IDF de todo el corpus
+    """
+    state = {
+        "sums": sparse.csr_matrix((n_clusters, vectorizer.n_features)),
+        "counts": np.zeros(n_clusters),
+    }
+    clusters = np.asarray(clusters, dtype=int)
+
+    start = 0
+    for chunk in iter_chunks(texts, chunk_size):
+        chunk_clusters = clusters[start:start + len(chunk)]
+        update_cluster_tfidf_sums(state, vectorizer.transform(chunk), chunk_clusters)
+        start += len(chunk)
+
+    return state
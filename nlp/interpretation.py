@@ -1,8 +1,70 @@
 import pandas as pd
 import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 
 
+def cluster_tfidf_sums(X_tfidf, clusters, n_clusters=None):
+    """
+    Suma TF-IDF por cluster y término con un único producto disperso
+    (matriz indicadora k x n por la matriz TF-IDF n x V).
+    Devuelve {"sums": csr k x V, "counts": artículos por cluster}.
+    """
+    clusters = np.asarray(clusters, dtype=int)
+    if n_clusters is None:
+        n_clusters = int(clusters.max()) + 1 if len(clusters) else 0
+
+    indicator = sparse.csr_matrix(
+        (np.ones(len(clusters)), (clusters, np.arange(len(clusters)))),
+        shape=(n_clusters, len(clusters))
+    )
+
+    return {
+        "sums": (indicator @ X_tfidf).tocsr(),
+        "counts": np.bincount(clusters, minlength=n_clusters).astype(float),
+    }
+
+
+def update_cluster_tfidf_sums(state, X_new, clusters_new):
+    """
+    Acumula en `state` las sumas TF-IDF de artículos nuevos
+    (transformados con el vectorizador ya entrenado, sin reajustarlo)
+    """
+    clusters_new = np.asarray(clusters_new, dtype=int)
+    n_clusters = max(state["sums"].shape[0], int(clusters_new.max()) + 1 if len(clusters_new) else 0)
+    batch = cluster_tfidf_sums(X_new, clusters_new, n_clusters)
+
+    sums = state["sums"]
+    if sums.shape[0] < n_clusters:
+        padding = sparse.csr_matrix((n_clusters - sums.shape[0], sums.shape[1]))
+        sums = sparse.vstack([sums, padding]).tocsr()
+    counts = np.pad(state["counts"], (0, n_clusters - len(state["counts"])))
+
+    state["sums"] = (sums + batch["sums"]).tocsr()
+    state["counts"] = counts + batch["counts"]
+    return state
+
+
+def top_terms_from_sums(state, terms, top_n=10):
+    """
+    Términos con mayor TF-IDF medio por cluster a partir de las sumas
+    acumuladas (argpartition sobre los términos no nulos de cada cluster)
+    """
+    sums, counts = state["sums"], state["counts"]
+    cluster_terms = {}
+
+    for cluster_id in np.flatnonzero(counts):
+        row = sums.getrow(cluster_id)
+        mean_tfidf = row.data / counts[cluster_id]
+
+        n = min(top_n, len(mean_tfidf))
+        top = np.argpartition(-mean_tfidf, n - 1)[:n] if n else np.array([], dtype=int)
+        top = top[np.argsort(-mean_tfidf[top])]
+        cluster_terms[int(cluster_id)] = terms[row.indices[top]].tolist()
+
+    return cluster_terms
+
+
 def top_terms_per_cluster(
     X_tfidf,
     clusters,
@@ -15,19 +77,9 @@ def top_terms_per_cluster(
     """
 
     terms = np.array(vectorizer.get_feature_names_out())
-    cluster_terms = {}
-
-    for cluster_id in np.unique(clusters):
-        cluster_mask = clusters == cluster_id
-        cluster_tfidf = X_tfidf[cluster_mask]
+    state = cluster_tfidf_sums(X_tfidf, clusters)
 
-        # media TF-IDF por término dentro del cluster
-        mean_tfidf = cluster_tfidf.mean(axis=0).A1
-
-        top_indices = mean_tfidf.argsort()[::-1][:top_n]
-        cluster_terms[cluster_id] = terms[top_indices].tolist()
-
-    return cluster_terms
+    return top_terms_from_sums(state, terms, top_n=top_n)
 
 
 def name_clusters(cluster_keywords):
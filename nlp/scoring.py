@@ -21,15 +21,42 @@ def compute_novelty_scores(embeddings, labels):
 
     return novelty_scores
 
-def compute_recency_score(df, date_col="scraping_date", decay_days=30):
+def recency_decay(dates, now=None, decay_days=30):
     """
-    Score exponencial: noticias recientes valen más
+    exp(-edad en días completos / decay_days) sobre un array de fechas
+    (datetime64), vectorizado; fechas nulas valen 0.
+    `now` fija el instante de referencia; por defecto, el actual
     """
-    now = pd.Timestamp.now()
-    delta_days = (now - pd.to_datetime(df[date_col])).dt.days
+    now = np.datetime64(pd.Timestamp(now) if now is not None else pd.Timestamp.now(), "ns")
+    age_days = np.floor((now - np.asarray(dates, dtype="datetime64[ns]")) / np.timedelta64(1, "D"))
+    return np.nan_to_num(np.exp(-age_days / decay_days), nan=0.0)
 
-    recency_score = np.exp(-delta_days / decay_days)
-    return recency_score
+def compute_recency_score(df, date_col="scraping_date", decay_days=30, now=None):
+    """
+    Score exponencial: noticias recientes valen más.
+    `now` fija el instante de referencia (replays reproducibles); por defecto, el actual
+    """
+    dates = pd.to_datetime(df[date_col]).to_numpy(dtype="datetime64[ns]")
+    return pd.Series(recency_decay(dates, now=now, decay_days=decay_days), index=df.index)
+
+def static_scores(df, w_recency):
+    """
+    Parte del score que no depende del tiempo (similitud, novedad, fuente,
+    engagement). Filas guardadas antes de existir `static_score`: se deduce
+    de final_score - w_recency * recency_score (o final_score si no hay recency)
+    """
+    final = df["final_score"].to_numpy(dtype=np.float64)
+    static = (
+        df["static_score"].to_numpy(dtype=np.float64) if "static_score" in df.columns
+        else np.full(len(df), np.nan)
+    )
+    if "recency_score" in df.columns:
+        static = np.where(np.isnan(static), final - w_recency * df["recency_score"].to_numpy(dtype=np.float64), static)
+    return np.where(np.isnan(static), final, static)
+
+def current_scores(static, dates, w_recency, decay_days=30, now=None):
+    """Score actual: parte estática guardada + recencia calculada en el momento de la consulta"""
+    return np.asarray(static, dtype=np.float64) + w_recency * recency_decay(dates, now=now, decay_days=decay_days)
 
 def compute_source_score(df, source_col="source"):
     """
@@ -45,21 +72,50 @@ def compute_source_score(df, source_col="source"):
 
     return df[source_col].map(source_weights).fillna(0.5)
 
+def _counter_lookup(keys, counts, query):
+    """Counters of `query` keys in sorted (keys, counts); zeros when absent"""
+    result = np.zeros((len(query), counts.shape[1]), dtype=np.int64)
+    if len(keys) == 0:
+        return result
+    pos = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+    found = keys[pos] == query
+    result[found] = counts[pos[found]]
+    return result
+
+def compute_engagement_score(article_ids, clusters, counters, prior=5.0):
+    """
+    Engagement del feedback de usuarios en [0, 1] (0.5 = neutro):
+    0.5 + 0.5 * (positivos - negativos) / (total + prior).
+    Se usa el contador del artículo si tiene feedback y, si no, el de su cluster
+    """
+    def smoothed(counts):
+        return 0.5 + 0.5 * (counts[:, 0] - counts[:, 1]) / (counts[:, 2] + prior)
+
+    url_counts = _counter_lookup(counters["url_ids"], counters["url_counts"], np.asarray(article_ids, dtype=np.uint64))
+    cluster_counts = _counter_lookup(counters["cluster_ids"], counters["cluster_counts"], np.asarray(clusters, dtype=np.int64))
+
+    return np.where(url_counts[:, 2] > 0, smoothed(url_counts), smoothed(cluster_counts))
+
 def compute_final_score(
     df,
     w_similarity=0.4,
     w_novelty=0.3,
     w_recency=0.2,
-    w_source=0.1
+    w_source=0.1,
+    w_engagement=0.0
 ):
     """
-    Score final ponderado
+    Score final ponderado (el término de engagement solo si w_engagement > 0).
+    Se guarda también `static_score`, todo salvo la recencia, para recalcular
+    el score actual en consulta (current_scores) sin reescribir el histórico
     """
-    df["final_score"] = (
+    df["static_score"] = (
         w_similarity * df["similarity_to_centroid"] +
         w_novelty * df["novelty_score"] +
-        w_recency * df["recency_score"] +
         w_source * df["source_score"]
     )
+    if w_engagement:
+        df["static_score"] += w_engagement * df["engagement_score"]
+    df["final_score"] = df["static_score"] + w_recency * df["recency_score"]
 
     return df
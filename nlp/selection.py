@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from nlp.vector_index import _normalize_rows, _top_k
+
+
+def cluster_groups(clusters):
+    """Positions of each cluster's rows ({cluster: positions}); rows without a cluster are left out"""
+    codes, uniques = pd.factorize(pd.Series(clusters), sort=True)
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+    groups = {}
+    for positions in np.split(order, bounds):
+        if len(positions) and codes[positions[0]] >= 0:
+            groups[uniques[codes[positions[0]]]] = positions
+    return groups
+
+
+def mmr(embeddings, scores, k, diversity=0.3):
+    """
+    Maximal Marginal Relevance: k positions picked greedily by
+    (1 - diversity) * score - diversity * max cosine similarity to the picks
+    so far. Similarities are updated incrementally (one matrix-vector
+    product per pick), never as a full pairwise matrix.
+    """
+    embeddings = _normalize_rows(embeddings)
+    scores = np.asarray(scores, dtype=np.float64)
+    k = min(k, len(scores))
+    max_sim = np.zeros(len(scores))
+    available = np.ones(len(scores), dtype=bool)
+    picks = []
+    for _ in range(k):
+        candidates = np.flatnonzero(available)
+        gain = (1 - diversity) * scores[candidates] - diversity * max_sim[candidates]
+        best = candidates[np.argmax(gain)]
+        picks.append(best)
+        available[best] = False
+        sims = embeddings @ embeddings[best]
+        max_sim = sims if len(picks) == 1 else np.maximum(max_sim, sims)
+    return np.array(picks, dtype=np.int64)
+
+
+def top_n_per_cluster(scores, clusters, n, embeddings=None, diversity=None, pool_size=None):
+    """
+    Positions of the top `n` scores of each cluster, best first overall.
+    Each cluster is reduced with argpartition (no sort of the whole set).
+    With `embeddings` and `diversity`, the picks of a cluster come from an
+    MMR pass over its `pool_size` best candidates (default 5 * n).
+    """
+    scores = np.nan_to_num(np.asarray(scores, dtype=np.float64), nan=-np.inf)
+    use_mmr = embeddings is not None and diversity
+    pool_size = pool_size or 5 * n
+    picks = []
+    for positions in cluster_groups(clusters).values():
+        if use_mmr:
+            pool = positions[_top_k(scores[positions], pool_size)]
+            picks.append(pool[mmr(embeddings[pool], scores[pool], n, diversity)])
+        else:
+            picks.append(positions[_top_k(scores[positions], n)])
+    if not picks:
+        return np.array([], dtype=np.int64)
+    picks = np.concatenate(picks)
+    return picks[np.argsort(-scores[picks], kind="stable")]
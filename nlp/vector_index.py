@@ -0,0 +1,91 @@
+import numpy as np
+
+
+def _normalize_rows(matrix):
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(scores, k):
+    """Positions of the k highest scores, best first"""
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class VectorIndex:
+    """
+    Cosine top-k search over embeddings (stored L2-normalized as float32).
+
+    Up to `exact_max_rows` vectors, search is one BLAS matrix-vector product
+    over all (or the filtered) rows. Larger archives use an IVF index over
+    the KMeans centroids: rows are bucketed by nearest centroid and only the
+    `n_probe` lists closest to the query are scored.
+    """
+
+    def __init__(self, embeddings, centroids=None, exact_max_rows=50000, n_probe=3):
+        embeddings = _normalize_rows(embeddings)
+        self.n_rows, self.dim = embeddings.shape
+        self.n_probe = n_probe
+
+        # In IVF mode vectors are stored grouped by list, so probing a list is a
+        # contiguous slice (no gather); positions maps row id -> stored position
+        self.centroids = None
+        self.bounds = None
+        self.row_ids = np.arange(self.n_rows)
+        if centroids is not None and self.n_rows > exact_max_rows and centroids.shape[1] == self.dim:
+            self.centroids = _normalize_rows(centroids)
+            assignment = np.argmax(embeddings @ self.centroids.T, axis=1)
+            self.row_ids = np.argsort(assignment, kind="stable")
+            self.bounds = np.searchsorted(assignment[self.row_ids], np.arange(len(self.centroids) + 1))
+            embeddings = embeddings[self.row_ids]
+
+        self.embeddings = embeddings
+        self.positions = np.empty(self.n_rows, dtype=np.int64)
+        self.positions[self.row_ids] = np.arange(self.n_rows)
+
+    @property
+    def mode(self):
+        return "ivf" if self.bounds is not None else "exact"
+
+    def _probe(self, query):
+        """Stored position ranges of the n_probe lists closest to the query"""
+        probe = _top_k(self.centroids @ query, min(self.n_probe, len(self.centroids)))
+        return [(self.bounds[c], self.bounds[c + 1]) for c in probe]
+
+    def search(self, query, k=10, rows=None):
+        """
+        Returns (row ids, cosine similarities) of the k rows most similar to
+        `query`, optionally restricted to candidate `rows` (sorted row ids)
+        """
+        query = np.asarray(query, dtype=np.float32).ravel()
+        if query.shape[0] != self.dim:
+            raise ValueError(f"Query dimension {query.shape[0]} does not match index dimension {self.dim}")
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        if rows is None and self.bounds is None:
+            scores = self.embeddings @ query
+            top = _top_k(scores, k)
+            return self.row_ids[top], scores[top]
+
+        if rows is None:
+            ranges = self._probe(query)
+            positions = np.concatenate([np.arange(lo, hi) for lo, hi in ranges])
+            scores = np.concatenate([self.embeddings[lo:hi] @ query for lo, hi in ranges])
+        else:
+            positions = self.positions[rows]
+            if self.bounds is not None:
+                in_probed = np.zeros(len(positions), dtype=bool)
+                for lo, hi in self._probe(query):
+                    in_probed |= (positions >= lo) & (positions < hi)
+                # Selective filters can leave the probed lists almost empty: score the filtered rows exactly
+                if in_probed.sum() >= k:
+                    positions = positions[in_probed]
+            scores = self.embeddings[positions] @ query
+
+        top = _top_k(scores, k)
+        return self.row_ids[positions[top]], scores[top]
@@ -1,4 +1,5 @@
 from urllib.parse import urlparse
+import time
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
@@ -6,7 +7,14 @@ import logging
 
 logging.basicConfig(level=logging.INFO)
 
+# Upper bounds (seconds) of the fetch latency histogram buckets; the last bucket is open
+FETCH_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
 class BaseScraper:
+    # Per-source fetch statistics of this process (see fetch_stats_snapshot)
+    fetch_stats = {}
+
     def __init__(self, source_name, base_domains=None, headers=None):
         self.source_name = source_name
         self.base_domains = base_domains or []
@@ -14,10 +22,55 @@ class BaseScraper:
             "User-Agent": "Mozilla/5.0",
             "Accept-Language": "es-ES,es;q=0.9,en;q=0.8"
         }
+        # One session per scraper: keep-alive connections across the pages of a source
+        self.session = requests.Session()
+
+    @classmethod
+    def reset_fetch_stats(cls):
+        BaseScraper.fetch_stats = {}
+
+    @classmethod
+    def fetch_stats_snapshot(cls):
+        """Per-source fetch counts, bytes, latency histogram and mean latency"""
+        snapshot = {}
+        for source, stats in BaseScraper.fetch_stats.items():
+            snapshot[source] = {
+                **stats,
+                "latency_buckets": list(FETCH_LATENCY_BUCKETS) + ["+Inf"],
+                "latency_histogram": list(stats["latency_histogram"]),
+                "mean_latency_seconds": stats["total_seconds"] / stats["requests"] if stats["requests"] else None,
+            }
+        return snapshot
+
+    def _record_fetch(self, status, n_bytes, seconds):
+        stats = BaseScraper.fetch_stats.setdefault(self.source_name, {
+            "requests": 0,
+            "ok": 0,
+            "errors": 0,
+            "bytes": 0,
+            "total_seconds": 0.0,
+            "max_seconds": 0.0,
+            "latency_histogram": [0] * (len(FETCH_LATENCY_BUCKETS) + 1),
+        })
+        stats["requests"] += 1
+        if status is not None and status < 400:
+            stats["ok"] += 1
+        else:
+            stats["errors"] += 1
+        stats["bytes"] += n_bytes
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        bucket = next((i for i, bound in enumerate(FETCH_LATENCY_BUCKETS) if seconds <= bound), len(FETCH_LATENCY_BUCKETS))
+        stats["latency_histogram"][bucket] += 1
 
     def get_soup(self, url):
+        start = time.perf_counter()
+        status, n_bytes, seconds = None, 0, None
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.session.get(url, headers=self.headers, timeout=10)
+            # Network time only (HTML parsing excluded)
+            seconds = time.perf_counter() - start
+            status, n_bytes = response.status_code, len(response.content)
             if response.status_code == 410:
                 return None  # fin natural de paginación
 
@@ -27,6 +80,8 @@ class BaseScraper:
             logging.warning(f"[{self.source_name}] HTTP error en {url}: {e}")
         except requests.exceptions.RequestException as e:
             logging.warning(f"[{self.source_name}] Request error en {url}: {e}")
+        finally:
+            self._record_fetch(status, n_bytes, seconds if seconds is not None else time.perf_counter() - start)
 
         return None
 
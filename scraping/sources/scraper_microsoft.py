@@ -1,3 +1,4 @@
+import time
 import feedparser
 from scraping.scraper_base import BaseScraper
 
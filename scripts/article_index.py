@@ -0,0 +1,301 @@
+import os
+import json
+import base64
+import sqlite3
+import logging
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from scripts.neighbor_store import article_ids, format_article_id
+from nlp.scoring import static_scores, current_scores
+
+logger = logging.getLogger("article_index")
+
+INDEX_COLUMNS = ["url", "title", "source", "cluster", "final_score", "scraping_date"]
+# Read from the store to derive static_score
+SCORE_COLUMNS = ["static_score", "recency_score"]
+SELECT_COLUMNS = "article_id AS id, title, url, source, cluster, final_score, scraping_date"
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Keyset sort orders: (column DESC, url ASC); url makes the key unique
+SORT_KEYS = {"score": "final_score", "date": "scraping_date"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    source TEXT,
+    cluster INTEGER,
+    final_score REAL,
+    scraping_date TEXT,
+    article_id TEXT,
+    static_score REAL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source);
+CREATE INDEX IF NOT EXISTS idx_articles_cluster_score ON articles(cluster, final_score DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_score ON articles(final_score DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_date ON articles(scraping_date);
+CREATE INDEX IF NOT EXISTS idx_articles_score_url ON articles(final_score DESC, url);
+CREATE INDEX IF NOT EXISTS idx_articles_date_url ON articles(scraping_date DESC, url);
+CREATE TABLE IF NOT EXISTS ingested_parts (path TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _iso(date):
+    # Dates are stored as sortable ISO strings; compare like pandas does (YYYY-MM-DD = midnight)
+    return pd.Timestamp(date).strftime(DATE_FORMAT)
+
+
+def encode_cursor(sort, value, url):
+    """Opaque cursor pointing after the row with sort key (value, url)"""
+    payload = json.dumps([sort, value, url], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """Returns (value, url); raises ValueError on malformed or foreign cursors"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, url = json.loads(payload)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+    return value, url
+
+
+class ArticleIndex:
+    """
+    SQLite query layer over the article store. Only the columns served by
+    the API are indexed; filters, ordering and LIMIT run inside SQLite.
+
+    The index follows the store manifest: `sync()` ingests part files
+    that are not indexed yet (upsert by url, so compaction just re-ingests
+    the merged parts) and records the store version it reflects.
+
+    With `w_recency` set, top() ranks the rows of the last `window_days`
+    (idx_articles_date) by static_score plus recency decay at query time.
+    """
+
+    def __init__(self, db_path, store, w_recency=None, decay_days=30, window_days=None):
+        self.db_path = db_path
+        self.store = store
+        self.w_recency = w_recency
+        self.decay_days = decay_days
+        self.window_days = window_days
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+    def _migrate(self, conn):
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(articles)")}
+        if "article_id" not in columns:
+            # Indexes built before article ids existed: add the column and re-ingest all parts
+            conn.execute("ALTER TABLE articles ADD COLUMN article_id TEXT")
+            conn.execute("DELETE FROM ingested_parts")
+            conn.execute("DELETE FROM meta WHERE key = 'store_version'")
+        if "static_score" not in columns:
+            # Indexes built before the score split: same, for static_score
+            conn.execute("ALTER TABLE articles ADD COLUMN static_score REAL")
+            conn.execute("DELETE FROM ingested_parts")
+            conn.execute("DELETE FROM meta WHERE key = 'store_version'")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_article_id ON articles(article_id)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def indexed_version(self, conn):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'store_version'").fetchone()
+        return int(row["value"]) if row else -1
+
+    def sync(self):
+        """Bring the index up to date with the store manifest"""
+        manifest = self.store.read_manifest()
+        with closing(self._connect()) as conn:
+            if self.indexed_version(conn) == manifest["version"]:
+                return False
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.indexed_version(conn) == manifest["version"]:
+                    conn.execute("COMMIT")
+                    return False
+
+                ingested = {r["path"] for r in conn.execute("SELECT path FROM ingested_parts")}
+                live = {e["path"]: e for e in manifest["parts"]}
+
+                for path in [p for p in live if p not in ingested]:
+                    df = self.store.read_part(live[path], columns=INDEX_COLUMNS + SCORE_COLUMNS)
+                    df["scraping_date"] = pd.to_datetime(df["scraping_date"]).dt.strftime(DATE_FORMAT)
+                    df["article_id"] = [format_article_id(i) for i in article_ids(df["url"])]
+                    df["static_score"] = static_scores(df, self.w_recency or 0.0)
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        df[INDEX_COLUMNS + ["article_id", "static_score"]].itertuples(index=False, name=None)
+                    )
+                    conn.execute("INSERT INTO ingested_parts VALUES (?)", (path,))
+
+                conn.executemany(
+                    "DELETE FROM ingested_parts WHERE path = ?",
+                    [(p,) for p in ingested - live.keys()]
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('store_version', ?)",
+                    (str(manifest["version"]),)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        logger.info("Article index synced to store version %d", manifest["version"])
+        return True
+
+    def _matching_sources(self, conn, source):
+        # Same semantics as the former case-insensitive `str.contains`, but
+        # resolved against the (few) distinct sources so idx_articles_source is used
+        sources = [r["source"] for r in conn.execute("SELECT DISTINCT source FROM articles")]
+        return [s for s in sources if s and source.lower() in s.lower()]
+
+    def _where(self, conn, source=None, start_date=None, end_date=None, cluster=None, min_score=None):
+        clauses, params = [], []
+        if source:
+            matches = self._matching_sources(conn, source)
+            clauses.append(f"source IN ({', '.join('?' * len(matches))})" if matches else "0")
+            params.extend(matches)
+        if start_date:
+            clauses.append("scraping_date >= ?")
+            params.append(_iso(start_date))
+        if end_date:
+            clauses.append("scraping_date <= ?")
+            params.append(_iso(end_date))
+        if cluster is not None:
+            clauses.append("cluster = ?")
+            params.append(cluster)
+        if min_score is not None:
+            clauses.append("final_score >= ?")
+            params.append(min_score)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, skip=0, limit=10, order_by="rowid", **filters):
+        """Returns (total matching rows, page of rows as dicts)"""
+        self.sync()
+        with closing(self._connect()) as conn:
+            where, params = self._where(conn, **filters)
+            total = conn.execute(f"SELECT COUNT(*) FROM articles{where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {SELECT_COLUMNS} "
+                f"FROM articles{where} ORDER BY {order_by} LIMIT ? OFFSET ?",
+                params + [limit, skip]
+            ).fetchall()
+        return total, [dict(r) for r in rows]
+
+    def page(self, limit=10, sort="date", cursor=None, **filters):
+        """
+        Keyset pagination ordered by (sort column DESC, url ASC).
+        Returns (total matching rows, page of rows, next cursor or None)
+        """
+        column = SORT_KEYS[sort]
+        self.sync()
+        with closing(self._connect()) as conn:
+            where, params = self._where(conn, **filters)
+            total = conn.execute(f"SELECT COUNT(*) FROM articles{where}", params).fetchone()[0]
+
+            if cursor:
+                # NULL keys sort last (DESC): after a NULL only NULLs remain
+                value, url = decode_cursor(cursor, sort)
+                if value is None:
+                    after, after_params = f"({column} IS NULL AND url > ?)", [url]
+                else:
+                    after = f"({column} < ? OR ({column} = ? AND url > ?) OR {column} IS NULL)"
+                    after_params = [value, value, url]
+                where += (" AND " if where else " WHERE ") + after
+                params = params + after_params
+
+            rows = conn.execute(
+                f"SELECT {SELECT_COLUMNS} "
+                f"FROM articles{where} ORDER BY {column} DESC, url ASC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+
+        rows = [dict(r) for r in rows]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(sort, rows[-1][column], rows[-1]["url"])
+        return total, rows, next_cursor
+
+    def by_ids(self, ids):
+        """Rows of the given article ids (ints), in the same order (unknown ids skipped)"""
+        self.sync()
+        hex_ids = [format_article_id(i) for i in ids]
+        if not hex_ids:
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {SELECT_COLUMNS} FROM articles WHERE article_id IN ({', '.join('?' * len(hex_ids))})",
+                hex_ids
+            ).fetchall()
+        by_id = {r["id"]: dict(r) for r in rows}
+        return [by_id[i] for i in hex_ids if i in by_id]
+
+    def data_version(self):
+        """Store version the index reflects (after syncing)"""
+        self.sync()
+        with closing(self._connect()) as conn:
+            return self.indexed_version(conn)
+
+    def top(self, limit=10, cluster=None, min_score=0.0, now=None):
+        if self.w_recency is not None:
+            return self._top_current(limit, cluster, min_score, now)
+        return self.query(skip=0, limit=limit, order_by="final_score DESC, url", cluster=cluster, min_score=min_score)
+
+    def _top_current(self, limit, cluster, min_score, now):
+        """Rows of the window from SQLite, current scores and top `limit` in NumPy"""
+        now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+        start_date = now - pd.Timedelta(days=self.window_days) if self.window_days else None
+        self.sync()
+        with closing(self._connect()) as conn:
+            where, params = self._where(conn, start_date=start_date, cluster=cluster)
+            rows = [
+                dict(r) for r in conn.execute(f"SELECT {SELECT_COLUMNS}, static_score FROM articles{where}", params)
+            ]
+        if not rows:
+            return 0, []
+
+        static = np.array([r.pop("static_score") for r in rows], dtype=np.float64)
+        dates = pd.to_datetime([r["scraping_date"] for r in rows]).to_numpy(dtype="datetime64[ns]")
+        scores = current_scores(static, dates, self.w_recency, self.decay_days, now=now)
+        keep = np.flatnonzero(scores >= min_score)
+        urls = np.array([rows[i]["url"] for i in keep], dtype=object)
+        order = keep[np.lexsort((urls, -scores[keep]))[:limit]]
+        for i in order:
+            rows[i]["current_score"] = float(scores[i])
+        return len(keep), [rows[i] for i in order]
+
+
+def recency_options(cfg):
+    """Query-time recency settings of the API engines (w_recency None = rank by stored final_score)"""
+    scoring_cfg = cfg.get("scoring", {})
+    if not scoring_cfg.get("query_time_recency", False):
+        return {}
+    return {
+        "w_recency": scoring_cfg.get("w_recency", 0.0),
+        "decay_days": scoring_cfg.get("recency_decay_days", 30),
+        "window_days": cfg.get("api", {}).get("top_window_days"),
+    }
+
+
+def open_article_index(cfg, store):
+    return ArticleIndex(
+        cfg["data"].get("index_path", "data/processed/articles_index.sqlite"),
+        store,
+        **recency_options(cfg)
+    )
@@ -0,0 +1,364 @@
+import os
+import re
+import json
+import time
+import uuid
+import fcntl
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger("article_store")
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".lock"
+# Partition of the rows without a scraping date / a source
+UNKNOWN_PARTITION = "unknown"
+
+
+def _slug(value):
+    return re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-") or "unknown"
+
+
+def _scrape_week(dates):
+    return pd.to_datetime(dates).dt.strftime("%G-W%V")
+
+
+def _partition_keys(df):
+    """(week, source) of each row; rows without a date or a source go to the `unknown` partitions"""
+    weeks = _scrape_week(df["scraping_date"]).fillna(UNKNOWN_PARTITION)
+    sources = df["source"].astype(object).where(df["source"].notna(), None)
+    return weeks, sources
+
+
+def _atomic_write_parquet(df, path):
+    tmp_path = os.path.join(os.path.dirname(path), f".tmp-{os.path.basename(path)}")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+class ArticleStore:
+    """
+    Append-only article store partitioned by scrape week and source:
+
+        <root>/week=2025-W02/source=techcrunch/part-<ts>-<id>.parquet
+
+    Rows without a scraping date or a source are kept in `week=unknown` /
+    `source=unknown` partitions (manifest source: null).
+
+    Part files are immutable and written atomically (temp file + rename).
+    manifest.json lists the live parts and carries a version that increases
+    on every append or compaction; readers only see parts in the manifest.
+    """
+
+    def __init__(self, root, legacy_path=None, retire_grace_seconds=3600):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.retire_grace_seconds = retire_grace_seconds
+        os.makedirs(root, exist_ok=True)
+
+        if legacy_path and os.path.exists(legacy_path) and not os.path.exists(self.manifest_path):
+            self._import_legacy(legacy_path)
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _lock(self):
+        with open(os.path.join(self.root, LOCK_NAME), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {"version": 0, "parts": [], "retired": []}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    @property
+    def version(self):
+        return self.read_manifest()["version"]
+
+    def _import_legacy(self, legacy_path):
+        with self._lock():
+            if os.path.exists(self.manifest_path):
+                return
+            logger.info("Importing legacy parquet %s into article store", legacy_path)
+            self._append_unlocked(pd.read_parquet(legacy_path))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _write_parts(self, df):
+        entries = []
+        weeks, sources = _partition_keys(df)
+        ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+        for (week, source), part in df.groupby([weeks, sources], sort=False, dropna=False):
+            source = None if pd.isna(source) else source
+            rel_dir = os.path.join(f"week={week}", f"source={UNKNOWN_PARTITION if source is None else _slug(source)}")
+            os.makedirs(os.path.join(self.root, rel_dir), exist_ok=True)
+            rel_path = os.path.join(rel_dir, f"part-{ts}-{uuid.uuid4().hex[:8]}.parquet")
+            _atomic_write_parquet(part.reset_index(drop=True), os.path.join(self.root, rel_path))
+            entries.append({
+                "path": rel_path,
+                "week": week,
+                "source": source,
+                "rows": int(len(part)),
+            })
+
+        return entries
+
+    def _append_unlocked(self, df):
+        entries = self._write_parts(df) if len(df) else []
+        manifest = self.read_manifest()
+        manifest["parts"].extend(entries)
+        manifest["version"] += 1
+        self._write_manifest(manifest)
+        return entries
+
+    def _stored_urls(self, manifest, df):
+        """URLs already stored in the (week, source) partitions that `df` would be written to"""
+        partitions = set(zip(*_partition_keys(df)))
+        urls = set()
+        for entry in manifest["parts"]:
+            if (entry["week"], entry["source"]) in partitions:
+                urls.update(pd.read_parquet(os.path.join(self.root, entry["path"]), columns=["url"])["url"])
+        return urls
+
+    def append(self, df, skip_existing=False):
+        """
+        Write new articles as immutable part files and register them in the
+        manifest. Cost is proportional to the new rows only. With
+        `skip_existing`, rows whose URL is already in their partition are
+        dropped first (under the store lock), so re-appending the same batch
+        is a no-op.
+        """
+        if df.empty:
+            return []
+        with self._lock():
+            if skip_existing:
+                df = df[~df["url"].isin(self._stored_urls(self.read_manifest(), df))]
+                if df.empty:
+                    logger.info("All articles already stored; nothing appended")
+                    return []
+            entries = self._append_unlocked(df)
+        logger.info("Appended %d articles in %d part files", len(df), len(entries))
+        return entries
+
+    def compact(self, min_parts=2):
+        """
+        Merge the part files of each (week, source) partition that has at
+        least `min_parts` parts into a single file. Replaced files are
+        retired and only deleted on a later compaction, once no reader can
+        still be using a manifest that points to them.
+        """
+        with self._lock():
+            manifest = self.read_manifest()
+            by_partition = {}
+            for entry in manifest["parts"]:
+                by_partition.setdefault((entry["week"], entry["source"]), []).append(entry)
+
+            now = time.time()
+            still_retired = []
+            for retired in manifest.get("retired", []):
+                if now - retired["retired_at"] >= self.retire_grace_seconds:
+                    path = os.path.join(self.root, retired["path"])
+                    if os.path.exists(path):
+                        os.remove(path)
+                else:
+                    still_retired.append(retired)
+
+            new_parts, merged = [], 0
+            for entries in by_partition.values():
+                if len(entries) < min_parts:
+                    new_parts.extend(entries)
+                    continue
+                df = pd.concat(
+                    [pd.read_parquet(os.path.join(self.root, e["path"])) for e in entries],
+                    ignore_index=True
+                )
+                new_parts.extend(self._write_parts(df))
+                still_retired.extend({"path": e["path"], "retired_at": now} for e in entries)
+                merged += len(entries)
+
+            manifest["parts"] = new_parts
+            manifest["retired"] = still_retired
+            if merged:
+                manifest["version"] += 1
+            self._write_manifest(manifest)
+
+        logger.info("Compaction merged %d part files into %d live parts", merged, len(new_parts))
+        return merged
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def parts(self, start_date=None, end_date=None, sources=None):
+        """Live part entries, pruned by partition (scrape week / source)"""
+        entries = self.read_manifest()["parts"]
+        if start_date is not None:
+            start_week = pd.Timestamp(start_date).strftime("%G-W%V")
+            entries = [e for e in entries if e["week"] >= start_week]
+        if end_date is not None:
+            end_week = pd.Timestamp(end_date).strftime("%G-W%V")
+            entries = [e for e in entries if e["week"] <= end_week]
+        if sources is not None:
+            entries = [e for e in entries if e["source"] in sources]
+        return entries
+
+    def read_part(self, entry, columns=None):
+        path = os.path.join(self.root, entry["path"])
+        if columns is None:
+            return pd.read_parquet(path)
+        available = set(pq.read_schema(path).names)
+        df = pd.read_parquet(path, columns=[c for c in columns if c in available])
+        return df.reindex(columns=columns)
+
+    def read(self, columns=None, start_date=None, end_date=None, sources=None):
+        """
+        Read live articles (optionally only some columns), filtering by
+        scraping date window and exact source names
+        """
+        entries = self.parts(start_date, end_date, sources)
+        if not entries:
+            return pd.DataFrame(columns=columns)
+
+        read_columns = columns
+        if columns is not None and (start_date is not None or end_date is not None) and "scraping_date" not in columns:
+            read_columns = list(columns) + ["scraping_date"]
+
+        df = pd.concat([self.read_part(e, read_columns) for e in entries], ignore_index=True)
+
+        if start_date is not None:
+            df = df[pd.to_datetime(df["scraping_date"]) >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            df = df[pd.to_datetime(df["scraping_date"]) <= pd.Timestamp(end_date)]
+        if columns is not None:
+            df = df[columns]
+
+        return df.reset_index(drop=True)
+
+    def iter_frames(self, columns=None, start_date=None, end_date=None, sources=None, batch_size=10000):
+        """
+        Stream live articles as DataFrames of at most `batch_size` rows, one
+        parquet record batch at a time, so memory stays constant whatever the
+        size of the store. Same filters as read().
+        """
+        needs_date = start_date is not None or end_date is not None
+        for entry in self.parts(start_date, end_date, sources):
+            parquet_file = pq.ParquetFile(os.path.join(self.root, entry["path"]))
+            read_columns = None
+            if columns is not None:
+                wanted = list(columns) + (["scraping_date"] if needs_date and "scraping_date" not in columns else [])
+                available = set(parquet_file.schema_arrow.names)
+                read_columns = [c for c in wanted if c in available]
+
+            for batch in parquet_file.iter_batches(batch_size=batch_size, columns=read_columns):
+                df = batch.to_pandas()
+                if start_date is not None:
+                    df = df[pd.to_datetime(df["scraping_date"]) >= pd.Timestamp(start_date)]
+                if end_date is not None:
+                    df = df[pd.to_datetime(df["scraping_date"]) <= pd.Timestamp(end_date)]
+                if columns is not None:
+                    df = df.reindex(columns=columns)
+                if len(df):
+                    yield df.reset_index(drop=True)
+
+    def columns(self):
+        """Union of the column names of the live parts (schema footers only)"""
+        names = []
+        for entry in self.read_manifest()["parts"]:
+            for name in pq.read_schema(os.path.join(self.root, entry["path"])).names:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def schema(self, columns=None):
+        """
+        Arrow schema over the live parts (schema footers only). Types that
+        differ between parts are promoted (int64 + double -> double); types
+        that cannot be unified fall back to string.
+        """
+        types = {}
+        for entry in self.read_manifest()["parts"]:
+            for field in pq.read_schema(os.path.join(self.root, entry["path"])):
+                if columns is not None and field.name not in columns:
+                    continue
+                known = types.get(field.name)
+                if known is None or known == field.type:
+                    types[field.name] = field.type
+                    continue
+                try:
+                    types[field.name] = pa.unify_schemas(
+                        [pa.schema([(field.name, known)]), pa.schema([(field.name, field.type)])],
+                        promote_options="permissive"
+                    ).field(field.name).type
+                except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                    types[field.name] = pa.string()
+        names = list(columns) if columns is not None else list(types)
+        return pa.schema([(name, types.get(name, pa.null())) for name in names])
+
+    def sources(self):
+        return sorted({e["source"] for e in self.read_manifest()["parts"]}, key=str)
+
+    def count(self):
+        return sum(e["rows"] for e in self.read_manifest()["parts"])
+
+
+def open_article_store(cfg):
+    """Article store configured in config.yaml (imports the legacy processed parquet once)"""
+    data_cfg = cfg["data"]
+    return ArticleStore(
+        data_cfg.get("store_dir", "data/processed/articles"),
+        legacy_path=data_cfg.get("processed_path")
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if PROJECT_ROOT not in sys.path:
+        sys.path.append(PROJECT_ROOT)
+    from config.load_config import load_config
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Article store maintenance")
+    parser.add_argument("command", choices=["compact", "stats"])
+    parser.add_argument("--min-parts", type=int, default=2,
+                        help="Only compact partitions with at least this many part files")
+    args = parser.parse_args()
+
+    store = open_article_store(load_config(os.path.join(PROJECT_ROOT, "config", "config.yaml")))
+    if args.command == "compact":
+        store.compact(min_parts=args.min_parts)
+    else:
+        manifest = store.read_manifest()
+        print(json.dumps({
+            "version": manifest["version"],
+            "parts": len(manifest["parts"]),
+            "rows": store.count(),
+            "retired": len(manifest.get("retired", [])),
+        }, indent=2))
@@ -0,0 +1,263 @@
+import os
+import csv
+import json
+import fcntl
+import logging
+from contextlib import contextmanager
+
+import numpy as np
+
+from scripts.neighbor_store import article_ids
+
+logger = logging.getLogger("feedback_store")
+
+LOG_NAME = "feedback.log"
+COUNTERS_NAME = "counters.npz"
+LOCK_NAME = ".lock"
+# Events of the former POST /feedback (url, rating, timestamp), imported into the log once
+LEGACY_CSV_NAME = "feedback.csv"
+
+# Counter columns: positive, negative, total events
+RATING_VALUES = {
+    "thumb_up": 1, "up": 1, "like": 1, "positive": 1,
+    "thumb_down": -1, "down": -1, "dislike": -1, "negative": -1,
+}
+N_COUNTERS = 3
+
+
+def _event_counts(ratings):
+    values = np.array([RATING_VALUES.get(r, 0) for r in ratings], dtype=np.int64)
+    return np.column_stack([values > 0, values < 0, np.ones(len(values), dtype=bool)]).astype(np.int64)
+
+
+def _merge_counts(keys, counts, new_keys, new_counts):
+    """Add new_counts (rows keyed by new_keys) into sorted (keys, counts)"""
+    unique_keys, inverse = np.unique(new_keys, return_inverse=True)
+    summed = np.zeros((len(unique_keys), N_COUNTERS), dtype=np.int64)
+    np.add.at(summed, inverse, new_counts)
+
+    merged_keys = np.union1d(keys, unique_keys).astype(keys.dtype)
+    merged = np.zeros((len(merged_keys), N_COUNTERS), dtype=np.int64)
+    merged[np.searchsorted(merged_keys, keys)] += counts
+    merged[np.searchsorted(merged_keys, unique_keys)] += summed
+    return merged_keys, merged
+
+
+def empty_counters():
+    return {
+        "url_ids": np.empty(0, dtype=np.uint64),
+        "url_counts": np.empty((0, N_COUNTERS), dtype=np.int64),
+        "cluster_ids": np.empty(0, dtype=np.int64),
+        "cluster_counts": np.empty((0, N_COUNTERS), dtype=np.int64),
+        "log_offset": np.int64(0),
+    }
+
+
+class FeedbackStore:
+    """
+    Feedback events on disk:
+
+    - feedback.log: append-only NDJSON, one line per event
+    - counters.npz: per-article (id of the normalized url) and per-cluster
+      [positive, negative, total] counters, sorted by key
+
+    append() writes a whole batch with one write and updates the counters
+    under an exclusive file lock, so several API workers can flush
+    concurrently. The log is the source of truth: counters.npz records the
+    log offset it reflects, and events past it (a counters update that
+    failed or was interrupted) are applied on the next load, never logged
+    again. rebuild() replays the whole log.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.log_path = os.path.join(root, LOG_NAME)
+        self.counters_path = os.path.join(root, COUNTERS_NAME)
+        os.makedirs(root, exist_ok=True)
+
+        legacy_path = os.path.join(root, LEGACY_CSV_NAME)
+        if os.path.exists(legacy_path):
+            self._import_legacy(legacy_path)
+
+    @contextmanager
+    def _lock(self):
+        with open(os.path.join(self.root, LOCK_NAME), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_counters(self):
+        if not os.path.exists(self.counters_path):
+            return empty_counters()
+        with np.load(self.counters_path) as data:
+            return {name: data[name] for name in data.files}
+
+    def _catch_up(self, counters, batch_size=10000):
+        """Apply the complete log lines past counters["log_offset"]"""
+        size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        offset = int(counters["log_offset"])
+        if offset > size:
+            logger.warning("Feedback log is shorter than the counters offset (%d > %d); recounting", offset, size)
+            counters, offset = empty_counters(), 0
+        if offset == size:
+            return counters
+
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            batch = []
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Line still being written
+                    break
+                offset += len(line)
+                if line.strip():
+                    batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    self._apply(counters, batch)
+                    batch = []
+            if batch:
+                self._apply(counters, batch)
+        counters["log_offset"] = np.int64(offset)
+        return counters
+
+    def load_counters(self):
+        """Counters up to date with the log"""
+        return self._catch_up(self._read_counters())
+
+    def _save_counters(self, counters):
+        tmp_path = f"{self.counters_path}.tmp.npz"
+        np.savez(tmp_path, **counters)
+        os.replace(tmp_path, self.counters_path)
+
+    @staticmethod
+    def _apply(counters, events):
+        ids = article_ids([e["url"] for e in events])
+        counts = _event_counts([e["rating"] for e in events])
+        counters["url_ids"], counters["url_counts"] = _merge_counts(
+            counters["url_ids"], counters["url_counts"], ids, counts
+        )
+        with_cluster = [i for i, e in enumerate(events) if e.get("cluster") is not None]
+        if with_cluster:
+            counters["cluster_ids"], counters["cluster_counts"] = _merge_counts(
+                counters["cluster_ids"], counters["cluster_counts"],
+                np.array([events[i]["cluster"] for i in with_cluster], dtype=np.int64),
+                counts[with_cluster]
+            )
+
+    def _complete_size(self, size, chunk_size=65536):
+        """Size of the log up to its last complete line"""
+        with open(self.log_path, "rb") as f:
+            end = size
+            while end > 0:
+                f.seek(max(0, end - chunk_size))
+                chunk = f.read(end - max(0, end - chunk_size))
+                newline = chunk.rfind(b"\n")
+                if newline >= 0:
+                    return end - len(chunk) + newline + 1
+                end -= len(chunk)
+        return 0
+
+    def _append_unlocked(self, events):
+        payload = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events).encode("utf-8")
+        with open(self.log_path, "ab") as f:
+            start = f.tell()
+            complete = self._complete_size(start)
+            if complete != start:
+                # Drop a torn last line (a writer crashed mid-batch): the next
+                # line must not be glued to it
+                logger.warning("Dropping %d bytes of a torn feedback log line", start - complete)
+                f.truncate(complete)
+                start = complete
+            try:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                # Nothing of the batch stays in the log
+                f.truncate(start)
+                raise
+
+        # The events are in the log from here on: if the counters cannot be
+        # saved, the next load or append applies them from the log
+        try:
+            self._save_counters(self.load_counters())
+        except Exception:
+            logger.exception("Feedback counters update failed; they will catch up from the log")
+
+    def append(self, events):
+        """
+        Append a batch of events ({"url", "rating", "timestamp", "cluster"})
+        to the log and add them to the counters. Raises only if the batch
+        did not reach the log.
+        """
+        if not events:
+            return
+        with self._lock():
+            self._append_unlocked(events)
+        logger.debug("Flushed %d feedback events", len(events))
+
+    def _import_legacy(self, legacy_path):
+        """Replay the events of the legacy feedback.csv into the log (once), then rename it"""
+        with self._lock():
+            if not os.path.exists(legacy_path):
+                return
+            marker = f'"imported_from": "{LEGACY_CSV_NAME}"'.encode("utf-8")
+            already_imported = False
+            if os.path.exists(self.log_path):
+                with open(self.log_path, "rb") as f:
+                    already_imported = any(marker in line for line in f)
+
+            if not already_imported:
+                with open(legacy_path, "r", encoding="utf-8", newline="") as f:
+                    events = [
+                        {
+                            "url": row["url"],
+                            "rating": row["rating"],
+                            "timestamp": row.get("timestamp"),
+                            "cluster": None,
+                            "imported_from": LEGACY_CSV_NAME,
+                        }
+                        for row in csv.DictReader(f) if row.get("url")
+                    ]
+                if events:
+                    self._append_unlocked(events)
+                logger.info("Imported %d events from %s into the feedback log", len(events), legacy_path)
+            os.replace(legacy_path, f"{legacy_path}.imported")
+
+    def rebuild(self):
+        """Recompute counters.npz from the full log"""
+        with self._lock():
+            counters = self._catch_up(empty_counters())
+            self._save_counters(counters)
+        return counters
+
+
+def open_feedback_store(cfg):
+    return FeedbackStore(cfg["data"].get("feedback_dir", "data/feedback"))
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if PROJECT_ROOT not in sys.path:
+        sys.path.append(PROJECT_ROOT)
+    from config.load_config import load_config
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Feedback log maintenance")
+    parser.add_argument("command", choices=["rebuild", "stats"])
+    args = parser.parse_args()
+
+    store = open_feedback_store(load_config(os.path.join(PROJECT_ROOT, "config", "config.yaml")))
+    counters = store.rebuild() if args.command == "rebuild" else store.load_counters()
+    print(json.dumps({
+        "articles": int(len(counters["url_ids"])),
+        "clusters": int(len(counters["cluster_ids"])),
+        "events": int(counters["url_counts"][:, 2].sum()),
+        "log_offset": int(counters["log_offset"]),
+    }, indent=2))
@@ -1,5 +1,6 @@
 import os
 import sys
+import hashlib
 import logging
 import numpy as np
 import pandas as pd
@@ -14,9 +15,29 @@ from scraping.sources.scraper_aws import AWSScraper
 from scraping.sources.scraper_wired import WiredScraper
 from nlp.preprocessing import basic_preprocess
 from nlp.embeddings import SentenceTransformerEmbedder
-from nlp.clustering import find_optimal_k, fit_kmeans
-from nlp.interpretation import top_terms_per_cluster_texts
-from nlp.cleaning_tfidf import compute_tfidf
+from nlp.clustering import (
+    find_optimal_k,
+    fit_kmeans,
+    init_cluster_state,
+    match_clusters,
+    relabel_kmeans
+)
+from nlp.interpretation import cluster_tfidf_sums, top_terms_from_sums, name_clusters
+from nlp.cleaning_tfidf import compute_tfidf, clean_texts_for_tfidf
+from nlp.hashing_tfidf import StreamingHashingTfidf, streaming_cluster_tfidf_sums
+from scraping.scraper_base import BaseScraper
+from scripts.instrumentation import RunReport
+from scripts.article_store import open_article_store
+from scripts.neighbor_store import open_neighbor_store, article_ids
+from scripts.utils_storage import (
+    save_model_version,
+    save_cluster_state,
+    new_snapshot_name,
+    save_corpus_snapshot,
+    write_snapshot_embeddings,
+    load_corpus_snapshot,
+    load_snapshot_init_centroids
+)
 
 logger = logging.getLogger("full_retrain")
 logging.basicConfig(level=logging.INFO)
@@ -59,30 +80,130 @@ def full_scrape_and_build_corpus(scraping_cfg):
     df = df[df["is_valid"]].copy()
     return df
 
-def main():
+def snapshot_embeddings_from_store(cfg, models_dir, start_date=None, end_date=None, sources=None):
+    """
+    Stream the matching store articles into the embeddings file of a new
+    snapshot, one record batch at a time (the corpus is written after the
+    fit, with its cluster assignments). Returns (corpus without embeddings,
+    snapshot name); the snapshot is None if nothing matches.
+    """
+    store = open_article_store(cfg)
+    n_rows = sum(len(df) for df in store.iter_frames(["url"], start_date, end_date, sources))
+    if n_rows == 0:
+        return pd.DataFrame(), None
+
+    snapshot = new_snapshot_name()
+    frames = []
+
+    def batches():
+        for df in store.iter_frames(None, start_date, end_date, sources):
+            yield np.vstack(df["embedding"].to_numpy())
+            frames.append(df.drop(columns="embedding"))
+
+    write_snapshot_embeddings(batches(), n_rows, models_dir, snapshot)
+    return pd.concat(frames, ignore_index=True), snapshot
+
+def load_corpus_from_store(cfg, models_dir, snapshot=None, start_date=None, end_date=None, sources=None):
+    """
+    Load corpus + embeddings from a fixed snapshot or from the processed
+    article store. Embeddings are memory-mapped either way: store articles
+    are first streamed into a new snapshot's embeddings file.
+    """
+    if snapshot is not None:
+        df, embeddings, snapshot = load_corpus_snapshot(models_dir, snapshot)
+        logger.info("Loaded snapshot %s (%d articles, memory-mapped embeddings)", snapshot, len(df))
+    else:
+        df, snapshot = snapshot_embeddings_from_store(cfg, models_dir, start_date, end_date, sources)
+        if snapshot is None:
+            return df, np.empty((0, 0)), None
+        embeddings = np.load(os.path.join(models_dir, f"embeddings_{snapshot}.npy"), mmap_mode="r")
+        logger.info("Loaded %d articles from the article store (memory-mapped embeddings, snapshot %s)", len(df), snapshot)
+
+    mask = np.ones(len(df), dtype=bool)
+    if start_date or end_date:
+        dates = pd.to_datetime(df["scraping_date"])
+        if start_date:
+            mask &= (dates >= pd.Timestamp(start_date)).to_numpy()
+        if end_date:
+            mask &= (dates <= pd.Timestamp(end_date)).to_numpy()
+    if sources:
+        mask &= df["source"].isin(sources).to_numpy()
+
+    if not mask.all():
+        df = df[mask].reset_index(drop=True)
+        embeddings = embeddings[mask]
+        logger.info("Filtered corpus to %d articles", len(df))
+
+    return df, embeddings, snapshot
+
+def main(from_store=False, snapshot=None, start_date=None, end_date=None, sources=None):
     cfg = load_config(os.path.join(PROJECT_ROOT, "config", "config.yaml"))
-    
-    models_dir = cfg["paths"]["models_dir"]
-    os.makedirs(models_dir, exist_ok=True)
+    instrumentation_cfg = cfg.get("instrumentation", {})
+    report = RunReport(
+        "full_retrain",
+        profile_stage=instrumentation_cfg.get("profile_stage"),
+        profile_dir=instrumentation_cfg.get("profile_dir")
+    )
+    BaseScraper.reset_fetch_stats()
 
-    # 1) Full scrape and build corpus
-    logger.info("Starting full scrape...")
-    df = full_scrape_and_build_corpus(cfg["scraping"])
-    logger.info("Full corpus size: %d", len(df))
+    error = None
+    try:
+        return run_full_retrain(cfg, report, from_store, snapshot, start_date, end_date, sources)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        report.finish("failed" if error is not None else "completed", error=error)
+        report.add_section("fetch", BaseScraper.fetch_stats_snapshot())
+        if instrumentation_cfg.get("run_report", True):
+            report.save(os.path.join(cfg["paths"]["models_dir"], f"retrain_report_{report.run_id}.json"))
 
-    # 2) Preprocess text for embeddings
-    df["text_for_embedding"] = (df["title"] + ". " + df["content"]).apply(basic_preprocess)
+def run_full_retrain(cfg, report, from_store=False, snapshot=None, start_date=None, end_date=None, sources=None):
+    models_dir = cfg["paths"]["models_dir"]
+    os.makedirs(models_dir, exist_ok=True)
 
-    # 3) Compute embeddings
     embeddings_cfg = cfg["embeddings"]
     model_name = embeddings_cfg["active_model"]
-    logger.info(f"Computing embeddings with {model_name}")
-    embedder = SentenceTransformerEmbedder(model_name)
-    embeddings = embedder.encode(df["text_for_embedding"].tolist())
-    np.save(os.path.join(models_dir, "embeddings.npy"), embeddings)
-    logger.info("Embeddings saved")
+    # Replaying a fixed snapshot: every input (corpus, embeddings, init centroids) comes from it
+    replay = snapshot is not None
+
+    if from_store or snapshot is not None:
+        # 1-3) Reuse stored corpus and embeddings: no scraping, no re-embedding
+        span = report.stage("load_corpus")
+        df, embeddings, snapshot = load_corpus_from_store(
+            cfg, models_dir,
+            snapshot=snapshot,
+            start_date=start_date,
+            end_date=end_date,
+            sources=sources
+        )
+        span.items = len(df)
+        if df.empty:
+            logger.error("No stored articles match the requested window/sources")
+            return
+    else:
+        # 1) Full scrape and build corpus
+        logger.info("Starting full scrape...")
+        span = report.stage("scrape")
+        df = full_scrape_and_build_corpus(cfg["scraping"])
+        span.items = len(df)
+        logger.info("Full corpus size: %d", len(df))
+
+        # 2) Preprocess text for embeddings
+        report.stage("embed", items=len(df))
+        df["text_for_embedding"] = (df["title"] + ". " + df["content"]).apply(basic_preprocess)
+
+        # 3) Compute embeddings
+        logger.info(f"Computing embeddings with {model_name}")
+        with report.span("embed_model_load"):
+            embedder = SentenceTransformerEmbedder(model_name)
+        with report.span("embed_encode", items=len(df)):
+            embeddings = embedder.encode(df["text_for_embedding"].tolist())
+        np.save(os.path.join(models_dir, "embeddings.npy"), embeddings)
+        logger.info("Embeddings saved")
 
     # 4) Find optimal k and fit KMeans
+    report.stage("find_k", items=len(df))
     clustering_cfg = cfg["clustering"]
     k_min = clustering_cfg.get("k_min", 4)
     k_max = clustering_cfg.get("k_max", 12)
@@ -91,31 +212,118 @@ def main():
     best_k, scores = find_optimal_k(embeddings, k_min=k_min, k_max=k_max)
     logger.info("Best k: %s", best_k)
 
-    # Fit KMeans
-    kmeans_model, labels, centroids = fit_kmeans(embeddings, k=best_k)
+    # Fit KMeans, warm-started from the previous model when k is unchanged. A
+    # replay uses the centroids recorded with the snapshot, not the current
+    # (mutable) kmeans.joblib
+    report.stage("cluster", items=len(df))
+    if replay:
+        previous_centroids = load_snapshot_init_centroids(models_dir, snapshot)
+        logger.info("Init centroids from snapshot %s: %s", snapshot, "recorded" if previous_centroids is not None else "none (cold start)")
+    else:
+        kmeans_path = os.path.join(models_dir, "kmeans.joblib")
+        previous_kmeans = joblib.load(kmeans_path) if os.path.exists(kmeans_path) else None
+        previous_centroids = previous_kmeans.cluster_centers_ if previous_kmeans is not None else None
+    if previous_centroids is not None and previous_centroids.shape[1] != embeddings.shape[1]:
+        previous_centroids = None
+
+    warm_start = previous_centroids is not None and len(previous_centroids) == best_k
+    kmeans_model, labels, centroids = fit_kmeans(
+        embeddings,
+        k=best_k,
+        init_centroids=previous_centroids if warm_start else None
+    )
+    logger.info("KMeans converged in %d iterations (warm start: %s)", kmeans_model.n_iter_, warm_start)
+
+    # Keep cluster IDs stable across retrains
+    cluster_mapping = None
+    if previous_centroids is not None:
+        order, cluster_mapping = match_clusters(previous_centroids, centroids)
+        labels, centroids = relabel_kmeans(kmeans_model, order)
+        logger.info("Cluster mapping to previous model: %s", cluster_mapping)
     df["cluster"] = labels
 
     # 5) TF-IDF for interpretation
+    report.stage("tfidf", items=len(df))
     logger.info("Computing TF-IDF...")
-    df["text_tfidf"] = df["content"].apply(basic_preprocess)
-    X_tfidf, tfidf_vectorizer = compute_tfidf(df["text_tfidf"])
-    cluster_terms = top_terms_per_cluster_texts(X_tfidf, df["cluster"], tfidf_vectorizer, top_n=12)
+    tfidf_cfg = cfg.get("tfidf", {})
+    df["text_tfidf"] = clean_texts_for_tfidf(
+        df["content"],
+        df["language"],
+        batch_size=tfidf_cfg.get("batch_size", 256),
+        n_process=tfidf_cfg.get("n_process", 1)
+    )
+    # Per-cluster TF-IDF sums are kept so weekly runs can refresh cluster names
+    if tfidf_cfg.get("mode", "vocabulary") == "hashing":
+        # Stateless hashing TF-IDF: fixed memory regardless of corpus size
+        chunk_size = tfidf_cfg.get("chunk_size", 5000)
+        tfidf_vectorizer = StreamingHashingTfidf(
+            n_features=tfidf_cfg.get("n_features", 2 ** 18)
+        ).fit(df["text_tfidf"], chunk_size=chunk_size)
+        cluster_tfidf_state = streaming_cluster_tfidf_sums(
+            tfidf_vectorizer, df["text_tfidf"], df["cluster"], best_k, chunk_size=chunk_size
+        )
+    else:
+        X_tfidf, tfidf_vectorizer = compute_tfidf(df["text_tfidf"])
+        cluster_tfidf_state = cluster_tfidf_sums(X_tfidf, df["cluster"], n_clusters=best_k)
+    cluster_terms = top_terms_from_sums(
+        cluster_tfidf_state,
+        np.array(tfidf_vectorizer.get_feature_names_out()),
+        top_n=tfidf_cfg.get("top_n_terms", 12)
+    )
+    cluster_tfidf_state["cluster_names"] = name_clusters(cluster_terms)
+    df["cluster_name"] = df["cluster"].map(cluster_tfidf_state["cluster_names"])
 
     # 6) Save models and artifacts
+    report.stage("persist")
     logger.info("Saving models and artifacts to %s", models_dir)
     joblib.dump(kmeans_model, os.path.join(models_dir, "kmeans.joblib"))
+    kmeans_version = os.path.basename(save_model_version(kmeans_model, models_dir, "kmeans"))
+    # Reset incremental clustering state: drift is measured from this fit onwards
+    save_cluster_state(init_cluster_state(kmeans_model, version=kmeans_version), models_dir)
     joblib.dump(tfidf_vectorizer, os.path.join(models_dir, "tfidf_vectorizer.joblib"))
+    joblib.dump(cluster_tfidf_state, os.path.join(models_dir, "cluster_tfidf_state.joblib"))
     
-    # Save corpus with cluster assignments
-    corpus_path = os.path.join(models_dir, f"corpus_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%MZ')}.parquet")
-    df.to_parquet(corpus_path, index=False)
-    logger.info("Corpus saved to %s", corpus_path)
+    # Save corpus with cluster assignments, aligned with its embeddings, and
+    # the init centroids, so this retrain can be reproduced with --snapshot
+    # (store loads already wrote the embeddings of their snapshot)
+    if not replay:
+        snapshot = save_corpus_snapshot(
+            df,
+            None if snapshot is not None else embeddings,
+            models_dir,
+            init_centroids=previous_centroids,
+            snapshot=snapshot
+        )
+    logger.info("Corpus snapshot: %s", snapshot)
+
+    # Related-article lists are blocked by cluster: recompute with the new
+    # assignments. Only a corpus covering the whole store replaces them all;
+    # otherwise just this corpus' articles are moved to their new clusters
+    if cfg.get("related", {}).get("enabled", False):
+        neighbor_store = open_neighbor_store(cfg)
+        full_corpus = replay or (from_store and not (start_date or end_date or sources))
+        if full_corpus:
+            neighbor_store.rebuild(article_ids(df["url"]), embeddings, labels)
+        else:
+            neighbor_store.update(article_ids(df["url"]), embeddings, labels)
 
     # 7) Save metadata
     meta = {
         "best_k": int(best_k),
         "k_scores": [float(s) for s in scores],
         "embedding_model": model_name,
+        "snapshot": snapshot,
+        "from_store": bool(from_store or replay),
+        "kmeans_version": kmeans_version,
+        "warm_start": warm_start,
+        # Identity of the centroids the fit and the cluster mapping started from (None: cold start)
+        "init_centroids_sha256": (
+            hashlib.sha256(np.ascontiguousarray(previous_centroids).tobytes()).hexdigest()
+            if previous_centroids is not None else None
+        ),
+        "n_iter": int(kmeans_model.n_iter_),
+        "cluster_mapping": cluster_mapping,
+        "cluster_terms": cluster_terms,
         "generated_at": datetime.now(timezone.utc).strftime("%Y%m%dT%H%MZ")
     }
     joblib.dump(meta, os.path.join(models_dir, "retrain_meta.joblib"))
@@ -124,5 +332,23 @@ def main():
     logger.info("✅ Retrain finished. Artifacts in %s", models_dir)
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Full retrain of clustering and TF-IDF models")
+    parser.add_argument("--from-store", action="store_true",
+                        help="Reuse stored articles and embeddings instead of scraping and re-embedding")
+    parser.add_argument("--snapshot", default=None,
+                        help="Retrain from a fixed corpus snapshot (timestamp, e.g. 20250106T0600Z)")
+    parser.add_argument("--start-date", default=None, help="Only articles scraped from this date (YYYY-MM-DD)")
+    parser.add_argument("--end-date", default=None, help="Only articles scraped up to this date (YYYY-MM-DD)")
+    parser.add_argument("--sources", nargs="+", default=None, help="Only articles from these sources")
+    args = parser.parse_args()
+
+    main(
+        from_store=args.from_store,
+        snapshot=args.snapshot,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        sources=args.sources
+    )
 
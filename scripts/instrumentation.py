@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import cProfile
+import logging
+import resource
+from contextlib import contextmanager, ExitStack
+from datetime import datetime, timezone
+
+logger = logging.getLogger("instrumentation")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_mb():
+    """Resident set size of this process (None where /proc is not available)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Span:
+    """Timing and memory of one stage; set `items` to get a throughput"""
+
+    def __init__(self, name, items=None):
+        self.name = name
+        self.items = items
+        self.info = {}
+        self.error = None
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self.rss_start_mb = current_rss_mb()
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.rss_end_mb = None
+        self.peak_rss_mb = None
+
+    def close(self):
+        self.wall_seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = time.process_time() - self._cpu
+        self.rss_end_mb = current_rss_mb()
+        self.peak_rss_mb = peak_rss_mb()
+
+    def to_dict(self):
+        items_per_second = None
+        if self.items is not None and self.wall_seconds:
+            items_per_second = self.items / self.wall_seconds
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "items": self.items,
+            "items_per_second": items_per_second,
+            "rss_start_mb": self.rss_start_mb,
+            "rss_end_mb": self.rss_end_mb,
+            "peak_rss_mb": self.peak_rss_mb,
+            "error": self.error,
+            **self.info,
+        }
+
+
+class RunReport:
+    """
+    Per-stage instrumentation of a pipeline run.
+
+        report = RunReport("weekly_pipeline")
+        with report.span("embed", items=len(texts)):
+            ...
+        span = report.stage("score")   # sequential: closes the previous stage
+
+    Spans record wall / CPU time, RSS and peak RSS, and items/s. If
+    `profile_stage` names a stage, that stage runs under cProfile and the
+    stats are dumped to `profile_dir`. `on_stage(name)` is called when each
+    sequential stage starts (job progress reporting).
+    """
+
+    def __init__(self, name, profile_stage=None, profile_dir=None, on_stage=None):
+        self.name = name
+        self.profile_stage = profile_stage
+        self.profile_dir = profile_dir
+        self.on_stage = on_stage
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self._start = time.perf_counter()
+        self.spans = []
+        self.sections = {}
+        self.status = "running"
+        self.error = None
+        self.wall_seconds = None
+        self._stage_stack = ExitStack()
+        self._current_stage = None
+
+    @contextmanager
+    def span(self, name, items=None):
+        span = Span(name, items=items)
+        profiler = None
+        if name == self.profile_stage:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                span.info["profile_path"] = self._dump_profile(profiler, name)
+            span.close()
+            self.spans.append(span)
+            logger.info("[%s] %s: %.2fs (peak RSS %.0f MB)", self.name, name, span.wall_seconds, span.peak_rss_mb)
+
+    def stage(self, name, items=None):
+        """Start a sequential stage span, closing the previous one"""
+        self._stage_stack.close()
+        if self.on_stage is not None:
+            self.on_stage(name)
+        self._current_stage = self._stage_stack.enter_context(self.span(name, items=items))
+        return self._current_stage
+
+    def _dump_profile(self, profiler, name):
+        profile_dir = self.profile_dir or "."
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"{self.name}_{self.run_id}_{name}.prof")
+        profiler.dump_stats(path)
+        return path
+
+    def add_section(self, name, data):
+        self.sections[name] = data
+
+    def finish(self, status="completed", error=None):
+        """Close the open stage; `error` is attributed to it"""
+        if error is not None:
+            self.error = repr(error)
+            if self._current_stage is not None and self._current_stage.wall_seconds is None:
+                self._current_stage.error = self.error
+        self._stage_stack.close()
+        self._current_stage = None
+        self.status = status
+        self.wall_seconds = time.perf_counter() - self._start
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "run_id": self.run_id,
+            "status": self.status,
+            "error": self.error,
+            "started_at": self.started_at,
+            "wall_seconds": self.wall_seconds if self.wall_seconds is not None else time.perf_counter() - self._start,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": [s.to_dict() for s in self.spans],
+            **self.sections,
+        }
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        logger.info("Run report saved to %s", path)
+        return path
@@ -0,0 +1,297 @@
+import os
+import json
+import fcntl
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+from scripts.url_store import normalize_url, url_hash
+
+logger = logging.getLogger("neighbor_store")
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".lock"
+NO_NEIGHBOR = np.uint64(0)
+
+
+def article_ids(urls):
+    """Stable 64-bit article ids: hash of the normalized URL"""
+    return np.array([url_hash(normalize_url(u)) for u in urls], dtype=np.uint64)
+
+
+def format_article_id(article_id):
+    return format(int(article_id), "016x")
+
+
+def parse_article_id(value):
+    """Hex article id -> int; raises ValueError on malformed ids"""
+    if len(value) != 16:
+        raise ValueError(f"Invalid article id: {value}")
+    return int(value, 16)
+
+
+def _normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k_rows(similarities, ids, k):
+    """Per row, the k best (ids, similarities), best first, padded with NO_NEIGHBOR / -inf"""
+    n_rows, n_cols = similarities.shape
+    if n_cols < k:
+        similarities = np.hstack([similarities, np.full((n_rows, k - n_cols), -np.inf, dtype=np.float32)])
+        ids = np.hstack([ids, np.full((n_rows, k - n_cols), NO_NEIGHBOR, dtype=np.uint64)])
+    elif n_cols > k:
+        part = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        similarities = np.take_along_axis(similarities, part, axis=1)
+        ids = np.take_along_axis(ids, part, axis=1)
+
+    order = np.argsort(-similarities, axis=1, kind="stable")
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(similarities, order, axis=1)
+
+
+class NeighborStore:
+    """
+    Top-k most similar articles for every stored article, blocked by cluster
+    (neighbours are searched within the article's cluster only):
+
+        <root>/cluster=<c>.npz   ids, vectors, neighbors (n x k ids), similarities
+
+    add() updates only the clusters of the new articles, in O(new x cluster
+    size): new rows are scored against the cluster, and existing lists are
+    merged with the new candidates. Files are replaced atomically and
+    manifest.json carries a version that increases on every update.
+    """
+
+    def __init__(self, root, k=10, block_size=256):
+        self.root = root
+        self.k = k
+        self.block_size = block_size
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        os.makedirs(root, exist_ok=True)
+
+    @contextmanager
+    def _lock(self):
+        with open(os.path.join(self.root, LOCK_NAME), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {"version": 0, "k": self.k, "clusters": {}}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _cluster_path(self, cluster):
+        return os.path.join(self.root, f"cluster={int(cluster)}.npz")
+
+    def _empty_cluster(self):
+        return {
+            "ids": np.empty(0, dtype=np.uint64),
+            "vectors": None,
+            "neighbors": np.empty((0, self.k), dtype=np.uint64),
+            "similarities": np.empty((0, self.k), dtype=np.float32),
+        }
+
+    def load_cluster(self, cluster):
+        path = self._cluster_path(cluster)
+        if not os.path.exists(path):
+            return self._empty_cluster()
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    def _save_cluster(self, cluster, data):
+        path = self._cluster_path(cluster)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **data)
+        os.replace(tmp_path, path)
+
+    def _update_cluster(self, existing, new_ids, new_vectors):
+        old_ids = existing["ids"]
+        old_vectors = existing["vectors"] if existing["vectors"] is not None else np.empty((0, new_vectors.shape[1]), dtype=np.float32)
+        neighbors, similarities = existing["neighbors"], existing["similarities"]
+
+        all_ids = np.concatenate([old_ids, new_ids])
+        all_vectors = np.vstack([old_vectors, new_vectors])
+        n_old = len(old_ids)
+
+        new_neighbors, new_similarities = [], []
+        for start in range(0, len(new_ids), self.block_size):
+            block = new_vectors[start:start + self.block_size]
+            block_sims = block @ all_vectors.T
+            # No self matches
+            block_sims[np.arange(len(block)), n_old + start + np.arange(len(block))] = -np.inf
+
+            ids_grid = np.broadcast_to(all_ids, block_sims.shape)
+            nb, sims = _top_k_rows(block_sims, ids_grid, self.k)
+            new_neighbors.append(nb)
+            new_similarities.append(sims)
+
+            # Existing lists: merge current top-k with this block as candidates
+            if n_old:
+                candidates = block_sims[:, :n_old].T
+                block_ids = np.broadcast_to(new_ids[start:start + self.block_size], candidates.shape)
+                neighbors, similarities = _top_k_rows(
+                    np.hstack([similarities, candidates]),
+                    np.hstack([neighbors, block_ids]),
+                    self.k
+                )
+
+        return {
+            "ids": all_ids,
+            "vectors": all_vectors,
+            "neighbors": np.vstack([neighbors] + new_neighbors),
+            "similarities": np.vstack([similarities] + new_similarities).astype(np.float32),
+        }
+
+    def _add_unlocked(self, manifest, ids, vectors, clusters):
+        touched = []
+        for cluster in np.unique(clusters):
+            mask = np.flatnonzero(clusters == cluster)
+            mask = mask[np.unique(ids[mask], return_index=True)[1]]
+            existing = self.load_cluster(cluster)
+            new = ~np.isin(ids[mask], existing["ids"])
+            if not new.any():
+                continue
+            data = self._update_cluster(existing, ids[mask][new], vectors[mask][new])
+            self._save_cluster(cluster, data)
+            manifest["clusters"][str(int(cluster))] = {"rows": int(len(data["ids"]))}
+            touched.append(int(cluster))
+        return touched
+
+    def add(self, ids, vectors, clusters):
+        """Insert new articles (ids from article_ids) and refresh the lists of their clusters only"""
+        ids = np.asarray(ids, dtype=np.uint64)
+        vectors = _normalize_rows(vectors)
+        clusters = np.asarray(clusters)
+        if len(ids) == 0:
+            return []
+
+        with self._lock():
+            manifest = self.read_manifest()
+            touched = self._add_unlocked(manifest, ids, vectors, clusters)
+            manifest["version"] += 1
+            manifest["k"] = self.k
+            self._write_manifest(manifest)
+
+        logger.info("Neighbour lists refreshed for clusters %s", touched)
+        return touched
+
+    def update(self, ids, vectors, clusters):
+        """
+        Insert or move articles (e.g. reassigned by a retrain over part of the
+        store): their current rows are removed, the clusters that lost rows
+        are recomputed from the vectors they keep, and the articles are added
+        to their new clusters. Lists of other clusters are left untouched.
+        """
+        ids = np.asarray(ids, dtype=np.uint64)
+        vectors = _normalize_rows(vectors)
+        clusters = np.asarray(clusters)
+        if len(ids) == 0:
+            return []
+
+        with self._lock():
+            manifest = self.read_manifest()
+            touched = []
+            for name in list(manifest["clusters"]):
+                existing = self.load_cluster(int(name))
+                moved = np.isin(existing["ids"], ids)
+                if not moved.any():
+                    continue
+                keep = ~moved
+                if keep.any():
+                    data = self._update_cluster(self._empty_cluster(), existing["ids"][keep], existing["vectors"][keep])
+                    self._save_cluster(int(name), data)
+                    manifest["clusters"][name] = {"rows": int(len(data["ids"]))}
+                else:
+                    os.remove(self._cluster_path(int(name)))
+                    del manifest["clusters"][name]
+                touched.append(int(name))
+
+            touched = sorted(set(touched) | set(self._add_unlocked(manifest, ids, vectors, clusters)))
+            manifest["version"] += 1
+            manifest["k"] = self.k
+            self._write_manifest(manifest)
+
+        logger.info("Neighbour lists updated for %d articles (clusters %s)", len(ids), touched)
+        return touched
+
+    def rebuild(self, ids, vectors, clusters):
+        """Drop all lists and recompute them (after a full retrain changes the clusters)"""
+        with self._lock():
+            version = self.read_manifest()["version"]
+            for name in os.listdir(self.root):
+                if name.startswith("cluster="):
+                    os.remove(os.path.join(self.root, name))
+            self._write_manifest({"version": version, "k": self.k, "clusters": {}})
+        return self.add(ids, vectors, clusters)
+
+    def load_lookup(self):
+        """
+        All lists as arrays sorted by article id, for O(log n + k) lookups:
+        (ids, neighbors, similarities)
+        """
+        manifest = self.read_manifest()
+        parts = [self.load_cluster(int(c)) for c in manifest["clusters"]]
+        if not parts:
+            return (
+                np.empty(0, dtype=np.uint64),
+                np.empty((0, self.k), dtype=np.uint64),
+                np.empty((0, self.k), dtype=np.float32),
+            )
+        ids = np.concatenate([p["ids"] for p in parts])
+        order = np.argsort(ids, kind="stable")
+        return (
+            ids[order],
+            np.vstack([p["neighbors"] for p in parts])[order],
+            np.vstack([p["similarities"] for p in parts])[order],
+        )
+
+
+def open_neighbor_store(cfg):
+    related_cfg = cfg.get("related", {})
+    return NeighborStore(
+        cfg["data"].get("neighbors_dir", "data/processed/neighbors"),
+        k=related_cfg.get("k", 10),
+        block_size=related_cfg.get("block_size", 256)
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if PROJECT_ROOT not in sys.path:
+        sys.path.append(PROJECT_ROOT)
+    from config.load_config import load_config
+    from scripts.article_store import open_article_store
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Related-article neighbour lists")
+    parser.add_argument("command", choices=["rebuild", "stats"])
+    args = parser.parse_args()
+
+    cfg = load_config(os.path.join(PROJECT_ROOT, "config", "config.yaml"))
+    neighbor_store = open_neighbor_store(cfg)
+    if args.command == "rebuild":
+        df = open_article_store(cfg).read(columns=["url", "cluster", "embedding"])
+        df = df[df["embedding"].notna()]
+        neighbor_store.rebuild(article_ids(df["url"]), np.vstack(df["embedding"].to_numpy()), df["cluster"].to_numpy())
+    else:
+        print(json.dumps(neighbor_store.read_manifest(), indent=2))
@@ -1,10 +1,10 @@
 import os
 import logging
+import uuid
 import pandas as pd
 import sys
 import joblib
 from datetime import datetime, timezone
-from jinja2 import Environment, FileSystemLoader
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 
@@ -19,14 +19,44 @@ from scraping.sources.scraper_microsoft import MicrosoftNewsScraper
 from scraping.sources.scraper_aibusiness import AIBusinessScraper
 
 from nlp.preprocessing import basic_preprocess
+from nlp.selection import top_n_per_cluster
+from nlp.clustering import init_cluster_state, partial_fit_kmeans, drift_exceeded
 from nlp.embeddings import SentenceTransformerEmbedder
-from nlp.scoring import compute_source_score, compute_novelty_scores, compute_recency_score, compute_final_score
-
-from scripts.utils_storage import load_processed_urls, append_processed_urls
+from nlp.cleaning_tfidf import clean_texts_for_tfidf
+from nlp.interpretation import update_cluster_tfidf_sums, top_terms_from_sums, name_clusters
+from nlp.scoring import (
+    compute_source_score,
+    compute_novelty_scores,
+    compute_recency_score,
+    compute_engagement_score,
+    compute_final_score
+)
+
+from scraping.scraper_base import BaseScraper
+from scripts.instrumentation import RunReport
+from scripts.article_store import open_article_store
+from scripts.neighbor_store import open_neighbor_store, article_ids
+from scripts.feedback_store import open_feedback_store
+from backend.newsletter import (
+    NEWSLETTER_TEMPLATE,
+    TEMPLATES_DIR,
+    newsletter_candidates,
+    select_newsletter_articles,
+    render_newsletter
+)
+from scripts.stage_cache import open_stage_cache
+from scripts.utils_storage import (
+    load_processed_urls,
+    save_model_version,
+    load_cluster_state,
+    save_cluster_state
+)
 
 logger = logging.getLogger("weekly_pipeline")
 logging.basicConfig(level=logging.INFO)
 
+NEWSLETTER_TEMPLATE_PATH = os.path.join(TEMPLATES_DIR, NEWSLETTER_TEMPLATE)
+
 # Get project root for config
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJECT_ROOT not in sys.path:
@@ -41,41 +71,62 @@ def save_newsletter_html(out_dir, html, prefix="weekly_news"):
         f.write(html)
     return path
 
-def main():
+def main(generate_only=False, progress=None, run_key=None):
+    """
+    Weekly incremental run. With generate_only=True nothing is persisted
+    (articles, URLs, models, newsletter file, run report) and the rendered
+    HTML is returned. `progress(stage)` is called when each stage starts.
+
+    Every stage is timed (wall / CPU time, RSS, items/s) together with the
+    per-source fetch statistics of the scrapers; the JSON run report is
+    written next to the newsletter HTML.
+
+    `run_key` identifies the run for the stage cache: a retry with the same
+    key (e.g. the Airflow run id) reuses the stages that already completed.
+    """
     cfg = load_config(os.path.join(PROJECT_ROOT, "config", "config.yaml"))
-    
-    # Get paths from config
-    processed_urls_path = cfg["data"]["processed_urls_path"]
-    models_dir = cfg["paths"]["models_dir"]
-    newsletters_dir = cfg["data"]["newsletters_dir"]
+    instrumentation_cfg = cfg.get("instrumentation", {})
+    report = RunReport(
+        "weekly_pipeline",
+        profile_stage=instrumentation_cfg.get("profile_stage"),
+        profile_dir=instrumentation_cfg.get("profile_dir"),
+        on_stage=progress
+    )
+    BaseScraper.reset_fetch_stats()
+
+    error = None
+    try:
+        return run_weekly(cfg, report, generate_only=generate_only, run_key=run_key)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        report.finish("failed" if error is not None else "completed", error=error)
+        if "fetch" not in report.sections:
+            report.add_section("fetch", BaseScraper.fetch_stats_snapshot())
+        if not generate_only and instrumentation_cfg.get("run_report", True):
+            html_path = report.sections.get("outputs", {}).get("newsletter_html")
+            report.save(
+                os.path.splitext(html_path)[0] + ".report.json" if html_path
+                else os.path.join(cfg["data"]["newsletters_dir"], f"weekly_news_{report.run_id}.report.json")
+            )
 
-    processed_urls = load_processed_urls(processed_urls_path)
-    logger.info("Loaded %d processed URLs", len(processed_urls))
+# Scraper per `scraping` config section (sources the weekly run can route with can_handle)
+SCRAPER_FACTORIES = {
+    "xataka": lambda c: XatakaScraper(),
+    "techcrunch": lambda c: TechCrunchScraper(max_pages=c["max_pages"]),
+    "aws": lambda c: AWSScraper(max_pages=c["max_pages"], blogs=c["blogs"]),
+    "huggingface": lambda c: HuggingFaceScraper(max_pages=c["max_pages"], sleep_time=c["sleep_time"]),
+    "wired": lambda c: WiredScraper(max_pages=c["max_pages"]),
+}
 
-    # 1) Scrapers (configurable desde config.yaml)
-    scraping_cfg = cfg["scraping"]
-    scrapers = []
-    
-    if scraping_cfg["xataka"]["enabled"]:
-        scrapers.append(XatakaScraper())
-    if scraping_cfg["techcrunch"]["enabled"]:
-        scrapers.append(TechCrunchScraper(max_pages=scraping_cfg["techcrunch"]["max_pages"]))
-    if scraping_cfg["aws"]["enabled"]:
-        scrapers.append(AWSScraper(
-            max_pages=scraping_cfg["aws"]["max_pages"],
-            blogs=scraping_cfg["aws"]["blogs"]
-        ))
-    if scraping_cfg["huggingface"]["enabled"]:
-        scrapers.append(HuggingFaceScraper(
-            max_pages=scraping_cfg["huggingface"]["max_pages"],
-            sleep_time=scraping_cfg["huggingface"]["sleep_time"]
-        ))
-    if scraping_cfg["wired"]["enabled"]:
-        scrapers.append(WiredScraper(max_pages=scraping_cfg["wired"]["max_pages"]))
+def enabled_sources(scraping_cfg):
+    return [name for name in SCRAPER_FACTORIES if scraping_cfg.get(name, {}).get("enabled", False)]
 
-    logger.info("Initialized %d scrapers", len(scrapers))
+def build_scrapers(scraping_cfg, sources=None):
+    return [SCRAPER_FACTORIES[name](scraping_cfg[name]) for name in (sources or enabled_sources(scraping_cfg))]
 
-    # 2) Collect new links
+def collect_new_links(scrapers, processed_urls):
     new_links = []
     for s in scrapers:
         try:
@@ -85,15 +136,11 @@ def main():
                     new_links.append(l)
         except Exception as e:
             logger.exception("Error scraper %s: %s", type(s).__name__, e)
+    return new_links
 
-    logger.info("Found %d new candidate links", len(new_links))
-    if not new_links:
-        logger.info("No new links; exiting")
-        return
-
-    # 3) Scrape each new link
+def scrape_links(scrapers, links):
     new_articles = []
-    for url in new_links:
+    for url in links:
         for s in scrapers:
             try:
                 if hasattr(s, 'can_handle') and s.can_handle(url):
@@ -103,143 +150,326 @@ def main():
                     break
             except Exception as e:
                 logger.exception("Error scraping %s: %s", url, e)
+    return new_articles
+
+def normalize_articles(articles):
+    """Normalized articles that pass the validity filter"""
+    df = pd.DataFrame([normalize_article(a) for a in articles])
+    if df.empty:
+        return df
+    return df[df["is_valid"]].copy()
+
+def embed_articles(df, model_name, report, embedder=None):
+    """(df with text_for_embedding and embedding columns, embeddings matrix)"""
+    df = df.copy()
+    df["text_for_embedding"] = (df["title"] + ". " + df["content"]).apply(basic_preprocess)
+    with report.span("embed_model_load"):
+        embedder = embedder or SentenceTransformerEmbedder(model_name)
+    with report.span("embed_encode", items=len(df)):
+        embeddings = np.asarray(embedder.encode(df["text_for_embedding"].tolist()))
+    df["embedding"] = embeddings.tolist()
+    return df, embeddings
+
+def cluster_articles(cfg, df, embeddings, update_model=True):
+    """
+    Cluster labels (and names) of new articles: (df, centroids, retrain_required).
+    With update_model the KMeans centroids are updated incrementally and saved.
+    """
+    models_dir = cfg["paths"]["models_dir"]
+    kmeans_path = os.path.join(models_dir, "kmeans.joblib")
+    incremental_cfg = cfg["clustering"].get("incremental", {})
+    df = df.copy()
+    kmeans = joblib.load(kmeans_path)
 
-    if not new_articles:
-        logger.info("No articles scraped from new links")
-        return
-
-    # 4) Normalize
-    normalized = [normalize_article(a) for a in new_articles]
-    df_new = pd.DataFrame(normalized)
-    df_new = df_new[df_new["is_valid"]].copy()
-    logger.info("Normalized %d new articles", len(df_new))
-
-    # 5) Preprocess text
-    df_new["text_for_embedding"] = (df_new["title"] + ". " + df_new["content"]).apply(basic_preprocess)
+    # Incremental centroid update between full retrains
+    retrain_required = False
+    if incremental_cfg.get("enabled", False) and update_model:
+        cluster_state = load_cluster_state(models_dir) or init_cluster_state(kmeans)
+        labels, drift = partial_fit_kmeans(kmeans, cluster_state, embeddings)
+        logger.info(
+            "Incremental KMeans update: inertia_ratio=%.3f reassignment_rate=%.3f max_centroid_shift=%.3f",
+            drift["inertia_ratio"], drift["reassignment_rate"], drift["max_centroid_shift"]
+        )
+        retrain_required = drift_exceeded(
+            drift,
+            max_inertia_ratio=incremental_cfg.get("max_inertia_ratio", 1.5),
+            max_reassignment_rate=incremental_cfg.get("max_reassignment_rate", 0.2),
+            max_centroid_shift=incremental_cfg.get("max_centroid_shift", 0.25)
+        )
+        cluster_state["retrain_required"] = cluster_state["retrain_required"] or retrain_required
+        cluster_state["version"] = os.path.basename(save_model_version(kmeans, models_dir, "kmeans"))
+        joblib.dump(kmeans, kmeans_path)
+        save_cluster_state(cluster_state, models_dir)
+        logger.info("Saved cluster model version %s", cluster_state["version"])
+    else:
+        labels = kmeans.predict(embeddings)
+    df["cluster"] = labels
+
+    # Refresh cluster names with the new articles (no TF-IDF refit)
+    tfidf_path = os.path.join(models_dir, "tfidf_vectorizer.joblib")
+    tfidf_state_path = os.path.join(models_dir, "cluster_tfidf_state.joblib")
+    if os.path.exists(tfidf_path) and os.path.exists(tfidf_state_path):
+        tfidf_cfg = cfg.get("tfidf", {})
+        tfidf_vectorizer = joblib.load(tfidf_path)
+        tfidf_state = joblib.load(tfidf_state_path)
+        X_new = tfidf_vectorizer.transform(clean_texts_for_tfidf(
+            df["content"],
+            df["language"],
+            batch_size=tfidf_cfg.get("batch_size", 256),
+            n_process=tfidf_cfg.get("n_process", 1)
+        ))
+        update_cluster_tfidf_sums(tfidf_state, X_new, labels)
+        cluster_terms = top_terms_from_sums(
+            tfidf_state,
+            np.array(tfidf_vectorizer.get_feature_names_out()),
+            top_n=tfidf_cfg.get("top_n_terms", 12)
+        )
+        tfidf_state["cluster_names"] = name_clusters(cluster_terms)
+        if update_model:
+            joblib.dump(tfidf_state, tfidf_state_path)
+        df["cluster_name"] = df["cluster"].map(tfidf_state["cluster_names"])
 
-    # 6) Load embedder and compute embeddings for new only
-    model_name = cfg["embeddings"]["active_model"]
-    embedder = SentenceTransformerEmbedder(model_name)
-    embeddings = embedder.encode(df_new["text_for_embedding"].tolist())
-    df_new["embedding"] = embeddings.tolist()
+    return df, kmeans.cluster_centers_, retrain_required
 
-    # 7) Load KMeans model and predict clusters
-    kmeans_path = os.path.join(models_dir, "kmeans.joblib")
-    if not os.path.exists(kmeans_path):
-        logger.error("KMeans model not found at %s", kmeans_path)
-        return
-    kmeans = joblib.load(kmeans_path)
-    labels = kmeans.predict(embeddings)
-    df_new["cluster"] = labels
+def score_articles(cfg, df, embeddings, centroids, now=None):
+    """Scores of the clustered articles; `now` pins the recency reference (default: current time)"""
+    df = df.copy()
+    labels = df["cluster"].values
+    df["source_score"] = compute_source_score(df)
 
-    # 8) Scoring
-    df_new["source_score"] = df_new["source"].apply(compute_source_score)
-    
     # Compute similarity to centroid
-    centroids = kmeans.cluster_centers_
     sims = cosine_similarity(embeddings, centroids)
-    sim_to_centroid = sims[np.arange(len(labels)), labels]
-    df_new["similarity_to_centroid"] = sim_to_centroid
-    
+    df["similarity_to_centroid"] = sims[np.arange(len(labels)), labels]
+
     # Compute other scores
-    df_new["novelty_score"] = compute_novelty_scores(embeddings, df_new["cluster"].values)
-    df_new["recency_score"] = compute_recency_score(df_new)
-    
+    df["novelty_score"] = compute_novelty_scores(embeddings, labels)
     # Use scoring weights from config
     scoring_cfg = cfg["scoring"]
-    df_new = compute_final_score(
-        df_new,
+    df["recency_score"] = compute_recency_score(df, decay_days=scoring_cfg.get("recency_decay_days", 30), now=now)
+    w_engagement = scoring_cfg.get("w_engagement", 0.0)
+    if w_engagement:
+        # New articles have no feedback yet: their cluster's engagement is used
+        df["engagement_score"] = compute_engagement_score(
+            article_ids(df["url"]),
+            labels,
+            open_feedback_store(cfg).load_counters(),
+            prior=cfg.get("feedback", {}).get("engagement_prior", 5.0)
+        )
+    return compute_final_score(
+        df,
         w_similarity=scoring_cfg["w_similarity"],
         w_novelty=scoring_cfg["w_novelty"],
         w_recency=scoring_cfg["w_recency"],
-        w_source=scoring_cfg["w_source"]
+        w_source=scoring_cfg["w_source"],
+        w_engagement=w_engagement
     )
 
-    # 9) Persist new processed articles
-    processed_path = cfg["data"]["processed_path"]
-    os.makedirs(os.path.dirname(processed_path), exist_ok=True)
-    if os.path.exists(processed_path):
-        existing = pd.read_parquet(processed_path)
-        combined = pd.concat([existing, df_new], ignore_index=True)
-    else:
-        combined = df_new
-    combined.to_parquet(processed_path, index=False)
-
-    # 10) Update processed_urls
-    processed_urls.update(df_new["url"].tolist())
-    os.makedirs(os.path.dirname(processed_urls_path), exist_ok=True)
-    append_processed_urls(processed_urls_path, df_new["url"].tolist())
-
-    # 11) Build newsletter candidates: top N per cluster
-    top_n = cfg["newsletter"]["top_n_per_cluster"]
-    top_articles = combined.sort_values("final_score", ascending=False).groupby("cluster").head(top_n)
-
-    # 12) Render HTML via Jinja2
-    env = Environment(loader=FileSystemLoader(os.path.join(PROJECT_ROOT, "app", "templates")))
-    template = env.get_template("newsletter.html")
-    html = template.render(
-        generated_at=datetime.now(timezone.utc).strftime("%Y%m%dT%H%MZ"),
-        articles=top_articles.to_dict(orient="records"),
-        title=cfg["newsletter"]["title"]
+def persist_articles(cfg, df, embeddings, processed_urls):
+    """
+    Append to the article store (new part files only), processed URLs and
+    neighbour lists. Idempotent per URL: a retry after a partial failure
+    does not store the same articles twice.
+    """
+    store = open_article_store(cfg)
+    store.append(df, skip_existing=True)
+
+    # Update processed_urls (appends only the new URLs)
+    processed_urls.add_many(df["url"].tolist())
+
+    # Related-article lists: only clusters that received new articles
+    if cfg.get("related", {}).get("enabled", False):
+        open_neighbor_store(cfg).add(article_ids(df["url"]), embeddings, df["cluster"].values)
+    return {"new_articles": int(len(df)), "store_version": store.version}
+
+def render_newsletter_html(cfg, articles, save=True):
+    """Top N per cluster rendered via Jinja2 (backend/templates, shared with /preview)"""
+    top_articles = select_newsletter_articles(
+        articles, cfg["newsletter"]["top_n_per_cluster"], cfg["newsletter"].get("selection")
     )
+    html = render_newsletter(top_articles, cfg["newsletter"]["title"])
+    rendered = {"html": html, "items": len(top_articles)}
+    if save:
+        rendered["path"] = save_newsletter_html(cfg["data"]["newsletters_dir"], html)
+    return rendered
+
+def send_newsletter(cfg, html_path):
+    """Email the newsletter; returns whether it was sent"""
+    try:
+        from utils.emailer import send_html_email
+        send_html_email(
+            subject=f"{cfg['newsletter']['title']} - {datetime.now(timezone.utc).date()}",
+            html_path=html_path,
+            recipients=cfg["newsletter"]["recipients"]
+        )
+        logger.info("Newsletter sent to %d recipients", len(cfg["newsletter"]["recipients"]))
+        return True
+    except Exception as e:
+        logger.error("Failed to send email: %s", e)
+        return False
+
+def run_weekly(cfg, report, generate_only=False, run_key=None):
+    """
+    The weekly stages. Unless generate_only, each stage output (links, raw
+    articles, normalized, embedded, clustered, scored, rendered) and the
+    side-effect stages (persisted, sent) are recorded in the stage cache
+    under a key chained from `run_key`, the config and the code: a retry of
+    the same run skips every stage that already completed.
+    """
+    # Get paths from config
+    processed_urls_path = cfg["data"]["processed_urls_path"]
+    models_dir = cfg["paths"]["models_dir"]
+    newsletters_dir = cfg["data"]["newsletters_dir"]
 
-    html_path = save_newsletter_html(newsletters_dir, html)
-    logger.info("Saved newsletter HTML to %s", html_path)
+    report.stage("setup")
+    processed_urls = load_processed_urls(processed_urls_path)
+    logger.info("Loaded %d processed URLs", len(processed_urls))
 
-    # 13) Optional: send via email if configured
-    if cfg["newsletter"]["send"]:
-        try:
-            from utils.emailer import send_html_email
-            send_html_email(
-                subject=f"{cfg['newsletter']['title']} - {datetime.now(timezone.utc).date()}",
-                html_path=html_path,
-                recipients=cfg["newsletter"]["recipients"]
-            )
-            logger.info("Newsletter sent to %d recipients", len(cfg["newsletter"]["recipients"]))
-        except Exception as e:
-            logger.error("Failed to send email: %s", e)
+    cache = open_stage_cache(cfg, enabled=not generate_only)
+    # Without an explicit key every run is a new run (only retries reuse stages)
+    run_key = run_key or f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}-{uuid.uuid4().hex[:6]}"
+    report.add_section("stage_cache", cache.summary())
+    if cache.enabled:
+        removed = cache.prune(cfg.get("stage_cache", {}).get("max_age_days", 14))
+        logger.info("Stage cache run key %s (%d expired entries pruned)", run_key, removed)
+
+    # 1) Scrapers (configurable desde config.yaml)
+    scraping_cfg = cfg["scraping"]
+    scrapers = build_scrapers(scraping_cfg)
+    logger.info("Initialized %d scrapers", len(scrapers))
+    scraper_code = [BaseScraper] + [type(s) for s in scrapers]
 
+    # 2) Collect new links
+    span = report.stage("collect_links")
+    links_key = cache.key("links", inputs={"run_key": run_key, "scraping": scraping_cfg}, code=scraper_code)
+    new_links = cache.cached("links", links_key, lambda: collect_new_links(scrapers, processed_urls), span=span)
 
+    span.items = len(new_links)
+    logger.info("Found %d new candidate links", len(new_links))
+    if not new_links:
+        logger.info("No new links; exiting")
+        return
 
-    # 9) Persist new processed articles
-    processed_path = cfg["data"]["processed_path"]
-    os.makedirs(os.path.dirname(processed_path), exist_ok=True)
-    if os.path.exists(processed_path):
-        existing = pd.read_parquet(processed_path)
-        combined = pd.concat([existing, df_new], ignore_index=True)
-    else:
-        combined = df_new
-    combined.to_parquet(processed_path, index=False)
-
-    # 10) Update processed_urls
-    processed_urls.update(df_new["url"].tolist())
-    os.makedirs(os.path.dirname(processed_urls_path), exist_ok=True)
-    append_processed_urls(processed_urls_path, df_new["url"].tolist())
-
-    # 11) Build newsletter candidates: top N per cluster or per department
-    top_n = cfg["newsletter"].get("top_n", 5)
-    top_articles = combined.sort_values("final_score", ascending=False).groupby("cluster").head(top_n)
-
-    # 12) Render HTML via Jinja2 (prepare a simple template in templates/newsletter.html)
-    env = Environment(loader=FileSystemLoader(os.path.join(PROJECT_ROOT, "frontend", "templates")))
-    template = env.get_template("newsletter_weekly.html")
-    html = template.render(
-        generated_at=datetime.now(timezone.utc).strftime("%Y%m%dT%H%MZ"),
-        articles=top_articles.to_dict(orient="records"),
-        title=cfg["newsletter"].get("title", "AMC - Weekly AI & Tech Newsletter")
+    # 3) Scrape each new link
+    span = report.stage("scrape", items=len(new_links))
+    articles_key = cache.key("articles", parent=links_key, code=scraper_code)
+    new_articles = cache.cached("articles", articles_key, lambda: scrape_links(scrapers, new_links), span=span)
+
+    if not new_articles:
+        logger.info("No articles scraped from new links")
+        return
+
+    # 4) Normalize
+    report.add_section("fetch", BaseScraper.fetch_stats_snapshot())
+    span = report.stage("normalize", items=len(new_articles))
+    normalized_key = cache.key("normalized", parent=articles_key, code=[normalize_article])
+    df_new = cache.cached("normalized", normalized_key, lambda: normalize_articles(new_articles), span=span)
+    logger.info("Normalized %d new articles", len(df_new))
+
+    # 5-6) Preprocess text and compute embeddings for new articles only
+    model_name = cfg["embeddings"]["active_model"]
+    span = report.stage("embed", items=len(df_new))
+    embedded_key = cache.key(
+        "embedded", parent=normalized_key, inputs={"model": model_name},
+        code=[embed_articles, basic_preprocess, SentenceTransformerEmbedder]
     )
+    df_new, embeddings = cache.cached(
+        "embedded", embedded_key, lambda: embed_articles(df_new, model_name, report), span=span
+    )
+
+    # 7) Load KMeans model and predict clusters (incremental centroid update unless generate_only)
+    span = report.stage("cluster", items=len(df_new))
+    if not os.path.exists(os.path.join(models_dir, "kmeans.joblib")):
+        logger.error("KMeans model not found in %s", models_dir)
+        return
 
-    html_path = save_newsletter_html(newsletter_out, html)
+    # The model files are updated by this stage itself, so they are not part of its key
+    clustered_key = cache.key(
+        "clustered", parent=embedded_key,
+        inputs={"clustering": cfg["clustering"], "tfidf": cfg.get("tfidf", {})},
+        code=[cluster_articles, partial_fit_kmeans, clean_texts_for_tfidf, update_cluster_tfidf_sums]
+    )
+    df_new, centroids, retrain_required = cache.cached(
+        "clustered", clustered_key,
+        lambda: cluster_articles(cfg, df_new, embeddings, update_model=not generate_only),
+        span=span
+    )
+
+    # 8) Scoring
+    span = report.stage("score", items=len(df_new))
+    scored_key = cache.key(
+        "scored", parent=clustered_key,
+        inputs={"scoring": cfg["scoring"], "feedback": cfg.get("feedback", {})},
+        code=[score_articles, compute_final_score]
+    )
+    df_new = cache.cached("scored", scored_key, lambda: score_articles(cfg, df_new, embeddings, centroids), span=span)
+
+    # 9-10) Persist new processed articles, URLs and neighbour lists
+    span = report.stage("persist", items=len(df_new))
+    if generate_only:
+        candidates = newsletter_candidates(open_article_store(cfg), cfg)
+        combined = pd.concat([candidates, df_new.reindex(columns=candidates.columns)], ignore_index=True)
+        report.stage("render")
+        return render_newsletter_html(cfg, combined, save=False)["html"]
+
+    # Side effects only: the entry records that this run's articles are already stored
+    persisted_key = cache.key(
+        "persisted", parent=scored_key,
+        inputs={"store_dir": cfg["data"].get("store_dir"), "related": cfg.get("related", {}).get("enabled", False)}
+    )
+    cache.cached(
+        "persisted", persisted_key, lambda: persist_articles(cfg, df_new, embeddings, processed_urls), span=span
+    )
+
+    # 11-12) Newsletter candidates and HTML
+    span = report.stage("render")
+    rendered_key = cache.key(
+        "rendered", parent=persisted_key,
+        inputs={"newsletter": {k: v for k, v in cfg["newsletter"].items() if k not in ("send", "recipients")}},
+        code=[render_newsletter_html, render_newsletter, top_n_per_cluster, NEWSLETTER_TEMPLATE_PATH]
+    )
+    rendered = cache.cached(
+        "rendered", rendered_key,
+        lambda: render_newsletter_html(cfg, newsletter_candidates(open_article_store(cfg), cfg)),
+        span=span
+    )
+    span.items = rendered["items"]
+    html_path = rendered["path"]
+    if not os.path.exists(html_path):
+        html_path = save_newsletter_html(newsletters_dir, rendered["html"])
+
+    report.add_section("outputs", {"newsletter_html": html_path, "new_articles": int(len(df_new))})
     logger.info("Saved newsletter HTML to %s", html_path)
 
-    # 13) Optional: send via SMTP/SendGrid if configured
-    if cfg["newsletter"].get("send", False):
-        send_html_email(
-            subject=f"{cfg['newsletter'].get('title')} - {datetime.now(timezone.utc).date()}",
-            html_path=html_path,
-            recipients=cfg["newsletter"].get("recipients", [])
-        )
+    # 13) Optional: send via email if configured
+    if cfg["newsletter"]["send"]:
+        span = report.stage("send", items=len(cfg["newsletter"]["recipients"]))
+        sent_key = cache.key("sent", parent=rendered_key, inputs={"recipients": cfg["newsletter"]["recipients"]})
+        if cache.get("sent", sent_key) is not None:
+            span.info["cache"] = "hit"
+            logger.info("Newsletter already sent for this run")
+        elif send_newsletter(cfg, html_path):
+            cache.put("sent", sent_key, {"recipients": len(cfg["newsletter"]["recipients"])})
+
+    # 14) Full retrain only when cluster drift crosses the configured thresholds
+    incremental_cfg = cfg["clustering"].get("incremental", {})
+    if retrain_required and incremental_cfg.get("auto_retrain", False):
+        logger.warning("Cluster drift above threshold; launching full retrain from the article store")
+        report.stage("retrain")
+        from scripts.full_retrain import main as full_retrain_main
+        # Stored articles and embeddings: no re-scrape or re-embed inside the weekly run
+        full_retrain_main(from_store=True)
+
+    return html_path
+
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Weekly incremental newsletter run")
+    parser.add_argument("--generate-only", action="store_true", help="Render without persisting anything")
+    parser.add_argument("--run-key", default=None,
+                        help="Identity of this run for the stage cache (default: a new unique key); "
+                             "retries with the same key reuse the completed stages")
+    args = parser.parse_args()
 
+    main(generate_only=args.generate_only, run_key=args.run_key)
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import inspect
+import hashlib
+import logging
+
+import joblib
+
+logger = logging.getLogger("stage_cache")
+
+# Bump when the layout of cached values changes
+CACHE_FORMAT = 1
+
+_MISSING = object()
+_file_digests = {}
+
+
+def _digest(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def code_fingerprint(objects):
+    """Hash of the source files defining `objects` (modules, classes, functions or file paths)"""
+    digests = []
+    for obj in objects:
+        path = obj if isinstance(obj, str) else inspect.getsourcefile(obj)
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime_ns
+        cached = _file_digests.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "rb") as f:
+                cached = _file_digests[path] = (mtime, hashlib.sha256(f.read()).hexdigest())
+        digests.append(cached[1])
+    return _digest(sorted(digests))
+
+
+class StageCache:
+    """
+    Content-addressed outputs of pipeline stages:
+
+        <root>/<stage>/<key>.joblib
+
+    A stage key hashes the stage name, the key of the stage it consumes, its
+    own inputs (config values, run key) and the source code it runs, so a
+    retry of the same run reuses every stage that already finished while a
+    change of config or code upstream invalidates everything downstream.
+    Entries are written atomically; prune() drops old ones.
+    """
+
+    def __init__(self, root, enabled=True):
+        self.root = root
+        self.enabled = enabled
+        self.hits = []
+        self.misses = []
+
+    def key(self, stage, parent=None, inputs=None, code=()):
+        return _digest({
+            "format": CACHE_FORMAT,
+            "stage": stage,
+            "parent": parent,
+            "inputs": inputs,
+            "code": code_fingerprint(code) if code else None,
+        })
+
+    def _path(self, stage, key):
+        return os.path.join(self.root, stage, f"{key}.joblib")
+
+    def get(self, stage, key, default=None):
+        path = self._path(stage, key)
+        if not self.enabled or not os.path.exists(path):
+            return default
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            logger.warning("Unreadable cache entry %s (%s); recomputing", path, e)
+            return default
+
+    def put(self, stage, key, value):
+        if not self.enabled:
+            return
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        joblib.dump(value, tmp_path)
+        os.replace(tmp_path, path)
+
+    def cached(self, stage, key, compute, span=None):
+        """Cached value of `stage` under `key`, or compute() and store it"""
+        value = self.get(stage, key, _MISSING)
+        hit = value is not _MISSING
+        if hit:
+            logger.info("Stage %s: reusing cached output %s", stage, key[:12])
+            self.hits.append(stage)
+        else:
+            value = compute()
+            self.put(stage, key, value)
+            self.misses.append(stage)
+        if span is not None:
+            span.info["cache"] = "hit" if hit else "miss"
+            span.info["cache_key"] = key[:16]
+        return value
+
+    def prune(self, max_age_days):
+        """Remove entries older than max_age_days; returns how many were removed"""
+        if not os.path.isdir(self.root):
+            return 0
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        for stage in os.listdir(self.root):
+            stage_dir = os.path.join(self.root, stage)
+            if not os.path.isdir(stage_dir):
+                continue
+            for name in os.listdir(stage_dir):
+                path = os.path.join(stage_dir, name)
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+    def summary(self):
+        """Cache usage of this run (the hit / miss lists keep filling as stages run)"""
+        return {"enabled": self.enabled, "root": self.root, "hits": self.hits, "misses": self.misses}
+
+
+def open_stage_cache(cfg, enabled=True):
+    cache_cfg = cfg.get("stage_cache", {})
+    return StageCache(
+        cache_cfg.get("dir", "data/cache/stages"),
+        enabled=enabled and cache_cfg.get("enabled", False)
+    )
@@ -0,0 +1,248 @@
+import os
+import fcntl
+import hashlib
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import numpy as np
+
+logger = logging.getLogger("url_store")
+
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "mc_cid", "mc_eid", "igshid", "ref", "ref_src", "_ga"}
+DEFAULT_PORTS = {":80", ":443"}
+
+
+def normalize_url(url):
+    """
+    Canonical form used for deduplication: https scheme, lowercase host
+    without www. or default port, no trailing slash, no fragment, tracking
+    parameters (utm_*, fbclid, ...) removed and remaining ones sorted
+    """
+    parts = urlsplit(url.strip())
+
+    scheme = parts.scheme.lower()
+    if scheme in ("http", "https", ""):
+        scheme = "https"
+
+    netloc = parts.netloc.lower()
+    for port in DEFAULT_PORTS:
+        if netloc.endswith(port):
+            netloc = netloc[:-len(port)]
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+
+    path = parts.path.rstrip("/")
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ))
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def url_hash(normalized_url):
+    """64-bit hash of an already normalized URL"""
+    digest = hashlib.blake2b(normalized_url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over 64-bit hashes (double hashing)"""
+
+    def __init__(self, n_bits=1 << 23, n_hashes=7):
+        self.n_bits = int(n_bits)
+        self.n_hashes = int(n_hashes)
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+        self.n_items = 0
+
+    @classmethod
+    def for_capacity(cls, n_items, bits_per_item=10, n_hashes=7):
+        return cls(n_bits=max(1 << 20, n_items * bits_per_item), n_hashes=n_hashes)
+
+    def _positions(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64).reshape(-1, 1)
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.n_hashes, dtype=np.uint64).reshape(1, -1)
+        return (h1 + steps * h2) % np.uint64(self.n_bits)
+
+    def add_many(self, hashes):
+        if len(hashes) == 0:
+            return
+        positions = self._positions(hashes).ravel()
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), (1 << (positions & np.uint64(7))).astype(np.uint8))
+        self.n_items += len(hashes)
+
+    def __contains__(self, h):
+        positions = self._positions([h]).ravel()
+        return bool(np.all(self.bits[positions >> np.uint64(3)] & (1 << (positions & np.uint64(7))).astype(np.uint8)))
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, bits=self.bits, meta=np.array([self.n_bits, self.n_hashes, self.n_items], dtype=np.int64))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        n_bits, n_hashes, n_items = data["meta"].tolist()
+        bloom = cls(n_bits=n_bits, n_hashes=n_hashes)
+        bloom.bits = data["bits"]
+        bloom.n_items = n_items
+        return bloom
+
+
+class ProcessedURLStore:
+    """
+    Append-only log of processed URLs.
+
+    <base>.log        normalized URLs, one per line (append only)
+    <base>.idx        their 64-bit hashes as raw uint64 (append only)
+    <base>.bloom.npz  bloom filter over the hashes, saved on compaction
+
+    Membership checks go through the bloom filter and then an in-memory hash
+    set; appends write only the new URLs. `compact()` rewrites the log
+    without duplicates and resizes the bloom filter.
+    """
+
+    def __init__(self, path):
+        self.legacy_path = path
+        base = os.path.splitext(path)[0]
+        self.log_path = f"{base}.log"
+        self.idx_path = f"{base}.idx"
+        self.bloom_path = f"{base}.bloom.npz"
+        self.lock_path = f"{base}.lock"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        if not os.path.exists(self.log_path) and os.path.exists(self.legacy_path):
+            self._import_legacy()
+        self._load()
+
+    @contextmanager
+    def _lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _import_legacy(self):
+        import pandas as pd
+
+        logger.info("Importing legacy processed URLs from %s", self.legacy_path)
+        self._hashes, self.bloom = set(), BloomFilter()
+        self.add_many(pd.read_csv(self.legacy_path).url.dropna().tolist())
+        self.compact()
+
+    def _load(self):
+        hashes = np.fromfile(self.idx_path, dtype=np.uint64) if os.path.exists(self.idx_path) else np.empty(0, np.uint64)
+        self._hashes = set(hashes.tolist())
+
+        # The index is append-only, so a bloom filter saved at the last
+        # compaction only needs the hashes appended after it
+        bloom = BloomFilter.load(self.bloom_path) if os.path.exists(self.bloom_path) else None
+        if bloom is None or bloom.n_items > len(hashes):
+            bloom = BloomFilter.for_capacity(2 * len(hashes))
+        bloom.add_many(hashes[bloom.n_items:])
+        self.bloom = bloom
+
+    def __contains__(self, url):
+        h = url_hash(normalize_url(url))
+        return h in self.bloom and h in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __iter__(self):
+        if not os.path.exists(self.log_path):
+            return iter(())
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            return iter([line.rstrip("\n") for line in f if line.strip()])
+
+    def add_many(self, urls, history_dir=None):
+        """Append URLs not seen before; returns the normalized new URLs"""
+        new_urls, new_hashes = [], []
+        for url in urls:
+            normalized = normalize_url(url)
+            h = url_hash(normalized)
+            if h in self._hashes:
+                continue
+            self._hashes.add(h)
+            new_urls.append(normalized)
+            new_hashes.append(h)
+
+        if not new_urls:
+            return []
+
+        with self._lock():
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{u}\n" for u in new_urls))
+            with open(self.idx_path, "ab") as f:
+                np.asarray(new_hashes, dtype=np.uint64).tofile(f)
+        self.bloom.add_many(new_hashes)
+
+        if history_dir:
+            os.makedirs(history_dir, exist_ok=True)
+            ts = datetime.now(timezone.utc).strftime("%Y%m%d")
+            with open(os.path.join(history_dir, f"processed_urls_{ts}.log"), "a", encoding="utf-8") as f:
+                f.write("".join(f"{u}\n" for u in new_urls))
+
+        return new_urls
+
+    def update(self, urls):
+        self.add_many(urls)
+
+    def compact(self):
+        """Rewrite log and index without duplicates and rebuild the bloom filter"""
+        with self._lock():
+            seen, urls = set(), []
+            for url in self:
+                normalized = normalize_url(url)
+                h = url_hash(normalized)
+                if h not in seen:
+                    seen.add(h)
+                    urls.append(normalized)
+
+            hashes = np.fromiter((url_hash(u) for u in urls), dtype=np.uint64, count=len(urls))
+            for path, write in (
+                (self.log_path, lambda f: f.write("".join(f"{u}\n" for u in urls).encode("utf-8"))),
+                (self.idx_path, lambda f: hashes.tofile(f)),
+            ):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    write(f)
+                os.replace(tmp_path, path)
+
+            self.bloom = BloomFilter.for_capacity(2 * len(hashes))
+            self.bloom.add_many(hashes)
+            self.bloom.save(self.bloom_path)
+            self._hashes = set(hashes.tolist())
+
+        logger.info("Compacted processed URL log to %d URLs", len(urls))
+        return len(urls)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if PROJECT_ROOT not in sys.path:
+        sys.path.append(PROJECT_ROOT)
+    from config.load_config import load_config
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Processed URL log maintenance")
+    parser.add_argument("command", choices=["compact", "stats"])
+    args = parser.parse_args()
+
+    cfg = load_config(os.path.join(PROJECT_ROOT, "config", "config.yaml"))
+    store = ProcessedURLStore(cfg["data"]["processed_urls_path"])
+    if args.command == "compact":
+        store.compact()
+    else:
+        print(f"{len(store)} processed URLs")
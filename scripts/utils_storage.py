@@ -4,34 +4,117 @@ from datetime import datetime, timezone
 import joblib
 import numpy as np
 
+from scripts.url_store import ProcessedURLStore
+
 def load_processed_urls(master_path):
-    if os.path.exists(master_path):
-        return set(pd.read_csv(master_path).url.tolist())
-    return set()
+    """Processed-URL store: supports `url in store`, len() and add_many()"""
+    return ProcessedURLStore(master_path)
 
 def append_processed_urls(master_path, new_urls, history_dir=None):
-    os.makedirs(os.path.dirname(master_path), exist_ok=True)
-    # load existing if any
-    existing = pd.DataFrame({"url": list(load_processed_urls(master_path))})
-    new_df = pd.DataFrame({"url": list(new_urls)})
-    combined = pd.concat([existing, new_df], ignore_index=True).drop_duplicates().reset_index(drop=True)
-    combined.to_csv(master_path, index=False)
-    # historico
-    if history_dir:
-        os.makedirs(history_dir, exist_ok=True)
-        ts = datetime.now(timezone.utc).strftime("%Y%m%d")
-        combined.to_csv(os.path.join(history_dir, f"processed_urls_{ts}.csv"), index=False)
+    return ProcessedURLStore(master_path).add_many(new_urls, history_dir=history_dir)
 
-def save_model_version(obj, models_dir, name_prefix):
+def _version_path(models_dir, name_prefix, extension):
+    """New `<prefix>_v<UTC timestamp>[-n]<extension>` path; never an existing version"""
     os.makedirs(models_dir, exist_ok=True)
-    ts = datetime.now(timezone.utc).strftime("%Y%m%d")
-    path = os.path.join(models_dir, f"{name_prefix}_v{ts}.joblib")
+    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(models_dir, f"{name_prefix}_v{ts}{extension}")
+    n = 1
+    while os.path.exists(path):
+        path = os.path.join(models_dir, f"{name_prefix}_v{ts}-{n}{extension}")
+        n += 1
+    return path
+
+def save_model_version(obj, models_dir, name_prefix):
+    path = _version_path(models_dir, name_prefix, ".joblib")
     joblib.dump(obj, path)
     return path
 
 def save_embeddings(arr, models_dir, name_prefix):
-    os.makedirs(models_dir, exist_ok=True)
-    ts = datetime.now(timezone.utc).strftime("%Y%m%d")
-    path = os.path.join(models_dir, f"{name_prefix}_v{ts}.npz")
+    path = _version_path(models_dir, name_prefix, ".npz")
     np.savez_compressed(path, embeddings=arr)
     return path
+
+def load_cluster_state(models_dir):
+    path = os.path.join(models_dir, "kmeans_state.joblib")
+    if os.path.exists(path):
+        return joblib.load(path)
+    return None
+
+def save_cluster_state(state, models_dir):
+    os.makedirs(models_dir, exist_ok=True)
+    path = os.path.join(models_dir, "kmeans_state.joblib")
+    joblib.dump(state, path)
+    return path
+
+def new_snapshot_name():
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%MZ")
+
+def save_corpus_snapshot(df, embeddings, models_dir, init_centroids=None, snapshot=None):
+    """
+    Write an aligned (corpus, embeddings) pair that can be reloaded with
+    load_corpus_snapshot, plus the KMeans init centroids of the retrain that
+    used it. embeddings=None keeps the embeddings already written for
+    `snapshot` (see write_snapshot_embeddings).
+    """
+    os.makedirs(models_dir, exist_ok=True)
+    snapshot = snapshot or new_snapshot_name()
+    df.to_parquet(os.path.join(models_dir, f"corpus_{snapshot}.parquet"), index=False)
+    if embeddings is not None:
+        np.save(os.path.join(models_dir, f"embeddings_{snapshot}.npy"), np.asarray(embeddings))
+    if init_centroids is not None:
+        np.save(os.path.join(models_dir, f"init_centroids_{snapshot}.npy"), np.asarray(init_centroids))
+    return snapshot
+
+def write_snapshot_embeddings(batches, n_rows, models_dir, snapshot):
+    """
+    Write `n_rows` embeddings arriving in batches straight into the .npy of
+    `snapshot` (memory-mapped, never the whole matrix in RAM)
+    """
+    os.makedirs(models_dir, exist_ok=True)
+    path = os.path.join(models_dir, f"embeddings_{snapshot}.npy")
+    out, offset = None, 0
+    for batch in batches:
+        batch = np.asarray(batch, dtype=np.float32)
+        if out is None:
+            out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n_rows, batch.shape[1]))
+        if offset + len(batch) > n_rows:
+            raise ValueError(f"Got more than the expected {n_rows} embeddings")
+        out[offset:offset + len(batch)] = batch
+        offset += len(batch)
+    if offset != n_rows:
+        raise ValueError(f"Got {offset} embeddings, expected {n_rows}")
+    if out is not None:
+        out.flush()
+        del out
+    return path
+
+def load_snapshot_init_centroids(models_dir, snapshot):
+    """KMeans init centroids recorded with a snapshot (None: the retrain was a cold start)"""
+    path = os.path.join(models_dir, f"init_centroids_{snapshot}.npy")
+    return np.load(path) if os.path.exists(path) else None
+
+def list_corpus_snapshots(models_dir):
+    if not os.path.isdir(models_dir):
+        return []
+    return sorted(
+        name[len("embeddings_"):-len(".npy")]
+        for name in os.listdir(models_dir)
+        if name.startswith("embeddings_") and name.endswith(".npy")
+        and os.path.exists(os.path.join(models_dir, f"corpus_{name[len('embeddings_'):-len('.npy')]}.parquet"))
+    )
+
+def load_corpus_snapshot(models_dir, snapshot=None, mmap=True):
+    """Load a corpus snapshot (latest if not given); embeddings are memory-mapped read-only"""
+    if snapshot is None:
+        snapshots = list_corpus_snapshots(models_dir)
+        if not snapshots:
+            raise FileNotFoundError(f"No corpus snapshots found in {models_dir}")
+        snapshot = snapshots[-1]
+    df = pd.read_parquet(os.path.join(models_dir, f"corpus_{snapshot}.parquet"))
+    embeddings = np.load(
+        os.path.join(models_dir, f"embeddings_{snapshot}.npy"),
+        mmap_mode="r" if mmap else None
+    )
+    if len(df) != len(embeddings):
+        raise ValueError(f"Snapshot {snapshot} is inconsistent: {len(df)} rows vs {len(embeddings)} embeddings")
+    return df, embeddings, snapshot
@@ -0,0 +1,324 @@
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import shutil
+import logging
+from contextlib import contextmanager
+
+import joblib
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from config.load_config import load_config
+from scraping.scraper_base import BaseScraper
+from nlp.clustering import fit_kmeans, partial_fit_kmeans
+from nlp.cleaning_tfidf import clean_texts_for_tfidf
+from nlp.interpretation import update_cluster_tfidf_sums
+from backend.newsletter import newsletter_candidates
+from scripts.instrumentation import RunReport
+from scripts.article_store import ArticleStore, open_article_store
+from scripts.stage_cache import open_stage_cache
+from scripts.utils_storage import load_processed_urls
+from scripts.run_weekly_pipeline import (
+    build_scrapers,
+    collect_new_links,
+    scrape_links,
+    normalize_articles,
+    embed_articles,
+    cluster_articles,
+    score_articles,
+    persist_articles,
+    render_newsletter_html,
+    send_newsletter,
+)
+
+logger = logging.getLogger("weekly_tasks")
+
+# Offline runs: `scraping` config section -> fake site (benchmarks.fake_sites) serving synthetic articles
+OFFLINE_SITES = {
+    "xataka": "Xataka",
+    "techcrunch": "TechCrunch",
+    "aws": "AWS Blog",
+    "huggingface": "Hugging Face Blog",
+    "wired": "Wired ES",
+}
+OFFLINE_ARTICLES_PER_SOURCE = 40
+
+
+def load_task_config():
+    """config.yaml, or the file named by NEWSLETTER_CONFIG"""
+    return load_config(os.environ.get("NEWSLETTER_CONFIG", os.path.join(PROJECT_ROOT, "config", "config.yaml")))
+
+
+def run_dir(cfg, run_key):
+    """Staging directory of one DAG run (run ids contain ':' and '+')"""
+    staging_dir = cfg.get("airflow", {}).get("staging_dir", "data/staging")
+    return os.path.join(staging_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", run_key))
+
+
+def staged_store(cfg, run_key, name):
+    """
+    Per-run article store exchanged between tasks:
+
+        scraped   normalized articles, appended by the per-source tasks
+        embedded  + text_for_embedding / embedding
+        scored    + cluster / scores
+    """
+    return ArticleStore(os.path.join(run_dir(cfg, run_key), name))
+
+
+def _replace_staged(cfg, run_key, name, df):
+    """Write `df` as the whole content of a staged store (a retried task replaces its own output)"""
+    path = os.path.join(run_dir(cfg, run_key), name)
+    shutil.rmtree(path, ignore_errors=True)
+    ArticleStore(path).append(df)
+
+
+@contextmanager
+def task_report(cfg, run_key, name):
+    """RunReport of one task, saved to <run dir>/reports/<name>.json whatever the outcome"""
+    report = RunReport(f"weekly_{name}")
+    BaseScraper.reset_fetch_stats()
+    error = None
+    try:
+        yield report
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        report.finish("failed" if error is not None else "completed", error=error)
+        report.save(os.path.join(run_dir(cfg, run_key), "reports", f"{name}.json"))
+
+
+def _offline_articles(source, run_key, n=OFFLINE_ARTICLES_PER_SOURCE):
+    """Synthetic articles of one source; the run key picks them, so each run sees new URLs"""
+    from benchmarks.corpus import generate_articles
+
+    seed = zlib.crc32(run_key.encode("utf-8"))
+    return generate_articles(
+        n, seed=seed, sources=[OFFLINE_SITES[source]], days=7, start_index=(seed % 100000) * 1000
+    )
+
+
+def scrape_source(source, run_key, offline=False):
+    """
+    Collect, scrape and normalize the new articles of one source (a key of
+    the `scraping` config section) into the run's `scraped` store. Links and
+    raw articles go through the stage cache, so a retry only redoes what
+    failed; articles already staged by a previous attempt are not added twice.
+    """
+    cfg = load_task_config()
+    cache = open_stage_cache(cfg)
+    processed_urls = load_processed_urls(cfg["data"]["processed_urls_path"])
+
+    with task_report(cfg, run_key, f"scrape-{source}") as report:
+        sites = None
+        if offline:
+            from benchmarks.fake_sites import FakeSites
+
+            sites = FakeSites(_offline_articles(source, run_key).to_dict("records")).start()
+            scrapers = list(sites.scrapers().values())
+        else:
+            scrapers = build_scrapers(cfg["scraping"], sources=[source])
+        scraper_code = [BaseScraper] + [type(s) for s in scrapers]
+
+        try:
+            span = report.stage("collect_links")
+            links_key = cache.key(
+                "links",
+                inputs={"run_key": run_key, "source": source, "offline": offline, "scraping": cfg["scraping"][source]},
+                code=scraper_code
+            )
+            links = cache.cached("links", links_key, lambda: collect_new_links(scrapers, processed_urls), span=span)
+            span.items = len(links)
+
+            span = report.stage("scrape", items=len(links))
+            articles_key = cache.key("articles", parent=links_key, code=scraper_code)
+            articles = cache.cached("articles", articles_key, lambda: scrape_links(scrapers, links), span=span)
+        finally:
+            if sites is not None:
+                sites.stop()
+        report.add_section("fetch", BaseScraper.fetch_stats_snapshot())
+
+        report.stage("normalize", items=len(articles))
+        df = normalize_articles(articles) if articles else pd.DataFrame()
+        store = staged_store(cfg, run_key, "scraped")
+        if not df.empty:
+            staged_urls = set(store.read(columns=["url"])["url"]) if store.count() else set()
+            df = df[~df["url"].isin(staged_urls)]
+            store.append(df)
+
+    logger.info("Source %s: %d new links, %d articles staged", source, len(links), len(df))
+    return {"source": source, "links": len(links), "articles": int(len(df))}
+
+
+def embed_staged(run_key, offline=False):
+    """Embed every article scraped in this run: `scraped` -> `embedded`"""
+    cfg = load_task_config()
+    df = staged_store(cfg, run_key, "scraped").read()
+    with task_report(cfg, run_key, "embed") as report:
+        report.stage("embed", items=len(df))
+        if df.empty:
+            return 0
+        model_name = cfg["embeddings"]["active_model"]
+        embedder = None
+        if offline:
+            from benchmarks.embedder import HashingEmbedder
+            embedder = HashingEmbedder()
+        df, _ = embed_articles(df, model_name, report, embedder=embedder)
+
+        report.stage("stage_output", items=len(df))
+        _replace_staged(cfg, run_key, "embedded", df)
+    return int(len(df))
+
+
+def _bootstrap_kmeans(cfg, embeddings):
+    """Offline runs without a trained model: fit one on this run's embeddings"""
+    models_dir = cfg["paths"]["models_dir"]
+    k = min(cfg["clustering"].get("n_clusters", 6), len(embeddings))
+    kmeans, _, _ = fit_kmeans(embeddings, k)
+    os.makedirs(models_dir, exist_ok=True)
+    joblib.dump(kmeans, os.path.join(models_dir, "kmeans.joblib"))
+    logger.warning("No KMeans model in %s; bootstrapped one with k=%d", models_dir, k)
+
+
+def score_staged(run_key, offline=False):
+    """
+    Cluster (incremental centroid update) and score the embedded articles:
+    `embedded` -> `scored`. The model update goes through the stage cache,
+    so a retry of this task does not apply it twice.
+    """
+    cfg = load_task_config()
+    cache = open_stage_cache(cfg)
+    df = staged_store(cfg, run_key, "embedded").read()
+    with task_report(cfg, run_key, "score") as report:
+        span = report.stage("cluster", items=len(df))
+        if df.empty:
+            return {"articles": 0, "retrain_required": False}
+        embeddings = np.vstack(df["embedding"].values)
+        if not os.path.exists(os.path.join(cfg["paths"]["models_dir"], "kmeans.joblib")):
+            if not offline:
+                raise FileNotFoundError(f"KMeans model not found in {cfg['paths']['models_dir']}")
+            _bootstrap_kmeans(cfg, embeddings)
+
+        # Keyed by the embedded articles themselves (a re-scrape that stages a
+        # different set, or another embedder, must update the model again)
+        clustered_key = cache.key(
+            "clustered",
+            inputs={
+                "run_key": run_key,
+                "urls": sorted(df["url"]),
+                "embedder": "hashing" if offline else cfg["embeddings"]["active_model"],
+                "clustering": cfg["clustering"],
+                "tfidf": cfg.get("tfidf", {})
+            },
+            code=[cluster_articles, partial_fit_kmeans, clean_texts_for_tfidf, update_cluster_tfidf_sums]
+        )
+        df, centroids, retrain_required = cache.cached(
+            "clustered", clustered_key, lambda: cluster_articles(cfg, df, embeddings), span=span
+        )
+
+        report.stage("score", items=len(df))
+        df = score_articles(cfg, df, embeddings, centroids)
+
+        report.stage("stage_output", items=len(df))
+        _replace_staged(cfg, run_key, "scored", df)
+    return {"articles": int(len(df)), "retrain_required": bool(retrain_required)}
+
+
+def persist_staged(run_key):
+    """Append the scored articles to the article store, processed URLs and neighbour lists (once per run)"""
+    cfg = load_task_config()
+    cache = open_stage_cache(cfg)
+    df = staged_store(cfg, run_key, "scored").read()
+    with task_report(cfg, run_key, "persist") as report:
+        span = report.stage("persist", items=len(df))
+        if df.empty:
+            return {"new_articles": 0}
+        persisted_key = cache.key(
+            "persisted",
+            inputs={"run_key": run_key, "urls": sorted(df["url"]), "store_dir": cfg["data"].get("store_dir")}
+        )
+        processed_urls = load_processed_urls(cfg["data"]["processed_urls_path"])
+        return cache.cached(
+            "persisted", persisted_key,
+            lambda: persist_articles(cfg, df, np.vstack(df["embedding"].values), processed_urls),
+            span=span
+        )
+
+
+def render_run(run_key, retrain_required=False):
+    """
+    Render the newsletter from the article store and save it together with
+    the run report (the task reports of this run), send it if configured
+    (once per run) and launch the full retrain if cluster drift requires it.
+    """
+    cfg = load_task_config()
+    cache = open_stage_cache(cfg)
+    report = RunReport("weekly_pipeline")
+    error = None
+    html_path = None
+    try:
+        span = report.stage("render")
+        rendered = render_newsletter_html(cfg, newsletter_candidates(open_article_store(cfg), cfg))
+        span.items = rendered["items"]
+        html_path = rendered["path"]
+        new_articles = len(staged_store(cfg, run_key, "scored").read(columns=["url"]))
+        report.add_section("outputs", {"newsletter_html": html_path, "new_articles": new_articles})
+        logger.info("Saved newsletter HTML to %s", html_path)
+
+        if cfg["newsletter"]["send"]:
+            span = report.stage("send", items=len(cfg["newsletter"]["recipients"]))
+            sent_key = cache.key("sent", inputs={"run_key": run_key, "recipients": cfg["newsletter"]["recipients"]})
+            if cache.get("sent", sent_key) is not None:
+                span.info["cache"] = "hit"
+                logger.info("Newsletter already sent for this run")
+            elif send_newsletter(cfg, html_path):
+                cache.put("sent", sent_key, {"recipients": len(cfg["newsletter"]["recipients"])})
+
+        if retrain_required and cfg["clustering"].get("incremental", {}).get("auto_retrain", False):
+            logger.warning("Cluster drift above threshold; launching full retrain from the article store")
+            report.stage("retrain")
+            from scripts.full_retrain import main as full_retrain_main
+            # Stored articles and embeddings: no re-scrape or re-embed inside the weekly run
+            full_retrain_main(from_store=True)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        report.finish("failed" if error is not None else "completed", error=error)
+        reports_dir = os.path.join(run_dir(cfg, run_key), "reports")
+        tasks = {}
+        if os.path.isdir(reports_dir):
+            for name in sorted(os.listdir(reports_dir)):
+                with open(os.path.join(reports_dir, name), "r", encoding="utf-8") as f:
+                    tasks[os.path.splitext(name)[0]] = json.load(f)
+        report.add_section("run_key", run_key)
+        report.add_section("tasks", tasks)
+        report.save(
+            os.path.splitext(html_path)[0] + ".report.json" if html_path
+            else os.path.join(cfg["data"]["newsletters_dir"], f"weekly_news_{report.run_id}.report.json")
+        )
+    return html_path
+
+
+def cleanup_run(run_key):
+    """Remove this run's staging directory and those of runs older than the stage cache retention"""
+    cfg = load_task_config()
+    shutil.rmtree(run_dir(cfg, run_key), ignore_errors=True)
+
+    staging_dir = cfg.get("airflow", {}).get("staging_dir", "data/staging")
+    if not os.path.isdir(staging_dir):
+        return
+    cutoff = time.time() - cfg.get("stage_cache", {}).get("max_age_days", 14) * 86400
+    for name in os.listdir(staging_dir):
+        path = os.path.join(staging_dir, name)
+        if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+import backend.main as api
+from backend.article_cache import ArticleCache
+from scripts.article_index import decode_cursor, encode_cursor
+from scripts.article_store import ArticleStore
+
+
+def _articles(start, n):
+    return pd.DataFrame({
+        "title": [f"Article {i}" for i in range(start, start + n)],
+        "url": [f"https://example.com/{i}" for i in range(start, start + n)],
+        "source": ["Xataka"] * n,
+        "cluster": [i % 2 for i in range(start, start + n)],
+        "final_score": [0.5] * n,
+        "scraping_date": pd.to_datetime(["2025-01-06"] * n),
+    })
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    store = ArticleStore(str(tmp_path / "store"))
+    store.append(_articles(0, 5))
+    monkeypatch.setattr(api, "_article_engine", ArticleCache(store))
+    return TestClient(api.app), store
+
+
+def test_cursor_round_trip_and_validation():
+    cursor = encode_cursor("score", 0.5, "https://example.com/1")
+    assert decode_cursor(cursor, "score") == (0.5, "https://example.com/1")
+    with pytest.raises(ValueError, match="sort 'score'"):
+        decode_cursor(cursor, "date")
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("not-a-cursor", "score")
+
+
+def test_cursor_pages_cover_ties_exactly_once(client):
+    client, _ = client
+    urls, cursor = [], None
+    while True:
+        params = {"sort": "score", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/articles", params=params).json()
+        urls.extend(a["url"] for a in body["articles"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    # Equal scores are ordered by url
+    assert urls == sorted(f"https://example.com/{i}" for i in range(5))
+
+
+def test_invalid_cursors_are_rejected(client):
+    client, _ = client
+    date_cursor = client.get("/articles", params={"sort": "date", "limit": 1}).json()["next_cursor"]
+    assert client.get("/articles", params={"sort": "score", "cursor": date_cursor}).status_code == 400
+    assert client.get("/articles", params={"sort": "score", "cursor": "garbage"}).status_code == 400
+    assert client.get("/articles", params={"cursor": date_cursor}).status_code == 400
+
+
+def test_etag_revalidation(client):
+    client, store = client
+    first = client.get("/articles", params={"limit": 2})
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+
+    assert client.get("/articles", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 304
+    # Another query has another ETag
+    other = client.get("/articles", params={"limit": 3}, headers={"If-None-Match": etag})
+    assert other.status_code == 200 and other.headers["etag"] != etag
+
+    # New data changes the ETag of the same query
+    store.append(_articles(5, 2))
+    refreshed = client.get("/articles", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert refreshed.json()["total"] == 7
@@ -0,0 +1,98 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from backend.article_cache import ArticleCache
+from scripts.article_index import ArticleIndex
+from scripts.article_store import ArticleStore
+from scripts.neighbor_store import parse_article_id
+
+ARTICLES = pd.DataFrame({
+    "title": [f"Article {i}" for i in range(7)],
+    "url": [f"https://example.com/{i}" for i in range(7)],
+    "source": ["OpenAI", "Xataka", "OpenAI", "Wired ES", "Xataka", "OpenAI", "Wired ES"],
+    "cluster": [0, 1, 0, 1, 2, 2, 0],
+    "final_score": [0.9, 0.5, 0.7, 0.5, 0.1, 0.3, 0.8],
+    "scraping_date": pd.to_datetime([
+        "2025-01-06 10:00", "2025-01-07 09:00", None, "2025-01-07 09:00",
+        "2025-01-13 12:00", None, "2025-01-14 08:00",
+    ]),
+})
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def engine(request, tmp_path):
+    store = ArticleStore(str(tmp_path / "store"))
+    store.append(ARTICLES)
+    if request.param == "memory":
+        return ArticleCache(store)
+    return ArticleIndex(str(tmp_path / "articles.db"), store)
+
+
+def _all_pages(engine, sort, limit=2, **filters):
+    records, cursor = [], None
+    while True:
+        total, page, cursor = engine.page(limit=limit, sort=sort, cursor=cursor, **filters)
+        records.extend(page)
+        if cursor is None:
+            return total, records
+
+
+def test_undated_rows_are_served_without_date(engine):
+    total, records = engine.query(limit=10)
+    assert total == len(ARTICLES)
+    undated = {r["url"] for r in records if r["scraping_date"] is None}
+    assert undated == {"https://example.com/2", "https://example.com/5"}
+
+
+def test_source_filter_with_undated_rows(engine):
+    total, records = engine.query(limit=10, source="openai")
+    assert total == 3
+    assert {r["url"] for r in records} == {"https://example.com/0", "https://example.com/2", "https://example.com/5"}
+
+
+def test_date_pages_put_undated_rows_last(engine):
+    total, records = _all_pages(engine, "date")
+    assert total == len(ARTICLES)
+    assert [r["url"][-1] for r in records] == ["6", "4", "1", "3", "0", "2", "5"]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_cursor_pages_cover_every_row_once(engine, limit):
+    for sort in ("date", "score"):
+        total, records = _all_pages(engine, sort, limit=limit)
+        assert sorted(r["url"] for r in records) == sorted(ARTICLES["url"])
+
+    _, records = _all_pages(engine, "score", limit=limit, cluster=0)
+    assert [r["url"][-1] for r in records] == ["0", "6", "2"]
+
+
+def test_date_window_excludes_undated_rows(engine):
+    total, records = engine.query(limit=10, start_date="2025-01-01")
+    assert total == 5
+    assert all(r["scraping_date"] is not None for r in records)
+
+
+def test_engines_follow_store_appends_and_compaction(engine):
+    store = engine.store
+    version = engine.data_version()
+    store.append(ARTICLES.iloc[:2].assign(url=["https://example.com/7", "https://example.com/8"]))
+    assert engine.data_version() > version
+    assert engine.query(limit=20)[0] == len(ARTICLES) + 2
+
+    store.compact(min_parts=2)
+    total, records = engine.query(limit=20)
+    assert total == len(ARTICLES) + 2
+    assert len({r["url"] for r in records}) == total
+
+
+def test_by_ids_keeps_requested_order(engine):
+    _, records = engine.query(limit=10)
+    ids = [r["id"] for r in records[:3]][::-1]
+    assert [r["id"] for r in engine.by_ids([parse_article_id(i) for i in ids] + [12345])] == ids
@@ -0,0 +1,111 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from scripts.article_store import ArticleStore
+
+
+def _articles(urls, source="Xataka", date="2025-01-06", **columns):
+    n = len(urls)
+    return pd.DataFrame({
+        "url": urls,
+        "title": [f"Title {u}" for u in urls],
+        "source": [source] * n if not isinstance(source, list) else source,
+        "scraping_date": pd.to_datetime([date] * n if not isinstance(date, list) else date),
+        "final_score": np.linspace(0, 1, n),
+        **columns,
+    })
+
+
+def test_append_writes_week_source_partitions(tmp_path):
+    store = ArticleStore(str(tmp_path))
+    entries = store.append(_articles(
+        ["a", "b", "c"], source=["Xataka", "Wired ES", "Xataka"], date=["2025-01-06", "2025-01-06", "2025-01-14"]
+    ))
+    assert sorted(e["path"].rsplit(os.sep, 1)[0] for e in entries) == [
+        os.path.join("week=2025-W02", "source=wired-es"),
+        os.path.join("week=2025-W02", "source=xataka"),
+        os.path.join("week=2025-W03", "source=xataka"),
+    ]
+    assert store.version == 1
+    assert store.count() == 3
+    assert store.sources() == ["Wired ES", "Xataka"]
+
+
+def test_reads_prune_by_partition_and_filter_rows(tmp_path):
+    store = ArticleStore(str(tmp_path))
+    store.append(_articles(["a", "b"], date=["2025-01-06", "2025-01-07"]))
+    store.append(_articles(["c"], source="Wired ES", date="2025-02-03"))
+
+    assert len(store.parts(start_date="2025-02-01")) == 1
+    assert store.read(columns=["url"], end_date="2025-01-06")["url"].tolist() == ["a"]
+    assert store.read(columns=["url"], sources=["Wired ES"])["url"].tolist() == ["c"]
+
+    frames = list(store.iter_frames(["url"], batch_size=1))
+    assert [len(f) for f in frames] == [1, 1, 1]
+    assert sorted(pd.concat(frames)["url"]) == ["a", "b", "c"]
+
+
+def test_rows_without_date_or_source_are_kept(tmp_path):
+    store = ArticleStore(str(tmp_path))
+    df = _articles(["a", "b", "c"], source=["Xataka", None, "Xataka"], date=["2025-01-06", "2025-01-06", None])
+    entries = store.append(df)
+
+    partitions = {(e["week"], e["source"]) for e in entries}
+    assert partitions == {("2025-W02", "Xataka"), ("2025-W02", None), ("unknown", "Xataka")}
+    assert store.count() == 3
+    assert sorted(store.read(columns=["url"])["url"]) == ["a", "b", "c"]
+    # Undated rows are outside every date window
+    assert sorted(store.read(columns=["url"], start_date="2000-01-01")["url"]) == ["a", "b"]
+
+
+def test_append_skip_existing_is_idempotent(tmp_path):
+    store = ArticleStore(str(tmp_path))
+    df = _articles(["a", "b"])
+    store.append(df, skip_existing=True)
+    assert store.append(df, skip_existing=True) == []
+    store.append(_articles(["b", "c"]), skip_existing=True)
+    assert sorted(store.read(columns=["url"])["url"]) == ["a", "b", "c"]
+
+
+def test_compact_merges_parts_and_retires_old_files(tmp_path):
+    store = ArticleStore(str(tmp_path), retire_grace_seconds=0)
+    for url in ["a", "b", "c"]:
+        store.append(_articles([url]))
+    store.append(_articles(["d"], source="Wired ES"))
+    old_paths = [e["path"] for e in store.parts()]
+    before = store.read().sort_values("url").reset_index(drop=True)
+
+    assert store.compact(min_parts=2) == 3
+    assert len(store.parts()) == 2
+    pd.testing.assert_frame_equal(store.read().sort_values("url").reset_index(drop=True), before)
+
+    # Retired files are deleted by the next compaction, after the grace period
+    assert all(os.path.exists(os.path.join(str(tmp_path), p)) for p in old_paths)
+    store.compact(min_parts=2)
+    assert sum(os.path.exists(os.path.join(str(tmp_path), p)) for p in old_paths) == 1
+
+
+def test_schema_unifies_part_types(tmp_path):
+    store = ArticleStore(str(tmp_path))
+    store.append(_articles(["a"], cluster=[1]))
+    store.append(_articles(["b"], source="Wired ES", cluster=[2.5], cluster_name=["x"]))
+
+    schema = store.schema(["url", "cluster", "cluster_name"])
+    assert str(schema.field("cluster").type) == "double"
+    assert schema.names == ["url", "cluster", "cluster_name"]
+    assert set(store.columns()) >= {"url", "cluster", "cluster_name"}
+
+
+def test_legacy_parquet_is_imported_once(tmp_path):
+    legacy = tmp_path / "legacy.parquet"
+    _articles(["a", "b"]).to_parquet(legacy, index=False)
+    store = ArticleStore(str(tmp_path / "store"), legacy_path=str(legacy))
+    assert store.count() == 2
+    assert ArticleStore(str(tmp_path / "store"), legacy_path=str(legacy)).count() == 2
@@ -0,0 +1,79 @@
+import os
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from nlp.clustering import (
+    fit_kmeans,
+    match_clusters,
+    relabel_kmeans,
+    init_cluster_state,
+    partial_fit_kmeans,
+    drift_exceeded
+)
+from scripts.utils_storage import save_model_version
+
+
+def _blobs(centers, n=50, scale=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = np.asarray(centers, dtype=np.float64)
+    points = np.vstack([c + scale * rng.standard_normal((n, centers.shape[1])) for c in centers])
+    return points, np.repeat(np.arange(len(centers)), n)
+
+
+CENTERS = np.eye(4)
+
+
+def test_match_clusters_keeps_ids_of_permuted_fit():
+    permutation = np.array([2, 0, 3, 1])
+    order, mapping = match_clusters(CENTERS, CENTERS[permutation])
+    # order[stable id] = id in the new fit
+    assert np.array_equal(permutation[order], np.arange(4))
+    assert all(m["previous_id"] == stable for stable, m in mapping.items())
+    assert all(m["similarity"] > 0.99 for m in mapping.values())
+
+
+def test_match_clusters_with_new_cluster():
+    new = np.vstack([CENTERS[[1, 0, 2, 3]], [[0.5, 0.5, 0.5, 0.5]]])
+    order, mapping = match_clusters(CENTERS, new)
+    assert sorted(order.tolist()) == list(range(5))
+    assert order[:4].tolist() == [1, 0, 2, 3]
+    assert mapping[4]["previous_id"] is None
+
+
+def test_relabel_kmeans_follows_previous_ids():
+    points, truth = _blobs(CENTERS)
+    kmeans, labels, centroids = fit_kmeans(points, 4)
+    order, _ = match_clusters(CENTERS, centroids)
+    labels, centroids = relabel_kmeans(kmeans, order)
+    assert np.array_equal(labels, truth)
+    assert np.allclose(centroids, CENTERS, atol=0.05)
+
+
+def test_partial_fit_moves_centroids_towards_batch():
+    points, _ = _blobs(CENTERS)
+    kmeans, _, _ = fit_kmeans(points, 4)
+    state = init_cluster_state(kmeans)
+
+    batch, _ = _blobs(CENTERS, n=10, seed=1)
+    labels, drift = partial_fit_kmeans(kmeans, state, batch)
+    assert np.array_equal(labels, kmeans.predict(batch))
+    assert state["n_seen"] == len(points) + len(batch)
+    assert state["counts"].sum() == len(points) + len(batch)
+    assert not drift_exceeded(drift)
+
+    shifted, _ = _blobs(CENTERS + np.array([0.6, 0, 0, 0]), n=200, seed=2)
+    _, drift = partial_fit_kmeans(kmeans, state, shifted)
+    assert drift["max_centroid_shift"] > 0.25
+    assert drift_exceeded(drift)
+    assert len(state["drift_history"]) == 2
+
+
+def test_model_versions_never_overwrite(tmp_path):
+    paths = [save_model_version({"run": i}, str(tmp_path), "kmeans") for i in range(3)]
+    assert len(set(paths)) == 3
+    assert all(os.path.exists(p) for p in paths)
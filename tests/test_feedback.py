@@ -0,0 +1,139 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from backend.feedback import FeedbackBuffer
+from scripts.feedback_store import FeedbackStore
+from scripts.neighbor_store import article_ids
+
+
+def _totals(counters):
+    """[positive, negative, total] over all articles"""
+    return counters["url_counts"].sum(axis=0).tolist()
+
+
+def _events(n, rating="up", prefix="https://example.com/a"):
+    return [{"url": f"{prefix}{i}", "rating": rating, "timestamp": None, "cluster": i % 2} for i in range(n)]
+
+
+def test_append_updates_log_and_counters(tmp_path):
+    store = FeedbackStore(str(tmp_path))
+    store.append(_events(3) + _events(2, rating="down", prefix="https://example.com/b"))
+    counters = store.load_counters()
+    assert _totals(counters) == [3, 2, 5]
+    assert counters["cluster_counts"].sum(axis=0).tolist() == [3, 2, 5]
+    assert int(counters["log_offset"]) == os.path.getsize(store.log_path)
+    assert _totals(store.rebuild()) == [3, 2, 5]
+
+
+def test_failed_counters_update_catches_up_from_log(tmp_path, monkeypatch):
+    store = FeedbackStore(str(tmp_path))
+    store.append(_events(2))
+
+    def broken(counters):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store, "_save_counters", broken)
+    store.append(_events(3, prefix="https://example.com/c"))  # in the log: does not raise
+    monkeypatch.undo()
+
+    assert _totals(store.load_counters()) == [5, 0, 5]
+    store.append(_events(1, prefix="https://example.com/d"))
+    assert _totals(store.load_counters()) == [6, 0, 6]
+    assert _totals(store.rebuild()) == [6, 0, 6]
+
+
+def test_failed_log_write_leaves_no_trace(tmp_path, monkeypatch):
+    store = FeedbackStore(str(tmp_path))
+    store.append(_events(2))
+    size = os.path.getsize(store.log_path)
+
+    def broken_fsync(fd):
+        raise OSError("io error")
+
+    monkeypatch.setattr(os, "fsync", broken_fsync)
+    with pytest.raises(OSError):
+        store.append(_events(3, prefix="https://example.com/c"))
+    monkeypatch.undo()
+
+    assert os.path.getsize(store.log_path) == size
+    assert _totals(store.load_counters()) == [2, 0, 2]
+
+
+def test_torn_last_line_is_ignored_and_dropped(tmp_path):
+    store = FeedbackStore(str(tmp_path))
+    store.append(_events(2))
+    with open(store.log_path, "ab") as f:
+        f.write(b'{"url": "https://example.com/tor')
+    assert _totals(store.load_counters()) == [2, 0, 2]
+
+    store.append(_events(1, prefix="https://example.com/c"))
+    assert _totals(store.load_counters()) == [3, 0, 3]
+    assert _totals(store.rebuild()) == [3, 0, 3]
+
+
+def test_legacy_csv_is_imported_once(tmp_path):
+    with open(tmp_path / "feedback.csv", "w", encoding="utf-8") as f:
+        f.write("url,rating,timestamp\nhttps://example.com/x,thumb_up,2025-01-01\nhttps://example.com/y,thumb_down,2025-01-02\n")
+    store = FeedbackStore(str(tmp_path))
+    assert _totals(store.load_counters()) == [1, 1, 2]
+    assert os.path.exists(tmp_path / "feedback.csv.imported")
+
+    # A copy put back by mistake is not imported twice
+    os.replace(tmp_path / "feedback.csv.imported", tmp_path / "feedback.csv")
+    assert _totals(FeedbackStore(str(tmp_path)).load_counters()) == [1, 1, 2]
+
+
+def test_buffer_resolves_clusters_by_article_id(tmp_path):
+    stored = article_ids(["https://example.com/post"])
+    store = FeedbackStore(str(tmp_path))
+    buffer = FeedbackBuffer(store, resolve_clusters=lambda ids: {int(stored[0]): 7})
+    buffer.add("https://example.com/post/", "up")
+    buffer.add("https://example.com/post?utm_source=newsletter", "up")
+    buffer.add("https://example.com/other", "up")
+    assert buffer.flush() == 3
+
+    counters = store.load_counters()
+    assert counters["cluster_ids"].tolist() == [7]
+    assert counters["cluster_counts"].tolist() == [[2, 0, 2]]
+
+
+def test_buffer_logs_events_when_cluster_resolution_fails(tmp_path):
+    def broken(ids):
+        raise RuntimeError("engine not loaded")
+
+    store = FeedbackStore(str(tmp_path))
+    buffer = FeedbackBuffer(store, resolve_clusters=broken)
+    buffer.add("https://example.com/a", "up")
+    assert buffer.flush() == 1
+    assert buffer.pending() == 0
+    counters = store.load_counters()
+    assert _totals(counters) == [1, 0, 1]
+    assert len(counters["cluster_ids"]) == 0
+
+
+class FailingStore:
+    def append(self, events):
+        raise OSError("log not writable")
+
+
+def test_buffer_requeues_only_failed_appends_up_to_cap():
+    buffer = FeedbackBuffer(FailingStore(), max_events=10 ** 6, max_pending=5)
+    for i in range(4):
+        buffer.add(f"https://example.com/{i}", "up")
+    assert buffer.flush() == 0
+    assert buffer.pending() == 4
+
+    for i in range(4, 8):
+        buffer.add(f"https://example.com/{i}", "up")
+    buffer.flush()
+    assert buffer.pending() == 5
+    assert buffer.stats["dropped"] == 3
+    assert buffer._events[0]["url"] == "https://example.com/3"
+    assert np.all([e["cluster"] is None for e in buffer._events])
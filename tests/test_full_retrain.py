@@ -0,0 +1,82 @@
+import os
+import sys
+import copy
+
+import joblib
+import numpy as np
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+pytest.importorskip("sentence_transformers")
+
+import scripts.full_retrain as full_retrain
+from benchmarks.corpus import generate_articles
+from benchmarks.embedder import HashingEmbedder
+from config.load_config import load_config
+from nlp.clustering import fit_kmeans
+from scripts.article_store import ArticleStore
+
+
+@pytest.fixture
+def retrain(tmp_path, monkeypatch):
+    """full_retrain.main over a store of synthetic articles with precomputed embeddings"""
+    cfg = load_config(os.path.join(PROJECT_ROOT, "config", "config.yaml"))
+    cfg["data"].update(
+        store_dir=str(tmp_path / "store"),
+        processed_path=str(tmp_path / "missing.parquet"),
+        neighbors_dir=str(tmp_path / "neighbors"),
+    )
+    cfg["paths"]["models_dir"] = models_dir = str(tmp_path / "models")
+    cfg["clustering"].update(k_min=4, k_max=5)
+    monkeypatch.setattr(full_retrain, "load_config", lambda path: copy.deepcopy(cfg))
+    # spaCy models are not needed to check reproducibility
+    monkeypatch.setattr(full_retrain, "clean_texts_for_tfidf", lambda texts, langs, **kwargs: texts.str.lower())
+
+    df = generate_articles(400, seed=3, sources=["Xataka", "TechCrunch", "Wired ES", "AWS Blog"])
+    embeddings = HashingEmbedder().encode((df.title + ". " + df.content).str.lower().tolist())
+    df["embedding"] = list(embeddings)
+    ArticleStore(cfg["data"]["store_dir"]).append(df)
+
+    os.makedirs(models_dir)
+    kmeans, _, _ = fit_kmeans(embeddings[::-1], 4)
+    joblib.dump(kmeans, os.path.join(models_dir, "kmeans.joblib"))
+    return cfg, df
+
+
+def _model(models_dir):
+    return (
+        joblib.load(os.path.join(models_dir, "retrain_meta.joblib")),
+        joblib.load(os.path.join(models_dir, "kmeans.joblib")).cluster_centers_,
+    )
+
+
+def test_store_corpus_reuses_stored_embeddings(retrain):
+    cfg, df = retrain
+    corpus, embeddings, snapshot = full_retrain.load_corpus_from_store(
+        cfg, cfg["paths"]["models_dir"], sources=["Xataka", "AWS Blog"]
+    )
+    assert snapshot is not None
+    assert set(corpus["source"]) == {"Xataka", "AWS Blog"}
+    expected = np.stack(df.set_index("url").loc[corpus["url"], "embedding"].to_numpy())
+    np.testing.assert_allclose(embeddings, expected)
+
+
+def test_replaying_a_snapshot_reproduces_the_model(retrain):
+    cfg, df = retrain
+    models_dir = cfg["paths"]["models_dir"]
+    full_retrain.main(from_store=True)
+    meta, centroids = _model(models_dir)
+    assert meta["snapshot"]
+
+    # Whatever model is current, the replay starts from the snapshot's inputs
+    kmeans, _, _ = fit_kmeans(np.stack(df["embedding"].iloc[:50].to_numpy()), meta["best_k"])
+    joblib.dump(kmeans, os.path.join(models_dir, "kmeans.joblib"))
+    full_retrain.main(snapshot=meta["snapshot"])
+    replay_meta, replay_centroids = _model(models_dir)
+
+    assert replay_meta["init_centroids_sha256"] == meta["init_centroids_sha256"]
+    assert replay_meta["cluster_mapping"] == meta["cluster_mapping"]
+    np.testing.assert_allclose(replay_centroids, centroids)
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import numpy as np
+from scipy import sparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from nlp.interpretation import cluster_tfidf_sums, update_cluster_tfidf_sums, top_terms_from_sums
+
+TERMS = np.array([f"term{i}" for i in range(12)])
+
+
+def _tfidf(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    X = sparse.random(n, len(TERMS), density=0.3, random_state=seed, format="csr")
+    return X, rng.integers(0, 4, n)
+
+
+def _dense_top_terms(X, clusters, top_n):
+    """Reference: mean TF-IDF per cluster over a dense matrix, non-zero terms only"""
+    dense = X.toarray()
+    expected = {}
+    for c in np.unique(clusters):
+        mean = dense[clusters == c].mean(axis=0)
+        order = [i for i in np.argsort(-mean, kind="stable") if mean[i] > 0]
+        expected[int(c)] = TERMS[order[:top_n]].tolist()
+    return expected
+
+
+def test_top_terms_match_dense_means():
+    X, clusters = _tfidf()
+    state = cluster_tfidf_sums(X, clusters)
+    np.testing.assert_allclose(state["sums"].toarray(), [X[clusters == c].sum(axis=0).A1 for c in range(4)])
+    assert state["counts"].tolist() == np.bincount(clusters, minlength=4).tolist()
+    assert top_terms_from_sums(state, TERMS, top_n=5) == _dense_top_terms(X, clusters, 5)
+
+
+def test_incremental_update_equals_full_computation():
+    X, clusters = _tfidf(seed=1)
+    clusters[40:] = np.where(clusters[40:] == 3, 5, clusters[40:])  # a cluster first seen in the update
+    state = cluster_tfidf_sums(X[:40], clusters[:40])
+    update_cluster_tfidf_sums(state, X[40:], clusters[40:])
+
+    full = cluster_tfidf_sums(X, clusters)
+    np.testing.assert_allclose(state["sums"].toarray(), full["sums"].toarray())
+    np.testing.assert_array_equal(state["counts"], full["counts"])
+    assert top_terms_from_sums(state, TERMS, 3) == top_terms_from_sums(full, TERMS, 3)
+
+
+def test_empty_clusters_have_no_terms():
+    X = sparse.csr_matrix(np.eye(3, len(TERMS)) * [[0.2], [0.5], [1.0]])
+    state = cluster_tfidf_sums(X, [0, 0, 2])
+    assert top_terms_from_sums(state, TERMS, top_n=10) == {0: ["term1", "term0"], 2: ["term2"]}
@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import signal
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from backend.jobs import JobManager
+
+# Worker running a job kind that just sleeps
+SLEEP_WORKER = """
+import sys, time
+from backend.jobs import JOB_KINDS, JobManager
+JOB_KINDS["sleep"] = lambda progress=None, seconds=60: time.sleep(seconds)
+JobManager(sys.argv[2]).run(sys.argv[1])
+"""
+
+
+class SleepJobManager(JobManager):
+    def _start_worker(self, job_id):
+        return subprocess.Popen(
+            [sys.executable, "-c", SLEEP_WORKER, job_id, self.jobs_dir],
+            cwd=PROJECT_ROOT,
+            start_new_session=True
+        )
+
+
+class NoWorkerJobManager(JobManager):
+    def _start_worker(self, job_id):
+        return subprocess.Popen([sys.executable, "-c", "pass"])
+
+
+def _wait_for(predicate, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        result = predicate()
+        if result:
+            return result
+        time.sleep(0.1)
+    raise AssertionError("condition not met in time")
+
+
+def test_killed_worker_marks_job_failed(tmp_path):
+    manager = SleepJobManager(tmp_path)
+    job, deduplicated = manager.submit("sleep", {"seconds": 60})
+    assert not deduplicated
+
+    running = _wait_for(lambda: (j := manager.get(job["id"]))["status"] == "running" and j)
+    os.kill(running["pid"], signal.SIGKILL)
+
+    failed = _wait_for(lambda: (j := manager.get(job["id"]))["status"] == "failed" and j)
+    assert "exited unexpectedly" in failed["error"]
+
+    # An identical request is not deduplicated onto the dead job
+    retry, deduplicated = manager.submit("sleep", {"seconds": 60})
+    assert not deduplicated and retry["id"] != job["id"]
+    os.kill(_wait_for(lambda: manager.get(retry["id"])["pid"]), signal.SIGKILL)
+
+
+def test_worker_that_never_starts_times_out(tmp_path):
+    manager = NoWorkerJobManager(tmp_path, start_timeout=0.5)
+    job, _ = manager.submit("sleep", {"seconds": 60})
+    assert manager.get(job["id"])["status"] == "queued"
+
+    time.sleep(1)
+    failed = manager.get(job["id"])
+    assert failed["status"] == "failed"
+    assert "did not start" in failed["error"]
+
+
+def _finished_job(manager, job_id, status="completed", finished_at="2026-01-01T00:00:00+00:00"):
+    job = {
+        "id": job_id, "kind": "sleep", "params": {}, "status": status, "stage": None, "stages": [],
+        "created_at": finished_at, "started_at": finished_at, "finished_at": finished_at,
+        "result": None, "error": None, "pid": None,
+    }
+    manager._write(job)
+    return job
+
+
+def test_prune_keeps_newest_finished_jobs(tmp_path):
+    manager = NoWorkerJobManager(tmp_path, keep_finished=2, max_age_days=10 ** 4)
+    for i in range(5):
+        _finished_job(manager, f"20260101T00000{i}Z-aaaaaa", status="failed" if i % 2 else "completed")
+
+    assert manager.prune() == 3
+    assert [job["id"] for job in manager.list()] == ["20260101T000004Z-aaaaaa", "20260101T000003Z-aaaaaa"]
+
+
+def test_prune_drops_old_jobs_and_keeps_active_ones(tmp_path):
+    manager = NoWorkerJobManager(tmp_path, keep_finished=100, max_age_days=30)
+    _finished_job(manager, "20200101T000000Z-aaaaaa", finished_at="2020-01-01T00:00:00+00:00")
+    queued, _ = manager.submit("sleep", {"seconds": 60})
+
+    assert [job["id"] for job in manager.list()] == [queued["id"]]
+    assert manager.get(queued["id"])["status"] == "queued"
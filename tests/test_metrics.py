@@ -0,0 +1,63 @@
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from backend.metrics import Registry, Counter, Gauge, Histogram, CallbackGauge
+
+
+def _families(text):
+    """{family: (type, [sample lines])} of a text exposition"""
+    families, current = {}, None
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, type_ = line.split(" ")
+            families[name] = (type_, [])
+            current = name
+        elif not line.startswith("#"):
+            families[current][1].append(line)
+    return families
+
+
+def test_counter_samples_belong_to_declared_family():
+    registry = Registry()
+    counter = Counter("http_requests", "Requests", ["route"], registry=registry)
+    counter.inc(route="/a")
+    counter.inc(2, route="/a")
+
+    text = registry.render()
+    assert "# HELP http_requests_total Requests" in text
+    type_, samples = _families(text)["http_requests_total"]
+    assert type_ == "counter"
+    assert samples == ['http_requests_total{route="/a"} 3.0']
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+
+    type_, samples = _families(registry.render())["latency_seconds"]
+    assert type_ == "histogram"
+    assert samples == [
+        'latency_seconds_bucket{le="0.1"} 1.0',
+        'latency_seconds_bucket{le="1.0"} 3.0',
+        'latency_seconds_bucket{le="+Inf"} 4.0',
+        "latency_seconds_sum 6.05",
+        "latency_seconds_count 4.0",
+    ]
+
+
+def test_gauges_and_failing_callbacks():
+    registry = Registry()
+    Gauge("queue_size", "Queue", registry=registry).set(3)
+    CallbackGauge("jobs", "Jobs", lambda: [({"status": 'fa"iled'}, 2), ({"status": "ok"}, None)], registry=registry)
+    CallbackGauge("broken", "Broken", lambda: 1 / 0, registry=registry)
+
+    families = _families(registry.render())
+    assert families["queue_size"] == ("gauge", ["queue_size 3.0"])
+    assert families["jobs"] == ("gauge", ['jobs{status="fa\\"iled"} 2.0'])
+    assert "broken" not in families
@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from scripts.neighbor_store import NeighborStore, NO_NEIGHBOR
+
+K = 3
+
+
+def _corpus(n=40, dim=8, n_clusters=3, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n + 1, dtype=np.uint64) * np.uint64(7919)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    clusters = rng.integers(0, n_clusters, n)
+    return ids, vectors, clusters
+
+
+def _brute_force(ids, vectors, clusters, k=K):
+    """{id: neighbour ids} by cosine similarity within the cluster, best first"""
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = {}
+    for i in range(len(ids)):
+        members = np.flatnonzero((clusters == clusters[i]) & (np.arange(len(ids)) != i))
+        sims = normed[members] @ normed[i]
+        best = members[np.argsort(-sims, kind="stable")[:k]]
+        expected[int(ids[i])] = [int(x) for x in ids[best]]
+    return expected
+
+
+def _lists(store):
+    ids, neighbors, _ = store.load_lookup()
+    return {int(i): [int(x) for x in row if x != NO_NEIGHBOR] for i, row in zip(ids, neighbors)}
+
+
+def test_add_matches_brute_force(tmp_path):
+    ids, vectors, clusters = _corpus()
+    store = NeighborStore(str(tmp_path), k=K, block_size=7)
+    store.add(ids, vectors, clusters)
+    assert _lists(store) == _brute_force(ids, vectors, clusters)
+
+
+def test_incremental_adds_match_rebuild(tmp_path):
+    ids, vectors, clusters = _corpus()
+    store = NeighborStore(str(tmp_path), k=K, block_size=7)
+    for chunk in np.array_split(np.arange(len(ids)), 4):
+        store.add(ids[chunk], vectors[chunk], clusters[chunk])
+    # Re-adding known articles changes nothing
+    store.add(ids[:5], vectors[:5], clusters[:5])
+    assert _lists(store) == _brute_force(ids, vectors, clusters)
+
+
+def test_update_moves_only_given_articles(tmp_path):
+    ids, vectors, clusters = _corpus()
+    store = NeighborStore(str(tmp_path), k=K, block_size=7)
+    store.add(ids, vectors, clusters)
+
+    moved = np.arange(5)
+    new_clusters = clusters.copy()
+    new_clusters[moved] = (clusters[moved] + 1) % 3
+    store.update(ids[moved], vectors[moved], new_clusters[moved])
+
+    # Every article keeps a list, computed with the new assignments
+    assert _lists(store) == _brute_force(ids, vectors, new_clusters)
+
+
+def test_rebuild_replaces_everything(tmp_path):
+    ids, vectors, clusters = _corpus()
+    store = NeighborStore(str(tmp_path), k=K)
+    store.add(ids, vectors, clusters)
+    store.rebuild(ids[:10], vectors[:10], clusters[:10])
+    assert set(_lists(store)) == {int(i) for i in ids[:10]}
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from nlp.selection import cluster_groups, mmr, top_n_per_cluster
+
+
+def test_cluster_groups_skips_missing_clusters():
+    groups = cluster_groups([2, 0, None, 2, 0, 1])
+    assert list(groups) == [0, 1, 2]
+    assert {c: p.tolist() for c, p in groups.items()} == {0: [1, 4], 1: [5], 2: [0, 3]}
+
+
+def test_top_n_per_cluster_matches_sort_and_groupby():
+    rng = np.random.default_rng(0)
+    scores = rng.random(200)
+    scores[::17] = np.nan
+    clusters = rng.integers(0, 7, 200)
+
+    expected = (
+        pd.DataFrame({"score": scores, "cluster": clusters})
+        .sort_values("score", ascending=False, na_position="last", kind="stable")
+        .groupby("cluster").head(3)
+    )
+    picks = top_n_per_cluster(scores, clusters, 3)
+    assert sorted(picks.tolist()) == sorted(expected.index.tolist())
+    assert np.all(np.diff(np.nan_to_num(scores[picks], nan=-np.inf)) <= 0)
+
+
+def test_mmr_without_diversity_is_top_k():
+    rng = np.random.default_rng(1)
+    embeddings = rng.standard_normal((30, 4))
+    scores = rng.random(30)
+    assert mmr(embeddings, scores, 5, diversity=0).tolist() == np.argsort(-scores)[:5].tolist()
+
+
+def test_mmr_skips_near_duplicates():
+    embeddings = np.array([[1.0, 0.0], [0.999, 0.01], [0.0, 1.0]])
+    scores = np.array([1.0, 0.95, 0.6])
+    assert mmr(embeddings, scores, 2, diversity=0).tolist() == [0, 1]
+    assert mmr(embeddings, scores, 2, diversity=0.5).tolist() == [0, 2]
+    assert len(mmr(embeddings, scores, 10)) == 3
+
+
+def test_top_n_per_cluster_with_diversity():
+    embeddings = np.array([[1.0, 0.0], [1.0, 0.001], [0.0, 1.0], [1.0, 0.0]])
+    scores = np.array([0.9, 0.8, 0.5, 0.1])
+    clusters = np.array([0, 0, 0, 1])
+    picks = top_n_per_cluster(scores, clusters, 2, embeddings=embeddings, diversity=0.5)
+    assert picks.tolist() == [0, 2, 3]
@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from scripts.stage_cache import StageCache, code_fingerprint, open_stage_cache
+
+
+def test_key_depends_on_stage_parent_inputs_and_code(tmp_path):
+    cache = StageCache(str(tmp_path))
+    source = tmp_path / "stage.py"
+    source.write_text("x = 1\n")
+
+    key = cache.key("embed", parent="p", inputs={"a": 1, "b": 2}, code=[str(source)])
+    assert key == cache.key("embed", parent="p", inputs={"b": 2, "a": 1}, code=[str(source)])
+    assert key != cache.key("cluster", parent="p", inputs={"a": 1, "b": 2}, code=[str(source)])
+    assert key != cache.key("embed", parent="q", inputs={"a": 1, "b": 2}, code=[str(source)])
+    assert key != cache.key("embed", parent="p", inputs={"a": 1, "b": 3}, code=[str(source)])
+
+    # Editing the code a stage runs invalidates it
+    source.write_text("x = 2\n")
+    os.utime(source, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+    assert key != cache.key("embed", parent="p", inputs={"a": 1, "b": 2}, code=[str(source)])
+
+
+def test_code_fingerprint_ignores_order(tmp_path):
+    a, b = tmp_path / "a.py", tmp_path / "b.py"
+    a.write_text("a = 1\n")
+    b.write_text("b = 1\n")
+    assert code_fingerprint([str(a), str(b)]) == code_fingerprint([str(b), str(a)])
+
+
+def test_cached_computes_once(tmp_path):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"rows": [1, 2, 3]}
+
+    cache = StageCache(str(tmp_path))
+    key = cache.key("scrape", inputs={"run": "2025-W02"})
+    assert cache.cached("scrape", key, compute) == {"rows": [1, 2, 3]}
+    # A new run reuses the stored value
+    retry = StageCache(str(tmp_path))
+    assert retry.cached("scrape", key, compute) == {"rows": [1, 2, 3]}
+    assert len(calls) == 1
+    assert cache.summary()["misses"] == ["scrape"]
+    assert retry.summary()["hits"] == ["scrape"]
+    assert not any(name.endswith(".tmp") or ".tmp-" in name for name in os.listdir(tmp_path / "scrape"))
+
+
+def test_cached_values_that_are_none_count_as_hits(tmp_path):
+    cache = StageCache(str(tmp_path))
+    key = cache.key("noop")
+    cache.cached("noop", key, lambda: None)
+    assert cache.cached("noop", key, lambda: 1 / 0) is None
+
+
+def test_unreadable_entry_is_recomputed(tmp_path):
+    cache = StageCache(str(tmp_path))
+    key = cache.key("embed")
+    os.makedirs(tmp_path / "embed")
+    (tmp_path / "embed" / f"{key}.joblib").write_bytes(b"garbage")
+    assert cache.cached("embed", key, lambda: 42) == 42
+    assert cache.get("embed", key) == 42
+
+
+def test_disabled_cache_always_computes(tmp_path):
+    cache = open_stage_cache({"stage_cache": {"dir": str(tmp_path), "enabled": True}}, enabled=False)
+    key = cache.key("embed")
+    cache.cached("embed", key, lambda: 1)
+    assert cache.cached("embed", key, lambda: 2) == 2
+    assert not os.listdir(tmp_path)
+
+
+def test_prune_removes_old_entries(tmp_path):
+    cache = StageCache(str(tmp_path))
+    old_key, new_key = cache.key("embed", inputs=1), cache.key("embed", inputs=2)
+    cache.put("embed", old_key, "old")
+    cache.put("embed", new_key, "new")
+    old_mtime = time.time() - 10 * 86400
+    os.utime(tmp_path / "embed" / f"{old_key}.joblib", (old_mtime, old_mtime))
+
+    assert cache.prune(max_age_days=7) == 1
+    assert cache.get("embed", old_key) is None
+    assert cache.get("embed", new_key) == "new"
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from scripts.url_store import BloomFilter, ProcessedURLStore, normalize_url, url_hash
+
+
+def test_normalize_url_canonical_form():
+    assert normalize_url("http://WWW.Example.com:443/a/b/?utm_source=x&b=2&a=1&fbclid=z#top") == \
+        "https://example.com/a/b?a=1&b=2"
+    assert normalize_url("https://example.com:80/a?q=1#x") == normalize_url("HTTP://example.com/a/?q=1")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(n_bits=1 << 16, n_hashes=5)
+    rng = np.random.default_rng(0)
+    added = rng.integers(0, 2 ** 63, 2000, dtype=np.uint64)
+    bloom.add_many(added)
+    assert all(int(h) in bloom for h in added)
+
+    others = rng.integers(0, 2 ** 63, 2000, dtype=np.uint64)
+    false_positives = sum(int(h) in bloom for h in others)
+    assert false_positives < 200
+
+
+def test_bloom_filter_round_trip(tmp_path):
+    bloom = BloomFilter(n_bits=1 << 12)
+    bloom.add_many([url_hash("https://example.com/a")])
+    bloom.save(str(tmp_path / "bloom.npz"))
+    loaded = BloomFilter.load(str(tmp_path / "bloom.npz"))
+    assert url_hash("https://example.com/a") in loaded
+    assert loaded.n_items == 1
+
+
+def test_store_appends_only_new_urls_and_persists(tmp_path):
+    path = str(tmp_path / "processed_urls.csv")
+    store = ProcessedURLStore(path)
+    assert store.add_many(["https://example.com/a", "http://www.example.com/a/", "https://example.com/b"]) == [
+        "https://example.com/a", "https://example.com/b"
+    ]
+    assert store.add_many(["https://example.com/a?utm_medium=email"]) == []
+    assert "https://www.example.com/b/" in store
+    assert "https://example.com/c" not in store
+
+    reopened = ProcessedURLStore(path)
+    assert len(reopened) == 2
+    assert "https://example.com/a" in reopened
+    assert list(reopened) == ["https://example.com/a", "https://example.com/b"]
+
+
+def test_compact_removes_duplicates_and_saves_bloom(tmp_path):
+    path = str(tmp_path / "processed_urls.csv")
+    first, second = ProcessedURLStore(path), ProcessedURLStore(path)
+    first.add_many(["https://example.com/a"])
+    second.add_many(["https://example.com/a", "https://example.com/b"])  # second did not see first's append
+    assert sum(1 for _ in ProcessedURLStore(path)) == 3
+
+    assert ProcessedURLStore(path).compact() == 2
+    assert os.path.exists(str(tmp_path / "processed_urls.bloom.npz"))
+    reopened = ProcessedURLStore(path)
+    assert list(reopened) == ["https://example.com/a", "https://example.com/b"]
+    assert "https://example.com/b" in reopened
+
+
+def test_legacy_csv_is_imported(tmp_path):
+    path = tmp_path / "processed_urls.csv"
+    path.write_text("url\nhttps://example.com/a\nhttps://example.com/a/\nhttps://example.com/b\n", encoding="utf-8")
+    store = ProcessedURLStore(str(path))
+    assert len(store) == 2
+    assert "https://example.com/b" in store
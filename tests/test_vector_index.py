@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from nlp.vector_index import VectorIndex
+
+
+def _clustered(n=600, dim=16, n_clusters=6, seed=0):
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((n_clusters, dim)) * 5
+    labels = rng.integers(0, n_clusters, n)
+    return (centroids[labels] + rng.standard_normal((n, dim))).astype(np.float32), centroids
+
+
+def _exact(embeddings, query, k, rows=None):
+    normed = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = normed @ (query / np.linalg.norm(query))
+    candidates = np.arange(len(embeddings)) if rows is None else np.asarray(rows)
+    return candidates[np.argsort(-scores[candidates], kind="stable")[:k]]
+
+
+def test_exact_search_matches_brute_force():
+    embeddings, _ = _clustered()
+    index = VectorIndex(embeddings)
+    assert index.mode == "exact"
+    ids, sims = index.search(embeddings[5], k=10)
+    assert ids.tolist() == _exact(embeddings, embeddings[5], 10).tolist()
+    assert ids[0] == 5 and sims[0] == pytest.approx(1.0, abs=1e-5)
+    assert np.all(np.diff(sims) <= 0)
+
+
+def test_filtered_search_only_returns_candidate_rows():
+    embeddings, centroids = _clustered()
+    rows = np.arange(0, 600, 7)
+    for index in (VectorIndex(embeddings), VectorIndex(embeddings, centroids, exact_max_rows=100)):
+        ids, _ = index.search(embeddings[3], k=5, rows=rows)
+        assert set(ids.tolist()) <= set(rows.tolist())
+        assert ids.tolist() == _exact(embeddings, embeddings[3], 5, rows).tolist()
+
+
+def test_ivf_search_finds_neighbours_of_the_same_cluster():
+    embeddings, centroids = _clustered()
+    index = VectorIndex(embeddings, centroids, exact_max_rows=100, n_probe=2)
+    assert index.mode == "ivf"
+    for row in (0, 100, 599):
+        ids, _ = index.search(embeddings[row], k=10)
+        assert ids.tolist() == _exact(embeddings, embeddings[row], 10).tolist()
+
+
+def test_query_dimension_is_checked():
+    embeddings, _ = _clustered(dim=8)
+    with pytest.raises(ValueError):
+        VectorIndex(embeddings).search(np.ones(4), k=3)